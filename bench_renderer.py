@@ -0,0 +1,120 @@
+'''
+ bench_renderer.py
+ Times scrolling through the call history with the wx.TextCtrl boxes and
+ with the CanvasRenderer. Run it on the unit with "python bench_renderer.py".
+ Created: 10/19/2026
+'''
+
+import wx, time, argparse
+import render_cache
+from canvas_renderer import CanvasRenderer, BOX_RECTS
+
+
+def buildTextBoxes(frame):
+    '''
+    function:
+        buildTextBoxes: function to build the same text boxes as
+                        FrontEnd.setupGUIElements
+
+    args:
+        frame: the frame to put the boxes in
+
+    returns:
+        list of the 3 row text boxes
+
+    raises:
+        None
+    '''
+    boxes = []
+    for x, y, width, height in BOX_RECTS[:3]:
+        box = wx.TextCtrl(frame,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(x,y),size=(width,height))
+        box.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
+        boxes.append(box)
+    return boxes
+
+
+def scroll(boxes, windows, rows, iterations):
+    '''
+    function:
+        scroll: function to scroll down through rows the way
+                FrontEnd.setValues does, forcing a paint after every step
+
+    args:
+        boxes: the 3 row boxes
+        windows: the windows to force a repaint of after each step
+        rows: the list of formatted rows to scroll through
+        iterations: how many steps to scroll
+
+    returns:
+        list of the time each step took in seconds
+
+    raises:
+        None
+    '''
+    times = []
+    for step in range(iterations):
+        top = step % (len(rows) - 2)
+        start = time.time()
+        boxes[0].SetValue(rows[top])
+        boxes[1].SetValue(rows[top+1])
+        boxes[2].SetValue(rows[top+2])
+        boxes[step % 3].SetFocus()
+        boxes[step % 3].SetSelection(-1,-1)
+        for window in windows:
+            window.Update()
+        times.append(time.time() - start)
+    return times
+
+
+def report(name, times):
+    '''
+    function:
+        report: function to print the timing of a run
+
+    args:
+        name: name of the renderer
+        times: list of the time each step took in seconds
+
+    returns:
+        None
+
+    raises:
+        None
+    '''
+    times = sorted(times)
+    print '{:10} mean {:7.2f} ms  p50 {:7.2f} ms  p95 {:7.2f} ms  max {:7.2f} ms'.format(
+        name,
+        1000*sum(times)/len(times),
+        1000*times[len(times)/2],
+        1000*times[int(len(times)*0.95)],
+        1000*times[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the frontend renderers')
+    parser.add_argument('--iterations', type=int, default=500, help='number of scroll steps to time')
+    args = parser.parse_args()
+
+    # A page of realistic looking call history rows
+    rows = [render_cache.SETTINGS_ROW]
+    for i in range(50):
+        rows.append(render_cache.formatHistoryRow('1800555{:04}'.format(i), 'CALLER {}'.format(i), '20190301T{:02}{:02}'.format(i % 24, i % 60), str(i % 2)))
+    rows.append(render_cache.END_OF_HISTORY_ROW)
+
+    app = wx.App()
+
+    # wx.TextCtrl boxes, as FrontEnd builds them by default
+    frame = wx.Frame(None, title='TextCtrl', size=(800,480))
+    boxes = buildTextBoxes(frame)
+    frame.Show()
+    wx.Yield()
+    report('textctrl', scroll(boxes, boxes, rows, args.iterations))
+    frame.Destroy()
+
+    # The canvas renderer
+    frame = wx.Frame(None, title='Canvas', size=(800,480))
+    canvas = CanvasRenderer(frame)
+    frame.Show()
+    wx.Yield()
+    report('canvas', scroll(canvas.boxes[:3], [canvas], rows, args.iterations))
+    frame.Destroy()
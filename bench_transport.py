@@ -0,0 +1,142 @@
+'''
+ bench_transport.py
+ Times sending messages from one process to another through multiprocessing
+ Pipes and through the shared memory rings, the two ways the reader process
+ can talk to the GUI. Like the reader process it sends on two connections,
+ one for calls and one for everything else, and the receiving side reads
+ them with the same loop as the frontend's checkForMessages. Each run sends
+ a burst of decoded history pages, then single heartbeats and calls spaced
+ apart, and reports the message rate of the burst and the latency of the
+ heartbeats and calls. Run it on the unit with "python bench_transport.py".
+ Created: 10/19/2026
+'''
+
+import argparse, time
+from multiprocessing import Process, Pipe
+import pages, shmring
+from soak import formatPercentiles
+
+# A full page of call history as the reader process sends it
+SAMPLE_PAGE = pages.decodeHistoryPage('10:0:' + ':'.join(
+    '1555010{:04d};Caller {};20261019T{:02d}{:02d};{}'.format(index, index, index % 24, index % 60, index % 2)
+    for index in range(10)))
+
+# Most seconds the receiving loop sleeps, as frontend.MESSAGE_WAIT
+MESSAGE_WAIT = 1.0
+
+
+def send(conn, call_conn, count, gap):
+    '''
+    function:
+        send: function run in the sending process. It sends count pages as
+              fast as it can, then count heartbeats and count calls gap
+              seconds apart, each with the time it was sent.
+
+    args:
+        conn: the connection to send pages and heartbeats on
+        call_conn: the connection to send calls on
+        count: how many of each to send
+        gap: seconds between heartbeats and calls
+
+    returns:
+        None
+
+    raises:
+        None
+    '''
+    for index in range(count):
+        conn.send(['hist_give', SAMPLE_PAGE])
+    for index in range(count):
+        conn.send(['heartbeat', time.time()])
+        time.sleep(gap)
+        call_conn.send(['call_rec', time.time()])
+        time.sleep(gap)
+    conn.send(['done', None])
+
+
+def receive(reader_conn, call_conn, count):
+    '''
+    function:
+        receive: function to take everything the sending process sends, the
+                 way checkForMessages does: wait on both connections until
+                 something arrives, take all the calls, then one message
+
+    args:
+        reader_conn: the connection pages and heartbeats arrive on
+        call_conn: the connection calls arrive on
+        count: how many pages the burst has
+
+    returns:
+        tuple: (seconds from the first page to the last, heartbeat
+               latencies, call latencies)
+
+    raises:
+        None
+    '''
+    pages_left = count
+    start = burst = None
+    heartbeats = []
+    calls = []
+    while True:
+        if not call_conn.poll() and not reader_conn.poll():
+            shmring.waitForAny([call_conn, reader_conn], MESSAGE_WAIT)
+
+        while call_conn.poll():
+            kind, sent = call_conn.recv()
+            calls.append(time.time() - sent)
+
+        if reader_conn.poll():
+            kind, sent = reader_conn.recv()
+            if kind == 'hist_give':
+                # The burst is timed from the first page to the last
+                if start is None:
+                    start = time.time()
+                pages_left -= 1
+                if not pages_left:
+                    burst = time.time() - start
+            elif kind == 'heartbeat':
+                heartbeats.append(time.time() - sent)
+            elif kind == 'done':
+                # Calls sent just before the end may still be waiting
+                while call_conn.poll():
+                    kind, sent = call_conn.recv()
+                    calls.append(time.time() - sent)
+                return burst, heartbeats, calls
+
+
+def run(name, make, count, gap):
+    '''
+    function:
+        run: function to time one transport and print the results
+
+    args:
+        name: name of the transport
+        make: function making a (receiving end, sending end) pair
+        count: how many pages, heartbeats and calls to send
+        gap: seconds between heartbeats and calls
+
+    returns:
+        None
+
+    raises:
+        None
+    '''
+    reader_conn, reader_sender = make()
+    call_conn, call_sender = make()
+    process = Process(target=send, args=(reader_sender, call_sender, count, gap))
+    process.start()
+    burst, heartbeats, calls = receive(reader_conn, call_conn, count)
+    process.join()
+
+    print '{:5} burst {:.0f} pages/s, heartbeat latency {}, call latency {}'.format(
+        name, count / burst, formatPercentiles(heartbeats), formatPercentiles(calls))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the reader to GUI transports')
+    parser.add_argument('--count', type=int, default=2000, help='pages, heartbeats and calls to send')
+    parser.add_argument('--gap', type=float, default=0.002, help='seconds between heartbeats and calls')
+    args = parser.parse_args()
+
+    run('pipe', lambda: Pipe(False), args.count, args.gap)
+    run('shm', shmring.RingPipe, args.count, args.gap)
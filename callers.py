@@ -0,0 +1,206 @@
+'''
+ callers.py
+ Index of recent callers built from the call history pages and the calls
+ the frontend sees come in, so the incoming call screen can say how often a
+ number has called, when it last did and whether it was blocked before
+ without asking the backend. It holds a fixed number of callers, dropping
+ the least recently seen, and keeps the times of each caller's calls as
+ minutes in an array instead of as strings. Pages of history are recorded
+ on the message thread and calls on the GUI thread, so the index is behind
+ a lock.
+ Created: 10/19/2026
+'''
+
+import calendar, threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+# Most callers to remember
+MAX_CALLERS = 1024
+
+# Most call times to keep for each caller. Callers with more show "32+".
+MAX_CALLS = 32
+
+# Call times this many minutes apart or less are taken to be the same call,
+# as the time a call is shown with when it comes in can differ from the one
+# the backend saves by a minute
+SAME_CALL_MINUTES = 1
+
+
+def normalizeNumber(number):
+    '''
+    function:
+        normalizeNumber: function to reduce a number to the digits that
+                         identify the caller, so the same number formatted
+                         differently is one caller
+
+    args:
+        number: the number, formatted or not
+
+    returns:
+        string: the last 10 digits of the number
+
+    raises:
+        None
+    '''
+    return ''.join(char for char in number if char.isdigit())[-10:]
+
+
+def stampMinutes(stamp):
+    '''
+    function:
+        stampMinutes: function to turn a time as the backend sends it into
+                      minutes since the epoch
+
+    args:
+        stamp: the time, e.g. 20181125T1656
+
+    returns:
+        int: minutes since 1970 (the time is taken as is, without a timezone)
+
+    raises:
+        ValueError: if stamp is not in the format the backend sends
+    '''
+    when = datetime(int(stamp[0:4]), int(stamp[4:6]), int(stamp[6:8]), int(stamp[9:11]), int(stamp[11:13]))
+    return calendar.timegm(when.timetuple()) // 60
+
+
+def minutesStamp(minutes):
+    '''
+    function:
+        minutesStamp: function to turn minutes since the epoch back into a
+                      datetime
+
+    args:
+        minutes: minutes since 1970, as made by stampMinutes
+
+    returns:
+        datetime: the time
+
+    raises:
+        None
+    '''
+    return datetime.utcfromtimestamp(minutes * 60)
+
+
+class CallerIndex(object):
+    '''
+    CallerIndex class which remembers the recent calls of the most recently
+    seen callers
+    '''
+    def __init__(self, size=MAX_CALLERS, calls=MAX_CALLS):
+        '''
+        function:
+            __init__: constructor for the CallerIndex class
+
+        args:
+            size: the most callers to remember
+            calls: the most call times to keep for each caller
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.size = size
+        self.calls = calls
+
+        # Normalized number -> [call times in minutes, oldest first, blocked
+        # before]. Callers are kept least recently seen first.
+        self.callers = OrderedDict()
+        self.lock = threading.Lock()
+
+    def record(self, number, stamp, blocked=False):
+        '''
+        function:
+            record: This function remembers a call. A call that is already
+                    remembered (e.g. from reloading a page of the history)
+                    isn't counted again.
+
+        args:
+            number: the caller's number
+            stamp: the time of the call, e.g. 20181125T1656
+            blocked: True if the call was blocked
+
+        returns:
+            None
+
+        raises:
+            ValueError: if stamp is not in the format the backend sends
+        '''
+        key = normalizeNumber(number)
+        minutes = stampMinutes(stamp)
+        with self.lock:
+            entry = self.callers.pop(key, None)
+            if entry is None:
+                entry = [array('l'), False]
+            self.callers[key] = entry
+            times = entry[0]
+            entry[1] = entry[1] or blocked
+
+            if not any(abs(minutes - seen) <= SAME_CALL_MINUTES for seen in times):
+                # Keep the times in order, dropping the oldest when full
+                index = len(times)
+                while index and times[index-1] > minutes:
+                    index -= 1
+                times.insert(index, minutes)
+                if len(times) > self.calls:
+                    times.pop(0)
+
+            # Forget the least recently seen caller
+            if len(self.callers) > self.size:
+                self.callers.popitem(last=False)
+
+    def lookup(self, number):
+        '''
+        function:
+            lookup: This function looks up what is remembered about a caller
+
+        args:
+            number: the caller's number
+
+        returns:
+            tuple: (number of calls, datetime of the last call, True if a call
+                   from them was blocked, True if there were more calls than
+                   are kept), or None if the caller isn't remembered
+
+        raises:
+            None
+        '''
+        key = normalizeNumber(number)
+        with self.lock:
+            entry = self.callers.pop(key, None)
+            if entry is None:
+                return None
+            self.callers[key] = entry
+            times, blocked = entry
+            return len(times), minutesStamp(times[-1]), blocked, len(times) >= self.calls
+
+    def recent(self, count):
+        '''
+        function:
+            recent: This function lists the most recently seen callers,
+                    without counting as seeing them again
+
+        args:
+            count: the most callers to list
+
+        returns:
+            list: normalized numbers, most recently seen first
+
+        raises:
+            None
+        '''
+        numbers = []
+        with self.lock:
+            for key in reversed(self.callers):
+                if len(numbers) >= count:
+                    break
+                numbers.append(key)
+        return numbers
+
+    def __len__(self):
+        with self.lock:
+            return len(self.callers)
@@ -0,0 +1,383 @@
+'''
+ canvas_renderer.py
+ Lightweight renderer for the frontend which draws the rows straight onto
+ one double-buffered panel instead of using a wx.TextCtrl for each row
+ Created: 10/19/2026
+'''
+
+import wx
+from render_cache import LRUCache
+
+# Where each box sits on the 800x480 screen. These match the text boxes
+# built by FrontEnd.setupGUIElements. The fourth and fifth boxes overlay the
+# other three when picking a setting state.
+BOX_RECTS = [(0,0,800,152),
+             (0,155,800,152),
+             (0,310,800,170),
+             (0,0,800,304),
+             (0,310,800,170)]
+
+# Point size of the font used for every row
+FONT_SIZE = 30
+
+# Most text extents and most wrapped texts to keep measured
+TEXT_CACHE_SIZE = 512
+
+
+class CanvasBox(object):
+    '''
+    CanvasBox class which stands in for one of the FrontEnd's text boxes. It
+    supports the handful of wx.TextCtrl calls the FrontEnd makes and asks
+    the canvas to repaint it whenever its text changes.
+    '''
+    def __init__(self, canvas, rect):
+        '''
+        function:
+            __init__: constructor for the CanvasBox class
+
+        args:
+            canvas: the CanvasRenderer that draws this box
+            rect: (x, y, width, height) of the box on the canvas
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.canvas = canvas
+        self.rect = rect
+        self.value = ''
+        self.shown = True
+
+    def SetValue(self, value):
+        '''
+        function:
+            SetValue: This function sets the text of the box, repainting it
+                      only if the text changed
+
+        args:
+            value: the new text of the box
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if value != self.value:
+            self.value = value
+            self.canvas.markDirty(self)
+
+    def GetValue(self):
+        return self.value
+
+    def SetFocus(self):
+        '''
+        function:
+            SetFocus: This function makes this box the highlighted one
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.canvas.setHighlight(self)
+
+    def SetSelection(self, start, end):
+        # The whole box is highlighted when it has the focus, so there is
+        # nothing to select
+        pass
+
+    def SetFont(self, font):
+        self.canvas.setFont(font)
+
+    def Bind(self, event, handler):
+        # The boxes aren't windows, so events come from the canvas itself
+        self.canvas.bindOnce(event, handler)
+
+
+class CanvasRenderer(wx.Panel):
+    '''
+    CanvasRenderer class which paints all of the FrontEnd's rows onto a
+    single double-buffered panel. Fonts and text extents are cached and
+    only the boxes whose text or highlight changed are repainted.
+    '''
+    def __init__(self, parent, size=(800,480)):
+        '''
+        function:
+            __init__: constructor for the CanvasRenderer class
+
+        args:
+            parent: the window to put the canvas in
+            size: the size of the canvas
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        super(CanvasRenderer, self).__init__(parent, pos=(0,0), size=size, style=wx.WANTS_CHARS)
+
+        # We paint every pixel ourselves, so don't let wx erase the background
+        self.SetBackgroundStyle(wx.BG_STYLE_CUSTOM)
+
+        self.buffer = wx.EmptyBitmap(size[0], size[1])
+        self.font = wx.Font(FONT_SIZE,wx.MODERN,wx.NORMAL,wx.NORMAL)
+        self.background = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW)
+        self.foreground = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOWTEXT)
+        self.highlight_background = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT)
+        self.highlight_foreground = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT)
+
+        # Text extents and wrapped lines are measured once per string, for
+        # the strings drawn most recently
+        self.extent_cache = LRUCache(TEXT_CACHE_SIZE)
+        self.wrap_cache = LRUCache(TEXT_CACHE_SIZE)
+        self.line_height = None
+
+        self.boxes = [CanvasBox(self, rect) for rect in BOX_RECTS]
+        self.boxes[3].shown = False
+        self.boxes[4].shown = False
+        self.highlighted = None
+        self.dirty = set(self.boxes)
+        self.bound_events = set()
+
+        self.Bind(wx.EVT_PAINT, self.onPaint)
+
+    def bindOnce(self, event, handler):
+        '''
+        function:
+            bindOnce: This function binds an event on the canvas, ignoring
+                      repeated binds from each of the boxes
+
+        args:
+            event: the wx event to bind
+            handler: the function to call when the event happens
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if event not in self.bound_events:
+            self.bound_events.add(event)
+            self.Bind(event, handler)
+
+    def setFont(self, font):
+        '''
+        function:
+            setFont: This function changes the font and throws away the
+                     measurements made with the old one
+
+        args:
+            font: the new wx.Font
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if font != self.font:
+            self.font = font
+            self.extent_cache = LRUCache(TEXT_CACHE_SIZE)
+            self.wrap_cache = LRUCache(TEXT_CACHE_SIZE)
+            self.line_height = None
+            self.dirty.update(self.boxes)
+            self.Refresh(False)
+
+    def setHighlight(self, box):
+        '''
+        function:
+            setHighlight: This function moves the highlight to a box,
+                          repainting only the old and new highlighted boxes
+
+        args:
+            box: the CanvasBox to highlight
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        # Keep the keyboard focus on the canvas so key events still arrive
+        if self.FindFocus() is not self:
+            wx.Window.SetFocus(self)
+
+        if box is not self.highlighted:
+            if self.highlighted is not None:
+                self.markDirty(self.highlighted)
+            self.highlighted = box
+            self.markDirty(box)
+
+    def showOverlay(self, show):
+        '''
+        function:
+            showOverlay: This function shows or hides the fourth and fifth
+                         boxes which cover the normal three rows
+
+        args:
+            show: True to show the overlay, False to go back to three rows
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        for box in self.boxes[:3]:
+            box.shown = not show
+        for box in self.boxes[3:]:
+            box.shown = show
+        self.dirty.update(self.boxes)
+        self.Refresh(False)
+
+    def markDirty(self, box):
+        '''
+        function:
+            markDirty: This function queues a box to be repainted
+
+        args:
+            box: the CanvasBox to repaint
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if box.shown:
+            self.dirty.add(box)
+            self.RefreshRect(wx.Rect(*box.rect), False)
+
+    def textExtent(self, dc, text):
+        '''
+        function:
+            textExtent: This function measures a string, remembering the
+                        result for the next time
+
+        args:
+            dc: a DC with the canvas font selected
+            text: the string to measure
+
+        returns:
+            (width, height) of the text in pixels
+
+        raises:
+            None
+        '''
+        extent = self.extent_cache.get(text)
+        if extent is None:
+            extent = dc.GetTextExtent(text)
+            self.extent_cache.put(text, extent)
+        return extent
+
+    def wrapText(self, dc, text, width):
+        '''
+        function:
+            wrapText: This function splits the text of a box into the lines to
+                      draw, wrapping on spaces like wx.TE_WORDWRAP. Padding
+                      spaces are stripped since lines are centered by their
+                      measured width.
+
+        args:
+            dc: a DC with the canvas font selected
+            text: the text of the box
+            width: the width of the box in pixels
+
+        returns:
+            list of (line, line width) tuples
+
+        raises:
+            None
+        '''
+        key = (text, width)
+        lines = self.wrap_cache.get(key)
+        if lines is not None:
+            return lines
+
+        lines = []
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split():
+                candidate = word if not line else line + ' ' + word
+                if line and self.textExtent(dc, candidate)[0] > width:
+                    lines.append((line, self.textExtent(dc, line)[0]))
+                    line = word
+                else:
+                    line = candidate
+            lines.append((line, self.textExtent(dc, line)[0]))
+
+        self.wrap_cache.put(key, lines)
+        return lines
+
+    def drawBox(self, dc, box):
+        '''
+        function:
+            drawBox: This function paints one box into the buffer
+
+        args:
+            dc: the DC to draw into
+            box: the CanvasBox to draw
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        x, y, width, height = box.rect
+        highlighted = box is self.highlighted
+
+        # Fill in the background of the box
+        colour = self.highlight_background if highlighted else self.background
+        dc.SetBrush(wx.Brush(colour))
+        dc.SetPen(wx.Pen(colour))
+        dc.DrawRectangle(x, y, width, height)
+
+        # Draw each line centered across the box
+        dc.SetTextForeground(self.highlight_foreground if highlighted else self.foreground)
+        line_y = y
+        for line, line_width in self.wrapText(dc, box.value, width):
+            if line_y + self.line_height > y + height:
+                break
+            if line:
+                dc.DrawText(line, x + (width - line_width)/2, line_y)
+            line_y += self.line_height
+
+    def onPaint(self, event):
+        '''
+        function:
+            onPaint: This function repaints the dirty boxes into the buffer
+                     and copies the buffer to the screen
+
+        args:
+            event: the paint event (unused)
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        dc = wx.BufferedPaintDC(self, self.buffer)
+        dc.SetFont(self.font)
+        if self.line_height is None:
+            self.line_height = self.textExtent(dc, 'Ay')[1]
+
+        # When the overlay changes, clear the gaps between the boxes as well
+        if len(self.dirty) == len(self.boxes):
+            dc.SetBackground(wx.Brush(self.background))
+            dc.Clear()
+
+        for box in self.boxes:
+            if box in self.dirty and box.shown:
+                self.drawBox(dc, box)
+        self.dirty.clear()
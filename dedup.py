@@ -0,0 +1,76 @@
+'''
+ dedup.py
+ Bounded cache of recently seen keys which expire after a while. The
+ reader process uses it to drop NSQ messages that are delivered more than
+ once before they reach the GUI.
+ Created: 10/19/2026
+'''
+
+from collections import OrderedDict
+from scheduler import monotonic
+
+# Seconds to remember a message for. NSQ redelivers a message if it isn't
+# finished within the message timeout (60 seconds by default), so this
+# comfortably covers a redelivery or two.
+DEFAULT_TTL = 600
+
+# Most keys to remember at once
+DEFAULT_SIZE = 1024
+
+
+class TTLCache(object):
+    '''
+    TTLCache class which remembers keys for a fixed time, holding at most a
+    fixed number of them
+    '''
+    def __init__(self, ttl=DEFAULT_TTL, size=DEFAULT_SIZE):
+        '''
+        function:
+            __init__: constructor for the TTLCache class
+
+        args:
+            ttl: seconds to remember each key for
+            size: the most keys to remember at once
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.ttl = ttl
+        self.size = size
+        self.expiries = OrderedDict()
+
+    def seen(self, key):
+        '''
+        function:
+            seen: This function checks whether a key was seen within the TTL
+                  and remembers it if it wasn't
+
+        args:
+            key: the key to check (e.g. an NSQ message id)
+
+        returns:
+            bool: True if the key was already seen
+
+        raises:
+            None
+        '''
+        now = monotonic()
+
+        # Keys are kept in the order they were added, so expired ones are
+        # always at the front
+        while self.expiries:
+            oldest, expiry = next(self.expiries.iteritems())
+            if expiry > now and len(self.expiries) < self.size:
+                break
+            del self.expiries[oldest]
+
+        if key in self.expiries:
+            return True
+        self.expiries[key] = now + self.ttl
+        return False
+
+    def __len__(self):
+        return len(self.expiries)
@@ -0,0 +1,661 @@
+'''
+ fake_backend.py
+ Synthetic stand-in for the ScreenDoor backend, for exercising the frontend
+ without the real one. It answers history_get, settings_request_all,
+ setting_get, blacklist_get and frontend_ping from generated data after a
+ configurable delay, applies setting_set, call_blacklist and
+ blacklist_remove to that data, and sends call_received, heartbeat and
+ error messages at configurable rates. It runs over either a local nsqd or the in-process
+ fake broker.
+ Created: 10/19/2026
+'''
+
+import argparse, random, shutil, subprocess, tempfile, threading, time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from fake_broker import FakeBroker
+import pages
+
+# gnsq is only needed to talk to a real nsqd
+try:
+    import gnsq, gevent
+except ImportError:
+    gnsq = None
+
+# Channel the backend reads requests on
+BACKEND_CHANNEL = 'fake_backend'
+
+# Separates the reply-to tag from a request or reply body (the same as
+# REPLY_TO_SEPARATOR in frontend.py)
+REPLY_TO_SEPARATOR = '#'
+
+# Names given to generated callers
+CALLER_NAMES = ['SMITH JOHN', 'GARCIA MARIA', 'WIRELESS CALLER', 'JOHNSON L',
+                'NGUYEN T', 'UNKNOWN NAME', 'BROWN PAT', 'TOLL FREE',
+                'MILLER SAM', 'DAVIS KIM', 'LOPEZ ANA', 'WILSON R']
+
+# Settings as name: (description, current state, states)
+DEFAULT_SETTINGS = OrderedDict([
+    ('Display timeout', ('Seconds before the screen turns off', '30', ['15', '30', '60', '120'])),
+    ('Wildcards', ('Block numbers matching wildcards', 'Enabled', ['Enabled', 'Disabled'])),
+    ('Filter Disable', ('Let every call through', 'Disabled', ['Enabled', 'Disabled'])),
+    ('Unknown callers', ('What to do with callers without caller ID', 'Allow', ['Allow', 'Block', 'Voicemail'])),
+    ('Ring count', ('Rings before voicemail', '4', ['2', '3', '4', '5', '6']))])
+
+# Fraction of generated calls that come from a number already in the history
+REPEAT_CALLER_RATE = 0.3
+
+# Fraction of generated history entries that were blocked
+BLOCKED_RATE = 0.1
+
+
+class BrokerTransport(object):
+    '''
+    BrokerTransport class which publishes and subscribes through a
+    FakeBroker in the same process
+    '''
+    def __init__(self, broker):
+        '''
+        function:
+            __init__: constructor for the BrokerTransport class
+
+        args:
+            broker: the FakeBroker to use
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.broker = broker
+
+    def publish(self, topic, body):
+        self.broker.publish(topic, body)
+
+    def subscribe(self, topic, channel, callback):
+        self.broker.subscribe(topic, channel, callback)
+
+    def start(self):
+        pass
+
+
+class NsqdTransport(object):
+    '''
+    NsqdTransport class which publishes and subscribes through a real nsqd
+    with gnsq. The readers run on a thread of their own so that callers
+    don't have to run the gevent loop.
+    '''
+    def __init__(self, address='127.0.0.1', tcp_port=4150, http_port=4151):
+        '''
+        function:
+            __init__: constructor for the NsqdTransport class
+
+        args:
+            address: address of nsqd
+            tcp_port: nsqd's TCP port
+            http_port: nsqd's HTTP port
+
+        returns:
+            None
+
+        raises:
+            RuntimeError: if gnsq isn't installed
+        '''
+        if gnsq is None:
+            raise RuntimeError('gnsq is needed to use nsqd')
+        self.address = address
+        self.tcp_port = tcp_port
+        self.conn = gnsq.Nsqd(address=address, http_port=http_port)
+        self.subscriptions = []
+        self.started = 0
+
+    def publish(self, topic, body):
+        self.conn.publish(topic, body)
+
+    def subscribe(self, topic, channel, callback):
+        # Readers are made on the reader thread, so just remember them
+        self.subscriptions.append((topic, channel, callback))
+
+    def start(self):
+        '''
+        function:
+            start: This function starts the readers for everything subscribed
+                   to since the last start on a background thread
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        subscriptions = self.subscriptions[self.started:]
+        self.started = len(self.subscriptions)
+
+        def run():
+            for topic, channel, callback in subscriptions:
+                reader = gnsq.Reader(topic, channel, '{}:{}'.format(self.address, self.tcp_port))
+                reader.on_message.connect(lambda reader, message, callback=callback: callback(message.body), weak=False)
+                reader.start(block=False)
+            gevent.wait()
+
+        reading = threading.Thread(target=run, name='nsqd-readers')
+        reading.daemon = True
+        reading.start()
+
+
+class FakeBackend(object):
+    '''
+    FakeBackend class which plays the part of the ScreenDoor backend with
+    generated call history, blacklist and settings
+    '''
+    def __init__(self, transport, history_size=500, blacklist_size=100, latency=0.05,
+                 jitter=0.02, call_rate=1.0, heartbeat_interval=60, error_rate=0.0, seed=None,
+                 filters=True):
+        '''
+        function:
+            __init__: constructor for the FakeBackend class
+
+        args:
+            transport: BrokerTransport or NsqdTransport to talk over
+            history_size: number of calls to generate in the history
+            blacklist_size: number of numbers to generate in the blacklist
+            latency: seconds to wait before answering a request
+            jitter: most seconds to add to the latency at random
+            call_rate: calls per minute to send (0 for none)
+            heartbeat_interval: seconds between heartbeats (0 for none)
+            error_rate: errors per hour to send (0 for none)
+            seed: seed for the random numbers, to repeat a run
+            filters: False to ignore history filters, like a backend that
+                     doesn't know about them
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.call_rate = call_rate
+        self.heartbeat_interval = heartbeat_interval
+        self.error_rate = error_rate
+        self.filters = filters
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.served = {}
+
+        # History is kept newest first, like the backend sends it
+        self.blacklist = [self.randomNumber() for _ in range(blacklist_size)]
+        self.history = []
+        when = datetime.now()
+        for _ in range(history_size):
+            when -= timedelta(minutes=self.random.randint(5, 600))
+            number = self.randomNumber()
+            self.history.append([number, self.random.choice(CALLER_NAMES), when.strftime('%Y%m%dT%H%M'),
+                                 '1' if self.random.random() < BLOCKED_RATE else '0'])
+        self.settings = OrderedDict((name, [description, current, states])
+                                    for name, (description, current, states) in DEFAULT_SETTINGS.items())
+
+    def start(self):
+        '''
+        function:
+            start: This function subscribes to the request topics and starts
+                   sending calls, heartbeats and errors
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        handlers = {'history_get': self.historyGet,
+                    'blacklist_get': self.blacklistGet,
+                    'settings_request_all': self.settingsRequestAll,
+                    'setting_get': self.settingGet,
+                    'setting_set': self.settingSet,
+                    'call_blacklist': self.callBlacklist,
+                    'blacklist_remove': self.blacklistRemove,
+                    'frontend_ping': self.ping}
+        for topic, handler in handlers.items():
+            self.transport.subscribe(topic, BACKEND_CHANNEL, self.counted(topic, handler))
+        self.transport.start()
+
+        events = threading.Thread(target=self.sendEvents, name='fake-backend-events')
+        events.daemon = True
+        events.start()
+
+    def counted(self, topic, handler):
+        '''
+        function:
+            counted: This function wraps a request handler so the requests
+                     on each topic are counted
+
+        args:
+            topic: the request topic
+            handler: the handler
+
+        returns:
+            function: the wrapped handler
+
+        raises:
+            None
+        '''
+        def handle(body):
+            with self.lock:
+                self.served[topic] = self.served.get(topic, 0) + 1
+                handler(body)
+        return handle
+
+    def randomNumber(self):
+        '''
+        function:
+            randomNumber: This function makes up a ten digit phone number
+
+        args:
+            None
+
+        returns:
+            string: the number
+
+        raises:
+            None
+        '''
+        return '{}{:09d}'.format(self.random.randint(2, 9), self.random.randint(0, 999999999))
+
+    def reply(self, topic, body, tag):
+        '''
+        function:
+            reply: This function answers a request after the configured
+                   latency, tagging the reply if the request was tagged
+
+        args:
+            topic: the topic to reply on
+            body: the reply body
+            tag: the reply-to tag from the request, or None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if tag is not None:
+            body = '{}{}{}'.format(tag, REPLY_TO_SEPARATOR, body)
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        sender = threading.Timer(delay, self.transport.publish, (topic, body))
+        sender.daemon = True
+        sender.start()
+
+    def historyGet(self, body):
+        '''
+        function:
+            historyGet: This function answers history_get ("count:offset",
+                        or "count:offset:filter" for a filtered view of the
+                        history) with history_give
+                        ("count:offset:number;name;time;blocked:...")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        request, tag = splitTag(body)
+        fields = request.split(':')
+        count, offset = int(fields[0]), int(fields[1])
+        history = self.history
+        if self.filters and len(fields) > 2:
+            history = [record for record in history if pages.matchesFilter(pages.Call(*record), fields[2])]
+        records = history[offset:offset+count]
+        reply = ['{}'.format(len(records)), '{}'.format(offset)] + [';'.join(record) for record in records]
+        self.reply('history_give', ':'.join(reply), tag)
+
+    def blacklistGet(self, body):
+        '''
+        function:
+            blacklistGet: This function answers blacklist_get ("count:offset")
+                          with blacklist_give ("count:offset:number;number...")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        request, tag = splitTag(body)
+        count, offset = [int(field) for field in request.split(':')]
+        numbers = self.blacklist[offset:offset+count]
+        self.reply('blacklist_give', '{}:{}:{}'.format(len(numbers), offset, ';'.join(numbers)), tag)
+
+    def settingsRequestAll(self, body):
+        '''
+        function:
+            settingsRequestAll: This function answers settings_request_all with
+                                settings_all ("name:name...")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        request, tag = splitTag(body)
+        self.reply('settings_all', ':'.join(self.settings.keys()), tag)
+
+    def settingGet(self, body):
+        '''
+        function:
+            settingGet: This function answers setting_get ("name") with
+                        setting_give ("name:description:current:state;state...")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        name, tag = splitTag(body)
+        if name not in self.settings:
+            self.transport.publish('error', 'Unknown setting {}'.format(name))
+            return
+        description, current, states = self.settings[name]
+        self.reply('setting_give', '{}:{}:{}:{}'.format(name, description, current, ';'.join(states)), tag)
+
+    def settingSet(self, body):
+        '''
+        function:
+            settingSet: This function applies setting_set ("name:state")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        name, _, state = body.partition(':')
+        if name in self.settings and state in self.settings[name][2]:
+            self.settings[name][1] = state
+
+    def callBlacklist(self, body):
+        '''
+        function:
+            callBlacklist: This function applies call_blacklist ("number:name")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        number = body.split(':')[0]
+        if number not in self.blacklist:
+            self.blacklist.insert(0, number)
+
+    def blacklistRemove(self, body):
+        '''
+        function:
+            blacklistRemove: This function applies blacklist_remove ("number")
+
+        args:
+            body: the request body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if body in self.blacklist:
+            self.blacklist.remove(body)
+
+    def ping(self, body):
+        '''
+        function:
+            ping: This function answers frontend_ping by echoing it on
+                  frontend_pong
+
+        args:
+            body: the ping body ("channel:sequence")
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.reply('frontend_pong', body, None)
+
+    def sendEvents(self):
+        '''
+        function:
+            sendEvents: This function sends calls, heartbeats and errors at
+                        their rates. Calls and errors come at random
+                        (exponentially distributed) intervals. It runs on its
+                        own thread.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        now = time.time()
+        next_call = now + self.nextInterval(self.call_rate / 60.0)
+        next_error = now + self.nextInterval(self.error_rate / 3600.0)
+        next_heartbeat = now if self.heartbeat_interval else None
+
+        while True:
+            now = time.time()
+            if next_call is not None and now >= next_call:
+                self.sendCall()
+                next_call = now + self.nextInterval(self.call_rate / 60.0)
+            if next_error is not None and now >= next_error:
+                self.transport.publish('error', 'Simulated backend error')
+                next_error = now + self.nextInterval(self.error_rate / 3600.0)
+            if next_heartbeat is not None and now >= next_heartbeat:
+                self.transport.publish('heartbeat', 'alive')
+                next_heartbeat = now + self.heartbeat_interval
+            time.sleep(0.05)
+
+    def nextInterval(self, rate):
+        '''
+        function:
+            nextInterval: This function picks the wait until the next event
+
+        args:
+            rate: events per second
+
+        returns:
+            float: seconds to wait, or None if the rate is 0
+
+        raises:
+            None
+        '''
+        if rate <= 0:
+            return None
+        return self.random.expovariate(rate)
+
+    def sendCall(self):
+        '''
+        function:
+            sendCall: This function makes up a call, adds it to the history
+                      and sends call_received unless the number is blacklisted
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            if self.history and self.random.random() < REPEAT_CALLER_RATE:
+                number, name = self.random.choice(self.history)[:2]
+            else:
+                number, name = self.randomNumber(), self.random.choice(CALLER_NAMES)
+            blocked = number in self.blacklist
+            self.history.insert(0, [number, name, datetime.now().strftime('%Y%m%dT%H%M'), '1' if blocked else '0'])
+        if not blocked:
+            self.transport.publish('call_received', '{}:{}'.format(number, name))
+
+
+def splitTag(body):
+    '''
+    function:
+        splitTag: function to take the reply-to tag off of a request
+
+    args:
+        body: the request body, "<body>" or "<body>#<channel>"
+
+    returns:
+        (body, tag) tuple, with tag None if the request wasn't tagged
+
+    raises:
+        None
+    '''
+    request, separator, tag = body.partition(REPLY_TO_SEPARATOR)
+    return request, tag if separator else None
+
+
+def startNsqd(binary, tcp_port=4150, http_port=4151):
+    '''
+    function:
+        startNsqd: function to start a local nsqd binary with its data in a
+                   temporary directory
+
+    args:
+        binary: path to nsqd
+        tcp_port: TCP port to listen on
+        http_port: HTTP port to listen on
+
+    returns:
+        function: call it to stop nsqd and remove its data
+
+    raises:
+        OSError: if nsqd can't be started
+    '''
+    data_path = tempfile.mkdtemp(prefix='screendoor-nsqd-')
+    nsqd = subprocess.Popen([binary,
+                             '--tcp-address=127.0.0.1:{}'.format(tcp_port),
+                             '--http-address=127.0.0.1:{}'.format(http_port),
+                             '--data-path={}'.format(data_path)])
+
+    # Give it a moment to start listening
+    time.sleep(1)
+
+    def stop():
+        nsqd.terminate()
+        nsqd.wait()
+        shutil.rmtree(data_path, ignore_errors=True)
+    return stop
+
+
+def addArguments(parser):
+    '''
+    function:
+        addArguments: function to add the options for the broker and the
+                      backend to an argument parser
+
+    args:
+        parser: the argparse.ArgumentParser
+
+    returns:
+        None
+
+    raises:
+        None
+    '''
+    parser.add_argument('--broker', choices=['fake', 'nsqd'], default='fake',
+                        help='run the in-process fake broker, or use nsqd')
+    parser.add_argument('--nsqd-binary', default=None,
+                        help='start this nsqd binary instead of using one already running')
+    parser.add_argument('--tcp-port', type=int, default=4150)
+    parser.add_argument('--http-port', type=int, default=4151)
+    parser.add_argument('--history-size', type=int, default=500)
+    parser.add_argument('--blacklist-size', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before each reply')
+    parser.add_argument('--jitter', type=float, default=0.02, help='most extra seconds added to each reply')
+    parser.add_argument('--call-rate', type=float, default=1.0, help='calls per minute')
+    parser.add_argument('--heartbeat-interval', type=float, default=60, help='seconds between heartbeats')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='errors per hour')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--no-filters', dest='filters', action='store_false',
+                        help='ignore history filters, like an older backend')
+
+
+def startFromArguments(args):
+    '''
+    function:
+        startFromArguments: function to start the broker (or nsqd) and the
+                            backend the options ask for
+
+    args:
+        args: the parsed options
+
+    returns:
+        (transport, backend, stop) tuple. Call stop() to shut down.
+
+    raises:
+        RuntimeError: if nsqd is asked for and gnsq isn't installed
+    '''
+    if args.broker == 'fake':
+        broker = FakeBroker(tcp_port=args.tcp_port, http_port=args.http_port)
+        broker.start()
+        transport = BrokerTransport(broker)
+        stop = broker.stop
+    else:
+        stop = startNsqd(args.nsqd_binary, args.tcp_port, args.http_port) if args.nsqd_binary else (lambda: None)
+        transport = NsqdTransport(tcp_port=args.tcp_port, http_port=args.http_port)
+
+    backend = FakeBackend(transport, args.history_size, args.blacklist_size, args.latency, args.jitter,
+                          args.call_rate, args.heartbeat_interval, args.error_rate, args.seed, args.filters)
+    backend.start()
+    return transport, backend, stop
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic ScreenDoor backend')
+    addArguments(parser)
+    args = parser.parse_args()
+
+    transport, backend, stop = startFromArguments(args)
+    print 'Fake backend running, ^C to stop'
+    try:
+        while True:
+            time.sleep(60)
+            print 'Requests served: {}'.format(backend.served)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
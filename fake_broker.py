@@ -0,0 +1,728 @@
+'''
+ fake_broker.py
+ A small in-process stand-in for nsqd. It speaks enough of the NSQ TCP
+ protocol (V2) for gnsq readers, and enough of the HTTP API for
+ gnsq.Nsqd.publish, that the frontend can run against it unchanged. Code
+ in the same process can also publish and subscribe directly. Messages
+ live in memory only, there is no TLS, compression, auth or deferred
+ publishing, and it is meant for testing, not production.
+ Created: 10/19/2026
+'''
+
+import json, socket, struct, threading, time, Queue, SocketServer, BaseHTTPServer, urlparse
+from collections import deque
+
+# Frame types of the NSQ TCP protocol
+FRAME_RESPONSE = 0
+FRAME_ERROR = 1
+FRAME_MESSAGE = 2
+
+# Seconds between heartbeats sent to TCP clients
+HEARTBEAT_INTERVAL = 30
+
+# Milliseconds a client has to finish a message before it is sent again
+MSG_TIMEOUT = 60000
+
+# Sent back to IDENTIFY when the client asks for feature negotiation
+IDENTIFY_RESPONSE = {'max_rdy_count': 2500,
+                     'version': '0.3.8-fake',
+                     'max_msg_timeout': 900000,
+                     'msg_timeout': MSG_TIMEOUT,
+                     'tls_v1': False,
+                     'deflate': False,
+                     'deflate_level': 0,
+                     'max_deflate_level': 0,
+                     'snappy': False,
+                     'sample_rate': 0,
+                     'auth_required': False,
+                     'output_buffer_size': 16384,
+                     'output_buffer_timeout': 250}
+
+
+class Message(object):
+    '''
+    Message class which holds one published message and its delivery state
+    '''
+    def __init__(self, message_id, body):
+        '''
+        function:
+            __init__: constructor for the Message class
+
+        args:
+            message_id: 16 byte message id
+            body: the message body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.id = message_id
+        self.body = body
+        self.timestamp = int(time.time() * 1e9)
+        self.attempts = 0
+        self.sent = None
+
+    def frame(self):
+        '''
+        function:
+            frame: This function packs the message the way nsqd sends it
+
+        args:
+            None
+
+        returns:
+            string: the message frame data
+        '''
+        return struct.pack('>qh', self.timestamp, self.attempts) + self.id + self.body
+
+
+class Channel(object):
+    '''
+    Channel class which holds the queued and in-flight messages of one
+    channel and the clients subscribed to it
+    '''
+    def __init__(self):
+        '''
+        function:
+            __init__: constructor for the Channel class
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.queue = deque()
+        self.clients = []
+        self.in_flight = {}
+        self.next_client = 0
+
+
+class TCPClient(object):
+    '''
+    TCPClient class which sends frames to one client connected over TCP
+    '''
+    def __init__(self, sock):
+        '''
+        function:
+            __init__: constructor for the TCPClient class
+
+        args:
+            sock: the client's socket
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.ready = 0
+        self.in_flight = 0
+        self.channel = None
+
+    def sendFrame(self, frame_type, data):
+        '''
+        function:
+            sendFrame: This function sends one frame to the client
+
+        args:
+            frame_type: one of the FRAME_* constants
+            data: the frame data
+
+        returns:
+            None
+
+        raises:
+            socket.error: if the client has gone away
+        '''
+        with self.send_lock:
+            self.sock.sendall(struct.pack('>ll', len(data) + 4, frame_type) + data)
+
+    def deliver(self, message):
+        '''
+        function:
+            deliver: This function sends a message to the client
+
+        args:
+            message: the Message to send
+
+        returns:
+            None
+
+        raises:
+            socket.error: if the client has gone away
+        '''
+        self.sendFrame(FRAME_MESSAGE, message.frame())
+
+
+class LocalClient(object):
+    '''
+    LocalClient class which hands messages to a callback on its own thread,
+    for subscribers in the same process as the broker
+    '''
+    def __init__(self, broker, callback, max_in_flight):
+        '''
+        function:
+            __init__: constructor for the LocalClient class
+
+        args:
+            broker: the FakeBroker the client is subscribed to
+            callback: function called with the body of each message
+            max_in_flight: the most messages to have outstanding at once
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.broker = broker
+        self.callback = callback
+        self.ready = max_in_flight
+        self.in_flight = 0
+        self.channel = None
+        self.inbox = Queue.Queue()
+        worker = threading.Thread(target=self.work, name='fake-broker-local')
+        worker.daemon = True
+        worker.start()
+
+    def deliver(self, message):
+        '''
+        function:
+            deliver: This function queues a message for the callback
+
+        args:
+            message: the Message to hand over
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.inbox.put(message)
+
+    def work(self):
+        '''
+        function:
+            work: This function calls the callback for each message and
+                  finishes it afterwards. It runs on its own thread.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        while True:
+            message = self.inbox.get()
+            try:
+                self.callback(message.body)
+            except Exception as e:
+                print 'Fake broker subscriber failed: {}'.format(e)
+            self.broker.finish(self, message.id)
+
+
+class FakeBroker(object):
+    '''
+    FakeBroker class which routes messages from publishers to channels the
+    way nsqd does: every channel of a topic gets a copy of each message, and
+    the clients on a channel share its messages
+    '''
+    def __init__(self, host='127.0.0.1', tcp_port=4150, http_port=4151):
+        '''
+        function:
+            __init__: constructor for the FakeBroker class
+
+        args:
+            host: address to listen on
+            tcp_port: port for the TCP protocol (None to not listen)
+            http_port: port for the HTTP API (None to not listen)
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.host = host
+        self.tcp_port = tcp_port
+        self.http_port = http_port
+        self.lock = threading.RLock()
+        self.topics = {}
+        self.backlog = {}
+        self.message_count = 0
+        self.servers = []
+        self.running = False
+
+    def start(self):
+        '''
+        function:
+            start: This function starts listening and serving in the background
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            socket.error: if a port can't be bound
+        '''
+        broker = self
+
+        class TCPHandler(SocketServer.BaseRequestHandler):
+            def handle(self):
+                broker.serveTCP(self.request)
+
+        class HTTPHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+            def do_GET(self):
+                broker.serveHTTP(self)
+
+            def do_POST(self):
+                broker.serveHTTP(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        if self.tcp_port is not None:
+            tcp_server = ThreadingTCPServer((self.host, self.tcp_port), TCPHandler)
+            self.servers.append(tcp_server)
+        if self.http_port is not None:
+            http_server = ThreadingHTTPServer((self.host, self.http_port), HTTPHandler)
+            self.servers.append(http_server)
+
+        for server in self.servers:
+            serving = threading.Thread(target=server.serve_forever, name='fake-broker')
+            serving.daemon = True
+            serving.start()
+
+        self.running = True
+        timer = threading.Thread(target=self.housekeeping, name='fake-broker-housekeeping')
+        timer.daemon = True
+        timer.start()
+        print 'Fake broker listening on {} (tcp:{} http:{})'.format(self.host, self.tcp_port, self.http_port)
+
+    def stop(self):
+        '''
+        function:
+            stop: This function stops the servers
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.running = False
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def publish(self, topic, body):
+        '''
+        function:
+            publish: This function publishes a message to every channel of a
+                     topic. Messages for a topic without channels are kept
+                     until the first channel is made.
+
+        args:
+            topic: the topic to publish to
+            body: the message body
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            channels = self.topics.get(topic)
+            if not channels:
+                self.backlog.setdefault(topic, deque()).append(self.newMessage(body))
+                return
+            for channel in channels.itervalues():
+                channel.queue.append(self.newMessage(body))
+                self.dispatch(channel)
+
+    def subscribe(self, topic, channel_name, callback, max_in_flight=1):
+        '''
+        function:
+            subscribe: This function subscribes a callback in this process to
+                       a topic and channel
+
+        args:
+            topic: the topic to subscribe to
+            channel_name: the channel to read on
+            callback: function called with the body of each message, on a
+                      thread of its own
+            max_in_flight: the most messages to have outstanding at once
+
+        returns:
+            LocalClient: the subscriber
+
+        raises:
+            None
+        '''
+        client = LocalClient(self, callback, max_in_flight)
+        self.addClient(topic, channel_name, client)
+        return client
+
+    def newMessage(self, body):
+        '''
+        function:
+            newMessage: This function makes a message with a fresh id
+
+        args:
+            body: the message body
+
+        returns:
+            Message: the new message
+
+        raises:
+            None
+        '''
+        self.message_count += 1
+        return Message('{:016x}'.format(self.message_count), body)
+
+    def addClient(self, topic, channel_name, client):
+        '''
+        function:
+            addClient: This function adds a client to a channel, making the
+                       channel (and the topic) if needed
+
+        args:
+            topic: the topic
+            channel_name: the channel
+            client: the TCPClient or LocalClient
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            channels = self.topics.setdefault(topic, {})
+            channel = channels.get(channel_name)
+            if channel is None:
+                channel = channels[channel_name] = Channel()
+                # The first channel gets whatever was published before it
+                if topic in self.backlog:
+                    channel.queue.extend(self.backlog.pop(topic))
+            channel.clients.append(client)
+            client.channel = channel
+            self.dispatch(channel)
+
+    def removeClient(self, client):
+        '''
+        function:
+            removeClient: This function drops a client that went away and
+                          puts its in-flight messages back on the queue
+
+        args:
+            client: the client
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            channel = client.channel
+            if channel is None:
+                return
+            channel.clients.remove(client)
+            for message_id, (message, owner) in channel.in_flight.items():
+                if owner is client:
+                    del channel.in_flight[message_id]
+                    channel.queue.appendleft(message)
+            client.channel = None
+            self.dispatch(channel)
+
+    def dispatch(self, channel):
+        '''
+        function:
+            dispatch: This function sends queued messages to the clients of
+                      a channel that are ready for them, taking turns
+
+        args:
+            channel: the channel
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            while channel.queue:
+                client = None
+                for attempt in range(len(channel.clients)):
+                    candidate = channel.clients[(channel.next_client + attempt) % len(channel.clients)]
+                    if candidate.in_flight < candidate.ready:
+                        client = candidate
+                        channel.next_client = (channel.next_client + attempt + 1) % len(channel.clients)
+                        break
+                if client is None:
+                    return
+
+                message = channel.queue.popleft()
+                message.attempts += 1
+                message.sent = time.time()
+                channel.in_flight[message.id] = (message, client)
+                client.in_flight += 1
+                try:
+                    client.deliver(message)
+                except socket.error:
+                    # The connection's own thread notices and cleans up
+                    pass
+
+    def finish(self, client, message_id, requeue=False):
+        '''
+        function:
+            finish: This function handles FIN and REQ from a client
+
+        args:
+            client: the client
+            message_id: id of the message
+            requeue: True to put the message back on the queue
+
+        returns:
+            bool: False if the message wasn't in flight with the client
+
+        raises:
+            None
+        '''
+        with self.lock:
+            channel = client.channel
+            if channel is None or channel.in_flight.get(message_id, (None, None))[1] is not client:
+                return False
+            message, owner = channel.in_flight.pop(message_id)
+            client.in_flight -= 1
+            if requeue:
+                channel.queue.append(message)
+            self.dispatch(channel)
+            return True
+
+    def housekeeping(self):
+        '''
+        function:
+            housekeeping: This function sends messages again when they
+                          aren't finished in time, and sends heartbeats to
+                          TCP clients. It runs on its own thread.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        last_heartbeat = time.time()
+        while self.running:
+            time.sleep(1)
+            now = time.time()
+            heartbeat = now - last_heartbeat > HEARTBEAT_INTERVAL
+            if heartbeat:
+                last_heartbeat = now
+
+            with self.lock:
+                for channels in self.topics.itervalues():
+                    for channel in channels.itervalues():
+                        for message_id, (message, owner) in channel.in_flight.items():
+                            if now - message.sent > MSG_TIMEOUT / 1000.0:
+                                del channel.in_flight[message_id]
+                                owner.in_flight -= 1
+                                channel.queue.append(message)
+                        if heartbeat:
+                            for client in channel.clients:
+                                if isinstance(client, TCPClient):
+                                    try:
+                                        client.sendFrame(FRAME_RESPONSE, '_heartbeat_')
+                                    except socket.error:
+                                        pass
+                        self.dispatch(channel)
+
+    def serveTCP(self, sock):
+        '''
+        function:
+            serveTCP: This function reads and carries out the commands from
+                      one TCP client until it disconnects
+
+        args:
+            sock: the client's socket
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        client = TCPClient(sock)
+        stream = sock.makefile('rb')
+        try:
+            if stream.read(4) != '  V2':
+                client.sendFrame(FRAME_ERROR, 'E_BAD_PROTOCOL')
+                return
+
+            while True:
+                line = stream.readline()
+                if not line:
+                    return
+                params = line.strip().split(' ')
+                command = params[0]
+
+                if command == 'IDENTIFY':
+                    body = readBody(stream)
+                    if json.loads(body).get('feature_negotiation'):
+                        client.sendFrame(FRAME_RESPONSE, json.dumps(IDENTIFY_RESPONSE))
+                    else:
+                        client.sendFrame(FRAME_RESPONSE, 'OK')
+                elif command == 'SUB':
+                    self.addClient(params[1], params[2], client)
+                    client.sendFrame(FRAME_RESPONSE, 'OK')
+                elif command == 'RDY':
+                    with self.lock:
+                        client.ready = int(params[1])
+                        if client.channel is not None:
+                            self.dispatch(client.channel)
+                elif command == 'FIN':
+                    if not self.finish(client, params[1]):
+                        client.sendFrame(FRAME_ERROR, 'E_FIN_FAILED')
+                elif command == 'REQ':
+                    if not self.finish(client, params[1], requeue=True):
+                        client.sendFrame(FRAME_ERROR, 'E_REQ_FAILED')
+                elif command == 'PUB':
+                    self.publish(params[1], readBody(stream))
+                    client.sendFrame(FRAME_RESPONSE, 'OK')
+                elif command == 'MPUB':
+                    body = readBody(stream)
+                    for message in unpackMultipublish(body):
+                        self.publish(params[1], message)
+                    client.sendFrame(FRAME_RESPONSE, 'OK')
+                elif command == 'CLS':
+                    client.sendFrame(FRAME_RESPONSE, 'CLOSE_WAIT')
+                    return
+                elif command in ('NOP', 'TOUCH'):
+                    pass
+                else:
+                    client.sendFrame(FRAME_ERROR, 'E_INVALID')
+                    return
+        except (socket.error, ValueError, IndexError, struct.error):
+            pass
+        finally:
+            self.removeClient(client)
+
+    def serveHTTP(self, request):
+        '''
+        function:
+            serveHTTP: This function answers one HTTP API request. /pub and
+                       /mpub publish; /ping and the topic and channel admin
+                       endpoints just say OK.
+
+        args:
+            request: the BaseHTTPRequestHandler for the request
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        url = urlparse.urlparse(request.path)
+        fields = urlparse.parse_qs(url.query)
+        length = int(request.headers.get('Content-Length') or 0)
+        body = request.rfile.read(length) if length else ''
+
+        status = 200
+        if url.path in ('/pub', '/put') and 'topic' in fields:
+            self.publish(fields['topic'][0], body)
+        elif url.path in ('/mpub', '/mput') and 'topic' in fields:
+            if fields.get('binary', ['false'])[0] in ('true', '1'):
+                messages = unpackMultipublish(body)
+            else:
+                messages = [line for line in body.split('\n') if line]
+            for message in messages:
+                self.publish(fields['topic'][0], message)
+        elif url.path != '/ping' and not url.path.startswith(('/topic/', '/channel/')):
+            status = 404
+
+        reply = 'OK' if status == 200 else 'NOT_FOUND'
+        request.send_response(status)
+        request.send_header('Content-Type', 'text/plain')
+        request.send_header('Content-Length', str(len(reply)))
+        request.end_headers()
+        request.wfile.write(reply)
+
+
+class ThreadingTCPServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def readBody(stream):
+    '''
+    function:
+        readBody: function to read a size-prefixed command body
+
+    args:
+        stream: file object for the client's socket
+
+    returns:
+        string: the body
+
+    raises:
+        ValueError: if the connection closes part way through
+    '''
+    size = stream.read(4)
+    if len(size) < 4:
+        raise ValueError('connection closed')
+    return stream.read(struct.unpack('>l', size)[0])
+
+
+def unpackMultipublish(body):
+    '''
+    function:
+        unpackMultipublish: function to split the body of an MPUB command
+                            (or a binary /mpub) into its messages
+
+    args:
+        body: the body
+
+    returns:
+        list: the message bodies
+
+    raises:
+        struct.error: if the body is cut short
+    '''
+    count = struct.unpack('>l', body[:4])[0]
+    messages = []
+    position = 4
+    for _ in range(count):
+        size = struct.unpack('>l', body[position:position+4])[0]
+        messages.append(body[position+4:position+4+size])
+        position += 4 + size
+    return messages
@@ -0,0 +1,499 @@
+'''
+ fb_display.py
+ Display backend that draws the frontend straight into a Linux framebuffer
+ (e.g. /dev/fb0) with Pillow, so the unit doesn't need an X server. Any
+ regular file can stand in for the framebuffer device, which makes it easy
+ to check the output on a machine without a screen.
+ Created: 10/19/2026
+'''
+
+import os, mmap, argparse
+from PIL import Image, ImageDraw, ImageFont, ImageChops
+from render_cache import LRUCache
+from scheduler import monotonic
+from shmring import selectReadable, setNonBlocking
+
+# Where each box sits on the 800x480 screen. These match the text boxes
+# built by FrontEnd.setupGUIElements. The fourth and fifth boxes overlay the
+# other three when picking a setting state.
+BOX_RECTS = [(0,0,800,152),
+             (0,155,800,152),
+             (0,310,800,170),
+             (0,0,800,304),
+             (0,310,800,170)]
+
+# Monospaced fonts to try, in order, before falling back to Pillow's own
+FONT_PATHS = ['/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf',
+              '/usr/share/fonts/truetype/freefont/FreeMono.ttf']
+
+# Pixel size of the font used for every row
+FONT_SIZE = 38
+
+# Most text extents and most wrapped texts to keep measured
+TEXT_CACHE_SIZE = 512
+
+# Colours of the rows and of the highlighted row
+BACKGROUND = (255, 255, 255)
+FOREGROUND = (0, 0, 0)
+HIGHLIGHT_BACKGROUND = (51, 153, 255)
+HIGHLIGHT_FOREGROUND = (255, 255, 255)
+
+
+class Framebuffer(object):
+    '''
+    Framebuffer class which memory maps a framebuffer device (or a file
+    standing in for one) and copies Pillow images into it
+    '''
+    def __init__(self, path='/dev/fb0', size=None, bits_per_pixel=None):
+        '''
+        function:
+            __init__: constructor for the Framebuffer class. The geometry of
+                      a real device is read from sysfs. For a regular file it
+                      has to be passed in and the file is created if needed.
+
+        args:
+            path: path of the framebuffer device or file
+            size: (width, height) in pixels, or None to read it from sysfs
+            bits_per_pixel: 16, 24 or 32, or None to read it from sysfs
+
+        returns:
+            None
+
+        raises:
+            IOError: if the geometry isn't given and can't be read from sysfs
+            ValueError: if the pixel format isn't supported
+        '''
+        sysfs = '/sys/class/graphics/{}'.format(os.path.basename(path))
+        if size is None:
+            with open(os.path.join(sysfs, 'virtual_size')) as f:
+                size = tuple(int(n) for n in f.read().strip().split(','))
+        if bits_per_pixel is None:
+            with open(os.path.join(sysfs, 'bits_per_pixel')) as f:
+                bits_per_pixel = int(f.read().strip())
+        if bits_per_pixel not in (16, 24, 32):
+            raise ValueError('Unsupported framebuffer depth: {}'.format(bits_per_pixel))
+
+        self.size = size
+        self.bits_per_pixel = bits_per_pixel
+        self.bytes_per_pixel = bits_per_pixel / 8
+
+        # Rows can be padded on real devices, so use the stride if there is one
+        try:
+            with open(os.path.join(sysfs, 'stride')) as f:
+                self.stride = int(f.read().strip())
+        except (IOError, OSError):
+            self.stride = size[0] * self.bytes_per_pixel
+
+        # Map the framebuffer, growing a stand-in file to the right size
+        length = self.stride * size[1]
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0644)
+        if os.path.isfile(path) and os.fstat(self.fd).st_size < length:
+            os.ftruncate(self.fd, length)
+        self.map = mmap.mmap(self.fd, length, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    def toRaw(self, image):
+        '''
+        function:
+            toRaw: This function converts an RGB image to the framebuffer's
+                   pixel format
+
+        args:
+            image: the RGB image to convert
+
+        returns:
+            string: the raw pixels
+
+        raises:
+            None
+        '''
+        if self.bits_per_pixel == 32:
+            return image.tobytes('raw', 'BGRX')
+        if self.bits_per_pixel == 24:
+            return image.tobytes('raw', 'BGR')
+
+        # RGB565, little endian. The bit fields don't overlap so adding the
+        # shifted bands together is the same as or-ing them.
+        r, g, b = image.split()
+        high = ImageChops.add(r.point(lambda v: v & 0xF8), g.point(lambda v: v >> 5))
+        low = ImageChops.add(g.point(lambda v: (v << 3) & 0xE0), b.point(lambda v: v >> 3))
+        return Image.merge('LA', (low, high)).tobytes()
+
+    def blit(self, image, rect):
+        '''
+        function:
+            blit: This function copies part of an image into the framebuffer
+
+        args:
+            image: the full screen RGB image
+            rect: (x, y, width, height) of the part to copy
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        x, y, width, height = rect
+        raw = self.toRaw(image.crop((x, y, x + width, y + height)))
+        row_bytes = width * self.bytes_per_pixel
+
+        # Full width rows are contiguous in the framebuffer
+        start = y * self.stride + x * self.bytes_per_pixel
+        if row_bytes == self.stride:
+            self.map[start:start + len(raw)] = raw
+        else:
+            for row in range(height):
+                offset = start + row * self.stride
+                self.map[offset:offset + row_bytes] = raw[row * row_bytes:(row + 1) * row_bytes]
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+class FramebufferBox(object):
+    '''
+    FramebufferBox class which stands in for one of the FrontEnd's text
+    boxes. It supports the handful of wx.TextCtrl calls the FrontEnd makes
+    and tells the renderer whenever it needs to be redrawn.
+    '''
+    def __init__(self, renderer, rect):
+        '''
+        function:
+            __init__: constructor for the FramebufferBox class
+
+        args:
+            renderer: the FramebufferRenderer that draws this box
+            rect: (x, y, width, height) of the box on the screen
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.renderer = renderer
+        self.rect = rect
+        self.value = ''
+        self.shown = True
+
+    def SetValue(self, value):
+        if value != self.value:
+            self.value = value
+            self.renderer.markDirty(self)
+
+    def GetValue(self):
+        return self.value
+
+    def SetFocus(self):
+        self.renderer.setHighlight(self)
+
+    def SetSelection(self, start, end):
+        # The whole box is highlighted when it has the focus
+        pass
+
+    def SetFont(self, font):
+        pass
+
+    def Bind(self, event, handler):
+        # There is no keyboard without X, only the buttons
+        pass
+
+
+class FramebufferRenderer(object):
+    '''
+    FramebufferRenderer class which draws the FrontEnd's rows into an image
+    and copies the boxes that changed into the framebuffer
+    '''
+    def __init__(self, framebuffer):
+        '''
+        function:
+            __init__: constructor for the FramebufferRenderer class
+
+        args:
+            framebuffer: the Framebuffer to draw into
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.framebuffer = framebuffer
+        self.image = Image.new('RGB', framebuffer.size, BACKGROUND)
+        self.draw = ImageDraw.Draw(self.image)
+        self.font = self.loadFont()
+
+        # Text extents and wrapped lines are measured once per string, for
+        # the strings drawn most recently
+        self.extent_cache = LRUCache(TEXT_CACHE_SIZE)
+        self.wrap_cache = LRUCache(TEXT_CACHE_SIZE)
+        self.line_height = self.textExtent('Ay')[1] + 4
+
+        self.boxes = [FramebufferBox(self, rect) for rect in BOX_RECTS]
+        self.boxes[3].shown = False
+        self.boxes[4].shown = False
+        self.highlighted = None
+        self.dirty = set(self.boxes[:3])
+        self.clear = True
+
+    def loadFont(self):
+        '''
+        function:
+            loadFont: This function loads the first monospaced font it can find
+
+        args:
+            None
+
+        returns:
+            The Pillow font to draw with
+
+        raises:
+            None
+        '''
+        for path in FONT_PATHS:
+            if os.path.exists(path):
+                return ImageFont.truetype(path, FONT_SIZE)
+        return ImageFont.load_default()
+
+    def setHighlight(self, box):
+        '''
+        function:
+            setHighlight: This function moves the highlight to a box
+
+        args:
+            box: the FramebufferBox to highlight
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if box is not self.highlighted:
+            if self.highlighted is not None:
+                self.markDirty(self.highlighted)
+            self.highlighted = box
+            self.markDirty(box)
+
+    def showOverlay(self, show):
+        '''
+        function:
+            showOverlay: This function shows or hides the fourth and fifth
+                         boxes which cover the normal three rows
+
+        args:
+            show: True to show the overlay, False to go back to three rows
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        for box in self.boxes[:3]:
+            box.shown = not show
+        for box in self.boxes[3:]:
+            box.shown = show
+        self.dirty.update(box for box in self.boxes if box.shown)
+        self.clear = True
+
+    def markDirty(self, box):
+        if box.shown:
+            self.dirty.add(box)
+
+    def textExtent(self, text):
+        extent = self.extent_cache.get(text)
+        if extent is None:
+            extent = self.draw.textsize(text, font=self.font)
+            self.extent_cache.put(text, extent)
+        return extent
+
+    def wrapText(self, text, width):
+        '''
+        function:
+            wrapText: This function splits the text of a box into the lines to
+                      draw, wrapping on spaces. Padding spaces are stripped
+                      since lines are centered by their measured width.
+
+        args:
+            text: the text of the box
+            width: the width of the box in pixels
+
+        returns:
+            list of (line, line width) tuples
+
+        raises:
+            None
+        '''
+        key = (text, width)
+        lines = self.wrap_cache.get(key)
+        if lines is not None:
+            return lines
+
+        lines = []
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split():
+                candidate = word if not line else line + ' ' + word
+                if line and self.textExtent(candidate)[0] > width:
+                    lines.append((line, self.textExtent(line)[0]))
+                    line = word
+                else:
+                    line = candidate
+            lines.append((line, self.textExtent(line)[0]))
+
+        self.wrap_cache.put(key, lines)
+        return lines
+
+    def drawBox(self, box):
+        '''
+        function:
+            drawBox: This function draws one box into the image
+
+        args:
+            box: the FramebufferBox to draw
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        x, y, width, height = box.rect
+        highlighted = box is self.highlighted
+        self.draw.rectangle((x, y, x + width - 1, y + height - 1),
+                            fill=HIGHLIGHT_BACKGROUND if highlighted else BACKGROUND)
+
+        # Draw each line centered across the box
+        colour = HIGHLIGHT_FOREGROUND if highlighted else FOREGROUND
+        line_y = y
+        for line, line_width in self.wrapText(box.value, width):
+            if line_y + self.line_height > y + height:
+                break
+            if line:
+                self.draw.text((x + (width - line_width)/2, line_y), line, font=self.font, fill=colour)
+            line_y += self.line_height
+
+    def flush(self):
+        '''
+        function:
+            flush: This function redraws the boxes that changed and copies
+                   them into the framebuffer
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if not self.dirty:
+            return
+
+        # Boxes can be changed from the FrontEnd's message thread, so take
+        # the dirty set before drawing instead of clearing it afterwards
+        dirty, self.dirty = self.dirty, set()
+
+        # When the overlay changes, clear the gaps between the boxes as well
+        if self.clear:
+            self.draw.rectangle((0, 0, self.image.size[0], self.image.size[1]), fill=BACKGROUND)
+            for box in self.boxes:
+                if box.shown:
+                    self.drawBox(box)
+            self.framebuffer.blit(self.image, (0, 0) + self.image.size)
+            self.clear = False
+        else:
+            for box in dirty:
+                if box.shown:
+                    self.drawBox(box)
+                    self.framebuffer.blit(self.image, box.rect)
+
+
+class FramebufferTimer(object):
+    '''
+    FramebufferTimer class which stands in for the wx.Timer the FrontEnd
+    polls with. MainLoop calls the callback when the timer is due, or
+    straight away once another thread has called Wake.
+    '''
+    def __init__(self, callback):
+        self.callback = callback
+        self.due = None
+
+        # Wake writes to this pipe, which MainLoop sleeps on
+        self.wakeup_read, self.wakeup_write = os.pipe()
+        for fd in (self.wakeup_read, self.wakeup_write):
+            setNonBlocking(fd)
+
+    def Start(self, milliseconds):
+        self.due = monotonic() + milliseconds/1000.0
+
+    def Stop(self):
+        self.due = None
+
+    def Wake(self):
+        try:
+            os.write(self.wakeup_write, '\x01')
+        except OSError:
+            # The pipe is full, so it is already awake
+            pass
+
+    def sleep(self, seconds):
+        # Sleep until woken or for seconds, and say whether it was woken
+        if not selectReadable([self.wakeup_read], max(0, seconds)):
+            return False
+        try:
+            while os.read(self.wakeup_read, 4096):
+                pass
+        except OSError:
+            pass
+        return True
+
+
+def MainLoop(timer, renderer):
+    '''
+    function:
+        MainLoop: function to run the frontend without wx. It fires the timer
+                  whenever it is due or woken, and then pushes any changes to
+                  the screen.
+
+    args:
+        timer: the FramebufferTimer the FrontEnd polls with
+        renderer: the FramebufferRenderer to flush after every tick
+
+    returns:
+        None (runs forever)
+
+    raises:
+        None
+    '''
+    while True:
+        # The pipe is emptied before the callback, so a Wake during it isn't
+        # lost
+        delay = 0.05 if timer.due is None else timer.due - monotonic()
+        woken = timer.sleep(delay)
+        if not woken and (timer.due is None or timer.due > monotonic()):
+            continue
+        timer.due = None
+        timer.callback(None)
+        renderer.flush()
+
+
+# Running this file by itself draws a sample screen, e.g. into a file with
+# "python fb_display.py --framebuffer /tmp/fb --size 800x480 --bpp 16"
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Draw a sample screen into a framebuffer')
+    parser.add_argument('--framebuffer', default='/dev/fb0', help='framebuffer device or file to draw into')
+    parser.add_argument('--size', help='WIDTHxHEIGHT, needed when drawing into a file')
+    parser.add_argument('--bpp', type=int, help='bits per pixel, needed when drawing into a file')
+    args = parser.parse_args()
+
+    size = tuple(int(n) for n in args.size.split('x')) if args.size else None
+    renderer = FramebufferRenderer(Framebuffer(args.framebuffer, size, args.bpp))
+    renderer.boxes[0].SetValue('\nSettings')
+    renderer.boxes[1].SetValue('1 (800) 555 - 1234\nSAMPLE CALLER\n03/01/2019 04:56 PM')
+    renderer.boxes[2].SetValue('1 (800) 555 - 4321\nANOTHER CALLER\nBlocked')
+    renderer.boxes[1].SetFocus()
+    renderer.flush()
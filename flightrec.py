@@ -0,0 +1,140 @@
+'''
+ flightrec.py
+ Flight recorder for the frontend. It keeps the last few thousand events
+ (messages in and out, button presses, switch flips, screen changes, pipe
+ depths) in memory with monotonic timestamps, and writes them to a file
+ when something goes wrong, so a lockup or a reboot can be looked into
+ afterwards.
+ Created: 10/19/2026
+'''
+
+import glob, os, time
+from collections import deque
+from scheduler import monotonic
+
+# Most events held before the oldest are dropped
+RECORDER_SIZE = 4096
+
+# Where dumps are written. /var/tmp survives the reboot that usually
+# follows a fatal error.
+DUMP_DIR = '/var/tmp'
+
+# Most dumps of a process name kept. Older ones are deleted when a new one
+# is written, so dumps on every shutdown don't fill the SD card.
+MAX_DUMPS = 10
+
+
+class FlightRecorder(object):
+    '''
+    FlightRecorder class which holds recent events in a ring and dumps them
+    to a file on request
+    '''
+    def __init__(self, name, size=RECORDER_SIZE, directory=DUMP_DIR, keep=MAX_DUMPS):
+        '''
+        function:
+            __init__: constructor for the FlightRecorder class
+
+        args:
+            name: name of the process, used in the file name
+            size: the most events to hold
+            directory: where to write dumps
+            keep: the most dumps to keep
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.name = name
+        self.directory = directory
+        self.keep = keep
+        self.events = deque(maxlen=size)
+
+    def record(self, kind, detail='', **fields):
+        '''
+        function:
+            record: This function adds an event. It is safe to call from any
+                    thread and only appends to the ring.
+
+        args:
+            kind: what sort of event it is, e.g. "in" for a message received
+            detail: what it was about, e.g. the topic
+            fields: extra values to keep with it, e.g. size=12
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.events.append((monotonic(), kind, detail, fields))
+
+    def dump(self, reason):
+        '''
+        function:
+            dump: This function writes every event held to a new file. The
+                  file is written under a temporary name, synced and then
+                  renamed, so a dump cut short by a power cut or a reboot
+                  never looks complete. Only the newest dumps are kept.
+
+        args:
+            reason: why the dump was made, written at the top of the file
+
+        returns:
+            string: the path written
+
+        raises:
+            IOError, OSError: if the file can't be written
+        '''
+        now = monotonic()
+        events = list(self.events)
+        path = os.path.join(self.directory, 'screendoor-{}-{}-{}.flight'.format(
+            self.name, os.getpid(), time.strftime('%Y%m%dT%H%M%S')))
+
+        lines = ['{} flight recorder dump: {}'.format(self.name, reason),
+                 'written {} with {} events, times in seconds before then'.format(
+                     time.strftime('%Y-%m-%d %H:%M:%S'), len(events))]
+        for when, kind, detail, fields in events:
+            line = '{:10.3f} {}'.format(when - now, kind)
+            if detail:
+                line += ' ' + detail
+            if fields:
+                line += ' ' + ' '.join('{}={}'.format(name, fields[name]) for name in sorted(fields))
+            lines.append(line)
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(temp_path, path)
+        self.removeOldDumps()
+        return path
+
+    def removeOldDumps(self):
+        '''
+        function:
+            removeOldDumps: This function deletes all but the newest keep
+                            dumps made under this recorder's name, by any
+                            process
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        dumps = glob.glob(os.path.join(self.directory, 'screendoor-{}-*.flight'.format(self.name)))
+        dumps.sort(key=lambda dump: os.path.getmtime(dump) if os.path.exists(dump) else 0)
+        for dump in dumps[:-self.keep] if self.keep else dumps:
+            try:
+                os.remove(dump)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.events)
@@ -8,13 +8,33 @@
 '''
 
 # Necessary imports for frontend.py
-import wx, gnsq, time, string
-from threading import Thread
+import gnsq, time, string, argparse, signal, os, re, socket
+from threading import Thread, Lock, current_thread
 from multiprocessing import Process, Pipe
 from datetime import datetime
-from Xlib import display
 from RPi import GPIO
 from os import system
+import render_cache
+import pages
+from profiler import SamplingProfiler
+import memstats
+import ringlog
+from dedup import TTLCache
+from pager import AdaptivePager
+from scheduler import Scheduler, monotonic
+from outbox import Outbox
+from callers import CallerIndex
+from shmring import RingPipe, waitForAny
+from flightrec import FlightRecorder
+from ping import PingMonitor, PING_INTERVAL
+
+# wx (and GTK with it) is only imported by the renderers that draw with it,
+# so the framebuffer renderer starts without loading them. Pillow is only
+# needed by the framebuffer renderer.
+try:
+    import fb_display
+except ImportError:
+    fb_display = None
 
 # Global variables to let the timer function know to do something
 global CALL_INC, UPDATE, CALL_REC, CALL_REC_MSG, LOAD_HIST, BLACK_GIVE, BTN_EVENT, SW_EVENT
@@ -30,23 +50,206 @@ SW_EVENT = None
 BUTTON_DEBOUNCE = 250
 SWITCH_DEBOUNCE = 1000
 
-class FrontEnd(wx.Frame):
+# Number of entries to jump by when up or down is held on a list without
+# days to jump between. The number of entries asked for in each page comes
+# from the pager instead.
+PAGE_SIZE = 10
+
+# Seconds up or down has to be held before jumping by day/page, and how
+# often the jump repeats while it stays held
+HOLD_DELAY = 0.75
+
+# Seconds to wait for a requested page before asking for it again
+PAGE_RETRY = 5
+
+# Seconds to show an incoming call before going back to the call history
+CALL_DISPLAY_TIME = 30
+
+# Seconds between sending the switch positions to the backend in case a
+# switch event was missed
+SWITCH_RESYNC_INTERVAL = 60
+
+# Seconds without a heartbeat before the backend is taken to be dead, and
+# how often the fatal error is shown again after that in case something
+# drew over it
+HEARTBEAT_TIMEOUT = 180
+FATAL_ERROR_REFRESH = 1
+
+# Seconds to profile for when profiling is switched on with SIGUSR1, or
+# by a "profile" message on the control topic without a duration
+PROFILE_DURATION = 30
+
+# Seconds the data of a screen can be shown again from memory on Back before
+# it is refreshed in the background
+NAV_MAX_AGE = 120
+
+# Seconds between runtime stats reports on the frontend_stats topic
+STATS_INTERVAL = 300
+
+# Seconds between recording how much is waiting in the pipes from the
+# reader process in the flight recorder
+PIPE_SAMPLE_INTERVAL = 5
+
+# Most seconds the message thread sleeps waiting for something to arrive
+# from the reader process. Anything arriving wakes it straight away.
+MESSAGE_WAIT = 1.0
+
+# Milliseconds between GUI timer ticks while there is something to handle
+# (a button held down, or an event another thread set)
+TIMER_TICK = 5
+
+# Most seconds the GUI timer sleeps when nothing is due, in case a wakeup
+# from another thread is missed
+TIMER_MAX_WAIT = 1.0
+
+# Soft caps on the number of loaded entries kept in the call history and
+# the blacklist. Past these, the pages furthest from the selection are
+# dropped and fetched again if the user scrolls back to them.
+MAX_HISTORY_ENTRIES = 500
+MAX_BLACKLIST_ENTRIES = 500
+
+# Name of the history filter in the settings list, and how many of the most
+# recent callers are offered as filters on their own
+HISTORY_FILTER_SETTING = 'History filter'
+FILTER_CALLERS = 5
+
+# Most log records of a kind kept per period, as (records, seconds). Kinds
+# that aren't listed aren't limited.
+LOG_RATE_LIMITS = {'heartbeat': (1, 300),
+                   'redelivery': (5, 60),
+                   'stale': (5, 60),
+                   'stats': (10, 60),
+                   'button': (10, 1),
+                   'switch': (10, 1),
+                   'outbox': (5, 60),
+                   'ping': (5, 60),
+                   'control': (5, 60)}
+
+# The message each request topic is answered with
+REPLY_BY_REQUEST = {'history_get':'hist_give',
+                    'blacklist_get':'black_give',
+                    'settings_request_all':'set_all',
+                    'setting_get':'set_give'}
+
+# Topics that change something on the backend. They go through the outbox so
+# they are sent when nsqd is back if it was down, instead of being lost.
+DURABLE_TOPICS = ('call_blacklist', 'blacklist_remove', 'setting_set')
+
+# Journal the outbox keeps them in. /var/tmp survives a reboot.
+OUTBOX_PATH = '/var/tmp/screendoor-outbox.journal'
+
+# Separates the reply-to channel from the body of requests, and from the
+# body of the backend's replies, when reply-to tagging is turned on
+REPLY_TO_SEPARATOR = '#'
+
+# Every frontend's own channel starts with CHANNEL_PREFIX. Before that they
+# all read on LEGACY_CHANNEL, which nsqd keeps filling for these topics
+# until it is deleted.
+CHANNEL_PREFIX = 'frontend_lcd_'
+LEGACY_CHANNEL = 'frontend_lcd'
+LEGACY_TOPICS = ('call_received', 'history_give', 'settings_all', 'setting_give',
+                 'blacklist_give', 'heartbeat', 'error')
+
+# How many calls nsqd may have outstanding with the call reader, so that a
+# burst isn't held up behind the first one. The other readers keep gnsq's
+# default of one, so a slow GUI leaves page replies queued in nsqd instead
+# of in the pipe.
+CALL_MAX_IN_FLIGHT = 4
+
+def defaultChannel():
+    '''
+    function:
+        defaultChannel: function to build an NSQ channel name that is unique
+                        to this device, so that several frontends sharing one
+                        nsqd each get every message
+
+    args:
+        None
+
+    returns:
+        string: the channel name, e.g. frontend_lcd_0123456789ab
+
+    raises:
+        None
+    '''
+    device_id = None
+
+    # Prefer the machine id, then the Pi's serial number, then the hostname
+    try:
+        with open('/etc/machine-id') as f:
+            device_id = f.read().strip()[:12]
+    except (IOError, OSError):
+        try:
+            with open('/proc/cpuinfo') as f:
+                for line in f:
+                    if line.startswith('Serial'):
+                        device_id = line.split(':')[1].strip().lstrip('0')
+        except (IOError, OSError):
+            pass
+    if not device_id:
+        device_id = socket.gethostname()
+
+    # NSQ channel names are at most 64 of [.a-zA-Z0-9_-]
+    return re.sub(r'[^.a-zA-Z0-9_-]', '_', CHANNEL_PREFIX + device_id)[:64]
+
+def isFrontendChannel(name):
+    '''
+    function:
+        isFrontendChannel: function to check whether some text is the
+                           channel name of a frontend, e.g. the tag on a reply
+
+    args:
+        name: the text to check
+
+    returns:
+        bool: True if it is a valid channel name starting with CHANNEL_PREFIX
+
+    raises:
+        None
+    '''
+    return name.startswith(CHANNEL_PREFIX) and re.match(r'^[.a-zA-Z0-9_-]{1,64}$', name) is not None
+
+class FrontEnd(object):
     '''
     FrontEnd class which contains the GUI and all of the elements involved in
     communicating between the user and the backend
     '''
-    def __init__(self, parent, title):
+    def __init__(self, parent, title, renderer='textctrl', framebuffer='/dev/fb0', channel=None, reply_to=False,
+                 log_level=ringlog.INFO, outbox_path=OUTBOX_PATH, transport='pipe', allow_remote_press=False):
         '''
         function:
-            __init__: constructor for the FrontEnd class. It calls the super()
-                      constructor to build the GUI window, creates andn places
-                      the rest of the GUI elements, declares class variables
-                      to be used throughout this GUI, and loads the call history
+            __init__: constructor for the FrontEnd class. It builds the GUI
+                      window, creates andn places the rest of the GUI elements,
+                      declares class variables to be used throughout this GUI,
+                      and loads the call history
 
         args:
             parent: The parent object (using default)
             title: the title of the GUI which is passed in when creating the
                        FrontEnd object
+            renderer: 'textctrl' to show the rows in wx.TextCtrl widgets,
+                      'canvas' to paint them on a single CanvasRenderer panel
+                      or 'framebuffer' to draw them straight into a Linux
+                      framebuffer without X
+            framebuffer: the framebuffer device (or file) to draw into when
+                         using the framebuffer renderer
+            channel: the NSQ channel to read every topic on. Defaults to one
+                     unique to this device (see defaultChannel).
+            reply_to: True to tag requests with our channel and only take the
+                      replies the backend tags with it. This needs a backend
+                      that echoes the tag, and lets several frontends share
+                      one backend without seeing each other's pages.
+            log_level: the lowest ringlog level to write out
+            outbox_path: the journal publishes in DURABLE_TOPICS are kept in
+                         until nsqd has taken them
+            transport: 'pipe' to send messages from the reader process to the
+                       GUI through multiprocessing Pipes, or 'shm' to send them
+                       through shared memory rings (see shmring.py)
+            allow_remote_press: True to let "press" on the control topic press
+                                buttons, for the soak test. Anyone who can
+                                publish to nsqd could remove blacklist entries,
+                                change settings or reboot the unit with it, so
+                                it is off unless asked for.
 
         returns:
             None
@@ -55,15 +258,29 @@ class FrontEnd(wx.Frame):
             None
         '''
 
-        # Move the cursor out of the way
-        d = display.Display()
-        s = d.screen()
-        root = s.root
-        root.warp_pointer(1200,1200)
-        d.sync()
+        # Log records are written out by a background thread so logging
+        # never blocks the GUI, the message thread or the GPIO callbacks
+        self.log_level = log_level
+        self.log = self.makeLogger('gui')
+
+        # The last few thousand events are kept to be dumped to a file if the
+        # backend dies, on SIGTERM or when asked on the control topic
+        self.recorder = FlightRecorder('gui')
+
+        # Which renderer setupGUIElements builds the rows with
+        self.renderer = renderer
+        self.framebuffer_path = framebuffer
+
+        # The channel every reader subscribes on, and whether requests and
+        # replies are tagged with it
+        self.channel = channel or defaultChannel()
+        self.reply_to = reply_to
+
+        # Whether button presses can come in on the control topic
+        self.allow_remote_press = allow_remote_press
 
-        # Call the super class to build the GUI
-        super(FrontEnd, self).__init__(parent,title=title, size=(800,480))
+        # Build the window the GUI goes in (if there is one)
+        self.setupWindow(parent, title)
 
         # The key_by_ascii_dict is used to convert ascii characters into
         # easier to understand buttons on the keyboard
@@ -79,6 +296,16 @@ class FrontEnd(wx.Frame):
         # Nsqd object used to transmit messages to localhost
         self.conn = gnsq.Nsqd(address='127.0.0.1',http_port=4151)
 
+        # Publishes that change something on the backend are journaled and
+        # sent from the outbox's thread. Without a journal they are sent
+        # straight away as before.
+        try:
+            self.outbox = Outbox(outbox_path, self.conn.publish, self.conn.multipublish, self.log)
+            self.outbox.start()
+        except (IOError, OSError) as e:
+            self.log.error('outbox', 'Could not open the outbox journal', path=outbox_path, error=e)
+            self.outbox = None
+
         # These 3 pointers help to keep up with what to display on the GUI.
         # menu_ptr is the list index of the currently selected menu item.
         # current_selected_text_box is an integer that ranges from 0 to 2
@@ -97,22 +324,84 @@ class FrontEnd(wx.Frame):
         self.selecting_setting = False
         self.using_blacklist = False
         self.end_of_blacklist = False
+        self.blacklist_resync_offset = None
+        self.blacklist_resync_size = None
         self.showing_warning = False
+
+        # Numbers marked on the blacklist screen to be removed all at once
+        self.blacklist_marking = False
+        self.blacklist_marked = set()
         self.showing_error_message = False
         self.fatal_error = False
         self.state_name = ''
         self.timeout = 30
-        self.on_time = datetime.now()
-        self.switch_state_time = datetime.now()
-        self.heartbeat_timer = datetime.now()
+        self.on_time = monotonic()
         self.first_timeout_message = True
 
-        # 32 spaces which is enough for a blank line
-        self.line_space = 32*' '
+        # All of the timeouts (backlight, switch resync, stats, heartbeat and
+        # the incoming call screen) are deadlines on the monotonic clock, so
+        # the wall clock jumping when NTP syncs doesn't set them off. onTimer
+        # runs them when they are due, and sleeps until the next one unless
+        # another thread wakes it (see wakeTimer).
+        self.timer = None
+        self.scheduler = Scheduler(self.wakeTimer)
+        self.scheduler.scheduleAt('backlight', self.on_time + self.timeout, self.turnOnBacklight, False)
+        self.scheduler.every('switch_resync', SWITCH_RESYNC_INTERVAL, self.resyncSwitches)
+        self.scheduler.every('stats', STATS_INTERVAL, self.reportMemoryStats)
+        self.scheduler.every('pipe_sample', PIPE_SAMPLE_INTERVAL, self.recordPipeDepths)
+
+        # Ping the backend to measure the round-trip time and to notice in
+        # seconds, not HEARTBEAT_TIMEOUT, when it stops answering
+        self.ping = PingMonitor(self.channel)
+        self.scheduler.every('ping', PING_INTERVAL, self.sendPing)
+        self.scheduler.every('ping_stats', STATS_INTERVAL, self.reportPingStats)
+        self.scheduler.schedule('heartbeat', HEARTBEAT_TIMEOUT, self.backendDead)
+
+        # Sequence number of the soak test press waiting to be handled
+        self.press_seq = None
+
+        # The screens the user came through to get to the current one, as
+        # (screen, menu_ptr, current_top_ptr, current_selected_text_box). Each
+        # list keeps its rows while the user is elsewhere, so Back only has to
+        # put the pointers back. list_loaded is when a page of each list last
+        # arrived, and history_refresh_offset is the history page asked for
+        # to refresh it after Back.
+        self.nav_stack = []
+        self.list_loaded = {}
+        self.history_refresh_offset = None
+
+        # screen_generation goes up every time the user moves to a different
+        # screen. response_generation remembers the generation each kind of
+        # reply was last requested in, so replies for a screen that is no
+        # longer showing can be dropped as soon as they arrive.
+        self.screen_generation = 0
+        self.response_generation = {}
+        self.held_button = None
+        self.held_time = monotonic()
+
+        # Incoming calls that have arrived but not been shown yet. The message
+        # thread appends to call_queue under call_lock and onTimer takes them
+        # all at once, shows the latest and counts the rest in calls_missed.
+        # The call_display deadline takes the call screen back to the history.
+        self.call_lock = Lock()
+        self.call_queue = []
+        self.calls_missed = 0
+
+        # Calls shown since the call history was last on screen, as
+        # (number:name, time) oldest first. They are put at the top of the
+        # loaded history when it comes back instead of reloading it.
+        # history_verify is how many of the rows at the top haven't been
+        # checked against the backend yet.
+        self.new_calls = []
+        self.history_verify = None
+
+        # Recent callers seen in the history and coming in, so the incoming
+        # call screen can show how often and when they last called
+        self.callers = CallerIndex()
 
         # This is the menu list. It starts out with settings as the only
         # entry. New entries are appended after asking the backend for them
-        self.menu_items_list = ['{}\nSettings\n{}'.format(self.line_space,self.line_space)]
+        self.menu_items_list = [render_cache.SETTINGS_ROW]
 
         # This is the settings list. It will contain settings upon request from user
         self.settings_list = []
@@ -123,12 +412,38 @@ class FrontEnd(wx.Frame):
         # This is the blacklist. It will contain different numbers that have been blacklisted
         self.blacklist = []
 
+        # Coarse index of the call history loaded so far. history_days maps the
+        # backend offset of each loaded call to its day (YYYYMMDD) and
+        # history_day_index is a sorted list of (offset, day) for the first call
+        # of each day, which is what fast navigation jumps between.
+        self.history_days = {}
+        self.history_day_index = []
+
+        # Filter the call history is viewed through (see pages), or None for
+        # every call. The backend filters the pages it sends, but one that
+        # doesn't know how sends every call, so then the pages are filtered
+        # here instead (history_filter_local). The rows shown no longer line
+        # up with the backend's offsets then, so history_filter_next is the
+        # backend offset of the next page to ask for.
+        self.history_filter = None
+        self.history_filter_choices = []
+        self.history_filter_local = False
+        self.history_filter_next = 0
+
+        # Pages that have been requested by offset and are still outstanding,
+        # keyed by (topic, offset) with the time the request was made
+        self.page_requests = {}
+
         # Function to call based on what pin on the pi received a falling edge (button push)
         self.button_handler_dict = {29:self.selectHandler,
                                     31:self.upHandler,
                                     33:self.downHandler,
                                     35:self.backHandler}
 
+        # Direction to move in when up or down is held for fast navigation
+        self.jump_direction_dict = {31:-1,
+                                    33:1}
+
         # Function to call based on what pin on the pi received either edge (switch flip)
         self.switch_handler_dict = {37:self.wildcardSWHandler,
                                     40:self.filterSWHandler}
@@ -136,9 +451,6 @@ class FrontEnd(wx.Frame):
         # Setup GPIO pins for LCD and buttons
         self.setupGPIO()
 
-        # Center the GUI on the display
-        self.Centre()
-
         # Load the other GUI elements
         self.setupGUIElements()
 
@@ -151,26 +463,46 @@ class FrontEnd(wx.Frame):
                                   4:self.fifthTextBox}
 
         # Display a loading message until call history is loaded
-        self.firstTextBox.SetValue('\nLoading Call History...')
+        self.firstTextBox.SetValue(render_cache.LOADING_HISTORY)
+
+        # Start the reader threads. Incoming calls get a pipe of their own so
+        # they never wait behind pages of call history or the blacklist
+        self.reader_pipe, reader_child_pipe = self.makeTransport(transport, True)
+        self.call_pipe, call_child_pipe = self.makeTransport(transport, False)
+        self.reader_proc = Process(target=self.readerThreads, args=(reader_child_pipe, call_child_pipe))
+        self.reader_proc.start()
 
-        # Start the reader threads
-        self.reader_pipe, reader_child_pipe = Pipe()
-        reader_proc = Process(target=self.readerThreads, args=(reader_child_pipe,))
-        reader_proc.start()
+        # Sizes history and blacklist pages from the scroll speed and the
+        # backend's round-trip time
+        self.pager = AdaptivePager()
 
-        # Start a thread to watch for messages from the pipe
-        msg_proc = Thread(target=self.checkForMessages, args=(self.reader_pipe,))
+        # Start a thread to watch for messages from the pipes
+        msg_proc = Thread(target=self.checkForMessages, args=(self.reader_pipe, self.call_pipe), name='checkForMessages')
         msg_proc.start()
 
+        # The profiler samples the GUI thread and the message thread when it
+        # is switched on by SIGUSR1 (which is passed on to the reader process)
+        # or by the control topic
+        self.profiler = SamplingProfiler('gui', log=self.log)
+        self.profiler.watch(current_thread().ident, 'gui')
+        self.profiler.watch(msg_proc.ident, 'checkForMessages')
+        signal.signal(signal.SIGUSR1, self.profileSignalHandler)
+        signal.signal(signal.SIGTERM, self.terminateSignalHandler)
+
         # Ask the backend for the display idle timeout value
         self.sendMessage('setting_get', 'Display timeout', True)
 
         # Ask the backend for a call history of 10 elements to start with
         self.setupCallHistory()
 
-        # Create a wx event timer to constantly poll for new nsq messages
-        self.timer = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, self.onTimer)
+        # Create a timer to constantly poll for new nsq messages. Without X
+        # the framebuffer's MainLoop runs it instead of wx.
+        if self.renderer == 'framebuffer':
+            self.timer = fb_display.FramebufferTimer(self.onTimer)
+        else:
+            import wx
+            self.timer = wx.Timer(self.window)
+            self.window.Bind(wx.EVT_TIMER, self.onTimer)
         self.timer.Start(500)
 
     def onTimer(self, event):
@@ -192,24 +524,18 @@ class FrontEnd(wx.Frame):
         # Global variables that indicate when to update the GUI and also hold nsq messages
         global UPDATE, CALL_REC, CALL_REC_MSG, LOAD_HIST, BTN_EVENT, SW_EVENT
 
-        # Turn off the backlight if the user has not pushed a button in the timeout
-        elapsed_time = datetime.now() - self.on_time
-        if elapsed_time.total_seconds() > self.timeout:
-            self.turnOnBacklight(False)
-
-        # Every 60 seconds, check the switches to make sure they haven't changed
-        if (datetime.now() - self.switch_state_time).total_seconds() > 60:
-            self.sendMessage('setting_set','Wildcards:{}'.format('Disabled' if GPIO.input(37) else 'Enabled'), False)
-            self.sendMessage('setting_set','Filter Disable:{}'.format('Disabled' if GPIO.input(40) else 'Enabled'), False)
-            self.switch_state_time = datetime.now()
-
-        # Every 3 minutes, if we haven't seen a heartbeat messgae from the backend,
-        # assume the backend is dead. Prompt the user to reboot
-        if (datetime.now() - self.heartbeat_timer).total_seconds() > 180:
-            self.firstTextBox.SetValue('\nA fatal error has occured')
-            self.secondTextBox.SetValue('\nPress any key to reboot')
-            self.thirdTextBox.SetValue('')
-            self.fatal_error = True
+        # Run any timeouts that are due (backlight, switch resync, stats,
+        # heartbeat and the incoming call screen)
+        self.scheduler.runDue()
+
+        # If up or down is being held, jump by day or page every HOLD_DELAY
+        # seconds until it is let go (the buttons read high when released)
+        if self.held_button is not None:
+            if GPIO.input(self.held_button):
+                self.held_button = None
+            elif monotonic() - self.held_time > HOLD_DELAY:
+                self.jumpHandler(self.jump_direction_dict[self.held_button])
+                self.held_time = monotonic()
 
         # If we have to update the GUI, do it here
         if UPDATE:
@@ -218,20 +544,45 @@ class FrontEnd(wx.Frame):
 
         # Otherwise, if we are receiving a call...
         elif CALL_REC:
-            # Get the incoming call info, format it, and display it on the screen
+            # Take every call that has come in since the last tick. Only the
+            # latest is shown, the others (and any call already on screen) are
+            # counted so the user knows they were missed.
+            with self.call_lock:
+                calls = self.call_queue
+                self.call_queue = []
+                CALL_REC = False
+            if self.scheduler.pending('call_display'):
+                self.calls_missed += 1
+            self.calls_missed += len(calls) - 1
+
+            # CALL_REC_MSG is only written here, on the GUI thread, so the call
+            # on screen is always the one "Select" blacklists
+            CALL_REC_MSG = calls[-1]
+            self.scheduler.schedule('call_display', CALL_DISPLAY_TIME, self.endCallDisplay)
+            stamp = datetime.now().strftime('%Y%m%dT%H%M')
+            self.new_calls.extend((call, stamp) for call in calls)
+
+            # Look up the caller before this call is counted, then count them all
             msg_list = CALL_REC_MSG.split(':')
-            num = '{} ({}) {} - {}'.format(msg_list[0][:1],msg_list[0][1:4],msg_list[0][4:7],msg_list[0][-4:])
-            self.firstTextBox.SetValue('\nIncoming Call From')
+            above, below = render_cache.formatCallerContext(self.callers.lookup(msg_list[0]))
+            for call in calls:
+                self.callers.record(call.split(':')[0], stamp)
+
+            # Get the incoming call info, format it, and display it on the screen
+            num = render_cache.formatNumber(msg_list[0])
+            if self.calls_missed:
+                self.firstTextBox.SetValue('{}\nIncoming Call From (+{} more)\n{}'.format(above, self.calls_missed, below))
+            else:
+                self.firstTextBox.SetValue('{}\nIncoming Call From\n{}'.format(above, below))
             self.secondTextBox.SetValue('{}\n{}'.format(msg_list[1],num))
             self.thirdTextBox.SetValue(u'Press the "Select" button to block this caller!')
-            CALL_REC = False
 
         # Otherwise, if we are loading the call history, indicate on the display and
         # request it from the backend.
         elif LOAD_HIST:
             self.selecting_setting = False
             self.using_settings = False
-            self.firstTextBox.SetValue('\nLoading Call History...')
+            self.firstTextBox.SetValue(render_cache.LOADING_HISTORY)
             self.secondTextBox.SetValue('')
             self.thirdTextBox.SetValue('')
             self.loadCallHistory()
@@ -240,6 +591,15 @@ class FrontEnd(wx.Frame):
         # Otherwise, if we received a button press, call the function accordingly
         elif BTN_EVENT:
             self.button_handler_dict[BTN_EVENT]()
+            # Remember up/down presses so that holding them switches to fast navigation
+            if BTN_EVENT in self.jump_direction_dict:
+                self.held_button = BTN_EVENT
+                self.held_time = monotonic()
+
+            # Let the soak test know its press was handled
+            if self.press_seq is not None:
+                self.publishStats('press', {'pin': BTN_EVENT, 'seq': self.press_seq})
+                self.press_seq = None
             BTN_EVENT = None
 
         # Otherwise, if we received a switch flip, call the function accordingly
@@ -247,8 +607,41 @@ class FrontEnd(wx.Frame):
             self.switch_handler_dict[SW_EVENT]()
             SW_EVENT = None
 
-        # Reset the timer to fire again in 5 milliseconds (so we don't hog the processor)
-        self.timer.Start(5)
+        # Come back straight away while there is more to handle. Otherwise
+        # sleep until the next deadline, as the threads that set the events
+        # wake the timer themselves.
+        if UPDATE or CALL_REC or LOAD_HIST or BTN_EVENT or SW_EVENT or self.held_button is not None:
+            self.timer.Start(TIMER_TICK)
+        else:
+            delay = self.scheduler.nextDelay()
+            delay = TIMER_MAX_WAIT if delay is None else min(delay, TIMER_MAX_WAIT)
+            self.timer.Start(max(TIMER_TICK, int(delay * 1000)))
+
+    def wakeTimer(self):
+        '''
+            function:
+                wakeTimer: This function makes onTimer run as soon as it can.
+                           It is called from the GPIO and message threads when
+                           they set an event for the GUI, and by the scheduler
+                           when a sooner deadline is set. It is safe to call
+                           from any thread.
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        if self.timer is None:
+            return
+        if self.renderer == 'framebuffer':
+            self.timer.Wake()
+        else:
+            import wx
+            wx.CallAfter(self.timer.Start, TIMER_TICK)
 
     def setupGPIO(self):
         '''
@@ -285,8 +678,10 @@ class FrontEnd(wx.Frame):
             # variable to the pin number of the button that was pushed
             global BTN_EVENT
             self.turnOnBacklight(True)
-            print 'Got button press: {}'.format(channel)
+            self.log.info('button', 'Got button press', pin=channel)
+            self.recorder.record('button', pin=channel)
             BTN_EVENT = channel
+            self.wakeTimer()
 
         def switchHandler(channel):
             '''
@@ -306,8 +701,10 @@ class FrontEnd(wx.Frame):
             # variable to the pin number of the switch that was flipped
             global SW_EVENT
             self.turnOnBacklight(True)
-            print 'Got switch event: {}'.format(channel)
+            self.log.info('switch', 'Got switch event', pin=channel)
+            self.recorder.record('switch', pin=channel)
             SW_EVENT = channel
+            self.wakeTimer()
 
         # Set the pi to use pin numbers instead of BCM numbers
         GPIO.setmode(GPIO.BOARD)
@@ -396,42 +793,83 @@ class FrontEnd(wx.Frame):
         # Otherwise, if the user selected "Settings"...
         elif self.menu_ptr == 0 and not self.using_settings and not self.using_blacklist:
             # Reset the pointers and request the settings
+            self.pushScreen()
             self.using_settings = True
             self.menu_ptr = 0
             self.current_selected_text_box = 0
             self.current_top_ptr = 0
             self.end_of_settings_ptr = 1
-            self.firstTextBox.SetValue('\nLoading Current Settings...')
+            self.firstTextBox.SetValue(render_cache.LOADING_SETTINGS)
             self.secondTextBox.SetValue('')
             self.thirdTextBox.SetValue('')
+            self.changeScreen()
             self.sendMessage('settings_request_all', 'no', True)
 
         # Otherwise, if the user is looking at the blacklist warning message
         elif self.showing_warning:
-            self.sendMessage('blacklist_remove', self.unformatNumber(self.blacklist[self.menu_ptr]), False)
-            self.firstTextBox.SetValue('\nLoading Blacklist...')
-            self.thirdTextBox.SetValue('')
-            self.sendMessage('blacklist_get','10:0',True)
             self.showing_warning = False
             self.using_blacklist = True
-            self.blacklist = []
+
+            # If they confirmed removing the marked numbers, send them all at once
+            if self.blacklist_marking:
+                self.removeMarkedEntries()
+
+            # Otherwise tell the backend to remove the number and drop it from
+            # our copy of the blacklist so the user keeps their place in the list
+            else:
+                self.sendMessage('blacklist_remove', self.blacklistNumber(self.blacklist[self.menu_ptr]), False)
+                self.removeBlacklistEntries([self.menu_ptr])
+
+        # Otherwise, if the user selects the top of the blacklist, start marking
+        # numbers, or ask to remove the ones they marked
+        elif self.using_blacklist and self.menu_ptr == 0:
+            if not self.blacklist_marking:
+                self.blacklist_marking = True
+                self.blacklist[0] = render_cache.formatMarkingHeader(0)
+                self.setValues()
+            elif not self.blacklist_marked:
+                self.stopMarking()
+            else:
+                count = len(self.blacklist_marked)
+                self.showing_warning = True
+                self.firstTextBox.SetValue('Are you sure you want to remove these {} numbers from the blacklist?'.format(count)
+                                           if count > 1 else 'Are you sure you want to remove this number from the blacklist?')
+                self.secondTextBox.SetValue('Press "Select" to confirm or "Back" to cancel')
+                self.thirdTextBox.SetValue('')
+
+        # Otherwise, if the user is marking numbers, mark or unmark this one
+        elif self.using_blacklist and self.blacklist_marking and self.blacklist[self.menu_ptr].strip() not in ('End of Blacklist', 'Loading...'):
+            number = self.blacklistNumber(self.blacklist[self.menu_ptr])
+            if number in self.blacklist_marked:
+                self.blacklist_marked.discard(number)
+            else:
+                self.blacklist_marked.add(number)
+            self.blacklist[self.menu_ptr] = self.formatBlacklistItem(number)
+            self.blacklist[0] = render_cache.formatMarkingHeader(len(self.blacklist_marked))
+            self.setValues()
 
         # Otherwise, if the user is removing an number from the blacklist
-        elif self.using_blacklist and self.blacklist[self.menu_ptr].strip() != 'End of Blacklist' and self.menu_ptr != 0:
+        elif self.using_blacklist and self.blacklist[self.menu_ptr].strip() not in ('End of Blacklist', 'Loading...') and self.menu_ptr != 0:
             self.showing_warning = True
             self.firstTextBox.SetValue('Are you sure you want to remove this number from the blacklist?')
             self.secondTextBox.SetValue('Press "Select" to confirm or "Back" to cancel')
             num = self.blacklist[self.menu_ptr]
             self.thirdTextBox.SetValue(self.blacklist[self.menu_ptr])
 
-        # Othwise, if the user tries to remove the top index (which is invalid)
-        elif self.using_blacklist and (self.menu_ptr == 0 or self.blacklist[self.menu_ptr].strip() == 'End of Blacklist'):
+        # Othwise, if the user tries to remove "End of Blacklist" (which is invalid)
+        elif self.using_blacklist and self.blacklist[self.menu_ptr].strip() in ('End of Blacklist', 'Loading...'):
             return
 
         # Otherwise, if the user is selecting one of the setting states...
         elif self.selecting_setting:
             # If the user did not pick something that's not a setting state...
             if self.setting_state_list[self.menu_ptr].strip() != 'End of List':
+                # The history filter isn't a backend setting, so just show
+                # the history through the filter picked
+                if self.state_name == HISTORY_FILTER_SETTING:
+                    self.setHistoryFilter(self.history_filter_choices[self.menu_ptr])
+                    return
+
                 # Reset the pointers and tell the backend to save this setting
                 self.selecting_setting = False
                 state = self.setting_state_list[self.menu_ptr].strip()
@@ -439,23 +877,12 @@ class FrontEnd(wx.Frame):
                 # If the setting state is display timeout, set the timeout value in memory as well
                 if self.state_name == 'Display timeout':
                     self.timeout = int(state)
-                    self.on_time = datetime.now()
+                    self.turnOnBacklight(True)
 
-                # Send the message to the backiend and reset the pointers
+                # Send the message to the backend and go back to the settings
+                # where the user left them
                 self.sendMessage('setting_set', '{}:{}'.format(self.state_name, state), False)
-                self.menu_ptr = 0
-                self.current_selected_text_box = 0
-                self.current_top_ptr = 0
-
-                # Hide the 2 displays if they are showing
-                self.sizer.Hide(self.fourthTextBox)
-                self.sizer.Hide(self.fifthTextBox)
-
-                # Show the settings again
-                self.firstTextBox.SetValue(self.settings_list[self.menu_ptr])
-                self.secondTextBox.SetValue(self.settings_list[self.menu_ptr+1])
-                self.thirdTextBox.SetValue(self.settings_list[self.menu_ptr+2])
-                self.highlightBox(self.firstTextBox)
+                self.popScreen()
 
         # Otherwise, if the user is selecting one of the settings...
         elif self.using_settings:
@@ -463,31 +890,41 @@ class FrontEnd(wx.Frame):
             if self.settings_list[self.menu_ptr].strip() != 'End of Settings':
                 # If the user selects the Blacklist option, get the blacklist from the backend
                 if self.settings_list[self.menu_ptr].strip() == 'Blacklist':
-                    self.sendMessage('blacklist_get','10:0',True)
+                    self.pushScreen()
+                    self.changeScreen()
+                    self.sendMessage('blacklist_get',self.pageRequest(0),True)
                     self.menu_ptr = 0
                     self.current_selected_text_box = 0
                     self.current_top_ptr = 0
                     self.using_blacklist = True
-                    self.firstTextBox.SetValue('\nLoading Blacklist...')
+                    self.blacklist_marking = False
+                    self.blacklist_marked = set()
+                    self.firstTextBox.SetValue(render_cache.LOADING_BLACKLIST)
                     self.secondTextBox.SetValue('')
                     self.thirdTextBox.SetValue('')
 
+                # If the user selects the history filter, show the filters
+                elif self.settings_list[self.menu_ptr].strip() == HISTORY_FILTER_SETTING:
+                    self.showHistoryFilters()
+
                 else:
                     # Request the setting states from the backend and get
                     # ready to display them
+                    self.pushScreen()
+                    self.changeScreen()
                     self.sendMessage('setting_get', self.settings_list[self.menu_ptr].strip(),True)
                     # Reset the pointers
                     self.menu_ptr = 0
                     self.current_selected_text_box = 1
                     self.current_top_ptr = 0
                     self.selecting_setting = True
-                    self.sizer.Show(self.fourthTextBox)
-                    self.sizer.Show(self.fifthTextBox)
-                    self.fourthTextBox.SetValue('\n\nLoading Selected Setting...')
+                    self.showStateBoxes(True)
+                    self.fourthTextBox.SetValue(render_cache.LOADING_SETTING)
                     self.fifthTextBox.SetValue('')
 
-        # Don't let the user do anything on "End of Call History" or "Caller Blacklisted!"
-        elif self.menu_items_list[self.menu_ptr].strip() == 'End of Call History' or self.menu_items_list[self.menu_ptr].strip() == 'Caller blacklisted!':
+        # Don't let the user do anything on "End of Call History", "Caller Blacklisted!"
+        # or a row whose page hasn't loaded yet
+        elif self.menu_items_list[self.menu_ptr].strip() in ('End of Call History', 'Caller blacklisted!', 'Loading...'):
             return
 
         # else we are blacklisting a call from the history
@@ -500,7 +937,7 @@ class FrontEnd(wx.Frame):
             nodigs = all.translate(all, string.digits)
             numToBlacklist = menuStr.translate(all, nodigs) + ':' + nameStr.replace(' ','')
             self.sendMessage('call_blacklist', numToBlacklist, False)
-            self.menu_items_list[self.menu_ptr] = '{}\nCaller blacklisted!\n{}'.format(self.line_space, self.line_space)
+            self.menu_items_list[self.menu_ptr] = render_cache.BLACKLISTED_ROW
             self.setValues()
 
     def upHandler(self):
@@ -540,6 +977,7 @@ class FrontEnd(wx.Frame):
                 if self.current_selected_text_box != 0:
                     self.current_selected_text_box-=1
                 self.menu_ptr-=1
+                self.pager.recordScroll()
 
             # Update the values in the text boxes
             self.setValues()
@@ -584,13 +1022,15 @@ class FrontEnd(wx.Frame):
                 if self.current_selected_text_box != 2:
                     self.current_selected_text_box+=1
                 self.menu_ptr+=1
+                self.pager.recordScroll()
 
             # If the user wants to go further, then request more call history
             elif not self.end_of_call_history and not self.waiting_for_message and not self.using_settings and not self.using_blacklist:
-                self.sendMessage('history_get','10:{}'.format(len(self.menu_items_list)-1),True)
+                offset = self.history_filter_next if self.history_filter_local else len(self.menu_items_list)-1
+                self.sendMessage('history_get',self.historyRequest(offset),True)
 
             elif self.using_blacklist and not self.end_of_blacklist and not self.waiting_for_message and not self.using_settings:
-                self.sendMessage('blacklist_get','10:{}'.format(len(list_to_use)-1),True)
+                self.sendMessage('blacklist_get',self.pageRequest(len(list_to_use)-1),True)
 
             # Update the values in the text boxes
             self.setValues()
@@ -618,10 +1058,13 @@ class FrontEnd(wx.Frame):
             if self.showing_warning:
                 self.showing_warning = False
                 self.using_blacklist = True
-                self.menu_ptr = 0
-                self.current_selected_text_box = 0
-                self.current_top_ptr = 0
                 self.setValues()
+                return
+
+            # If the user is marking blacklist numbers, stop and stay on the blacklist
+            if self.using_blacklist and self.blacklist_marking:
+                self.stopMarking()
+                return
 
             # If the error message is showing, reset the menu to its current list
             if self.showing_error_message:
@@ -633,40 +1076,23 @@ class FrontEnd(wx.Frame):
             if self.fatal_error:
                system('sudo reboot')
 
-            # If the user is looking at the blacklist...
-            elif self.using_blacklist:
-                self.using_blacklist = False
-                self.using_settings = True
-                self.menu_ptr = 0
-                self.current_selected_text_box = 0
-                self.current_top_ptr = 0
-                self.setValues()
+            # Go back to the screen the user came from, just as they left it
+            elif self.popScreen():
+                pass
 
-            # If the user is picking a setting state...
-            elif self.selecting_setting:
-                # Reset the pointers and go back to settings
-                self.menu_ptr = 0
-                self.current_selected_text_box = 0
-                self.current_top_ptr = 0
-                self.selecting_setting = False
-                self.sizer.Hide(self.fourthTextBox)
-                self.sizer.Hide(self.fifthTextBox)
-                self.firstTextBox.SetValue(self.settings_list[0])
-                self.secondTextBox.SetValue(self.settings_list[1])
-                self.thirdTextBox.SetValue(self.settings_list[2])
-                self.highlightBox(self.firstTextBox)
-
-            # Otherwise, if the user is selecting settings...
+            # Otherwise, if the user is selecting settings (and somehow didn't
+            # come from the call history)...
             elif self.using_settings:
                 # Get the call history again
                 self.using_settings = False
                 self.menu_ptr = 1
                 self.current_selected_text_box = 0
                 self.current_top_ptr = 1
-                self.firstTextBox.SetValue('\nLoading Call History...')
+                self.firstTextBox.SetValue(render_cache.LOADING_HISTORY)
                 self.secondTextBox.SetValue('')
                 self.thirdTextBox.SetValue('')
-                self.sendMessage('history_get','10:0',True)
+                self.changeScreen()
+                self.sendMessage('history_get',self.historyRequest(0),True)
 
     def turnOnBacklight(self, on):
         '''
@@ -683,14 +1109,40 @@ class FrontEnd(wx.Frame):
                 None
         '''
 
-        # Turn on or off the backlight accordingly and reset the time
+        # Turn on or off the backlight accordingly and restart the timeout
         if on:
             GPIO.output(self.lcd_gpio, GPIO.HIGH)
-            self.on_time = datetime.now()
+            self.on_time = monotonic()
+            self.scheduler.scheduleAt('backlight', self.on_time + self.timeout, self.turnOnBacklight, False)
         else:
             GPIO.output(self.lcd_gpio, GPIO.LOW)
 
-    def checkForMessages(self, reader_pipe=None):
+    def makeTransport(self, transport, duplex):
+        '''
+            function:
+                makeTransport: This function makes the connection the reader
+                               process sends messages to the GUI through. A
+                               shared memory ring that can't be made falls back
+                               to a Pipe.
+
+            args:
+                transport: 'pipe' or 'shm'
+                duplex: whether a Pipe should be two-way, as for Pipe()
+
+            returns:
+                tuple: the GUI's end and the reader process's end
+
+            raises:
+                None
+        '''
+        if transport == 'shm':
+            try:
+                return RingPipe()
+            except (EnvironmentError, ValueError) as e:
+                self.log.warning('transport', 'Could not make a shared memory ring, using a pipe', error=e)
+        return Pipe(duplex)
+
+    def checkForMessages(self, reader_pipe=None, call_pipe=None):
         '''
             function:
                 checkForMessages: This function polls for new nsq messages and handles
@@ -698,6 +1150,8 @@ class FrontEnd(wx.Frame):
 
             args:
                 reader_pipe: Pipe object to pull messages from
+                call_pipe: Pipe object to pull incoming calls from. It is always
+                           emptied before the next message on reader_pipe
 
             returns:
                 None
@@ -705,41 +1159,97 @@ class FrontEnd(wx.Frame):
             raises:
                 None
         '''
-        global UPDATE, CALL_REC, CALL_REC_MSG, LOAD_HIST, CALL_INC, BLACK_GIVE
+        global UPDATE, CALL_REC, CALL_REC_MSG, LOAD_HIST, CALL_INC, BLACK_GIVE, BTN_EVENT
 
-        # Constantly poll for new messages
+        # Constantly wait for new messages
         while True:
+            # Sleep until the reader process sends something
+            if not call_pipe.poll() and not reader_pipe.poll():
+                waitForAny([call_pipe, reader_pipe], MESSAGE_WAIT)
+
+            # Incoming calls skip ahead of everything else
+            while call_pipe.poll():
+                self.recorder.record('in', 'call_rec')
+                self.queueCall(call_pipe.recv()[1])
+
             if reader_pipe.poll():
                 msg = reader_pipe.recv()
-                if msg[0] == 'hist_give':
-                    # Make a list of all elements
-                    msg_list = msg[1].split(':')
+                self.recorder.record('in', msg[0])
+
+                # Replies to requests made for a screen the user has since left
+                # are dropped before any work is done on them
+                if self.isStale(msg[0]):
+                    self.log.info('stale', 'Dropping stale message', reply=msg[0])
+
+                # If this is the top of the history asked for to check the calls
+                # put there, check them instead of treating it as a new history
+                elif msg[0] == 'hist_give' and self.history_verify is not None and msg[1].offset == 0:
+                    self.verifyHistoryHead(msg[1])
+                    self.waiting_for_message = False
+                    UPDATE = True
+
+                # If the backend sent calls the history filter leaves out, it
+                # doesn't know about filters, so filter its pages here
+                elif msg[0] == 'hist_give' and self.history_filter and self.ignoresFilter(msg[1]):
+                    self.loadFilteredPage(msg[1])
+                    self.waiting_for_message = False
+                    UPDATE = True
+
+                elif msg[0] == 'hist_give':
+                    # The reader process has already decoded and formatted the page
+                    page = msg[1]
+                    offset = page.offset
+                    self.page_requests.pop(('history_get', offset), None)
+                    self.pager.replyReceived(('history_get', offset))
+                    self.list_loaded['history'] = monotonic()
+                    refreshing = offset == self.history_refresh_offset
+                    if refreshing:
+                        self.history_refresh_offset = None
+
                     # If we receive an unrequested message history...
-                    if msg_list[1] == '0' and not msg_list[0] == '0':
+                    if offset == 0 and page.count != 0 and not refreshing:
                         # Reset the menu pointers and reload the history
-                        self.menu_items_list = ['{}\nSettings\n{}'.format(self.line_space,self.line_space)]
+                        self.menu_items_list = [self.historyHeader()]
                         self.menu_ptr = 1
                         self.current_selected_text_box = 0
                         self.current_top_ptr = 1
                         self.using_settings = False
                         self.selecting_setting = False
                         self.end_of_call_history = False
+                        self.history_days = {}
+                        self.nav_stack = []
                     
                     # If the backend says there's no more history...
-                    if msg_list[0] == '0':
+                    if page.count == 0:
                         # Display "End of Call History" as the last element
                         self.end_of_call_history = True
-                        self.menu_items_list.append('{}\nEnd of Call History\n{}'.format(self.line_space,self.line_space))
-                    # Otherwise, ask for 10 more elements based on an offset of the last
-                    # element that is loaded
+                        del self.menu_items_list[offset+1:]
+                        self.menu_items_list.append(render_cache.END_OF_HISTORY_ROW)
+                        if not self.using_settings and not self.using_blacklist:
+                            self.clampPointers(self.menu_items_list)
+                    # Otherwise, put the page in place at its offset (normally the
+                    # end of what is loaded, but fast navigation can ask for pages
+                    # further along)
                     else:
-                        for item in range(2,int(msg_list[0])+2):
-                            sub_msg_list = msg_list[item].split(';')
-                            menu_item = self.formatMenuItem(sub_msg_list[0], sub_msg_list[1], sub_msg_list[2], sub_msg_list[3])
-                            if menu_item == 'BLOCKED':
-                                self.menu_items_list.append('{}\n{}\n{}'.format(self.line_space, menu_item, self.line_space))
-                            else:
-                                self.menu_items_list.append(menu_item)
+                        rows = page.rows
+                        for index, call in enumerate(page.items):
+                            self.callers.record(call.number, call.time, call.blocked == '1')
+                            self.history_days[offset+index] = call.time[:8]
+                        self.splicePage(self.menu_items_list, offset, rows)
+
+                        # Calls that came in since the rest of the history was
+                        # loaded push it down, so after a refresh drop what is
+                        # below the page and load it again on the way down
+                        if refreshing:
+                            end = offset + len(rows)
+                            del self.menu_items_list[end+1:]
+                            for day_offset in [day_offset for day_offset in self.history_days if day_offset >= end]:
+                                del self.history_days[day_offset]
+                            self.end_of_call_history = False
+                            if not self.using_settings:
+                                self.clampPointers(self.menu_items_list)
+                        self.indexHistoryDays()
+                        self.trimList(self.menu_items_list, MAX_HISTORY_ENTRIES)
 
                     # Indicate that the message is received and load the GUI values
                     self.waiting_for_message = False
@@ -750,14 +1260,21 @@ class FrontEnd(wx.Frame):
                     msg_list = msg[1].split(':')
                     self.settings_list = []
 
-                    # Make Blacklist the first setting
-                    self.settings_list.append('{}\nBlacklist\n{}'.format(self.line_space,self.line_space))
+                    # Make Blacklist the first setting, then the history filter
+                    # (which is kept by the frontend, not the backend)
+                    self.settings_list.append(render_cache.BLACKLIST_ROW)
+                    self.settings_list.append(render_cache.HISTORY_FILTER_ROW)
 
                     # Format each setting and put them into the list
                     for setting in msg_list:
-                        self.settings_list.append('{}\n{}\n{}'.format(self.line_space,setting,self.line_space))
+                        self.settings_list.append(render_cache.row(setting))
                         self.end_of_settings_ptr += 1
-                    self.settings_list.append('{}\nEnd of Settings\n{}'.format(self.line_space,self.line_space))
+                    self.settings_list.append(render_cache.END_OF_SETTINGS_ROW)
+                    self.list_loaded['settings'] = monotonic()
+
+                    # A refresh after Back keeps the pointers, so keep them on the list
+                    if self.using_settings and not self.using_blacklist and not self.selecting_setting:
+                        self.clampPointers(self.settings_list)
 
                     # Indicate that the message is received and load the GUI values
                     self.waiting_for_message = False
@@ -781,10 +1298,10 @@ class FrontEnd(wx.Frame):
                     for state in states_list:
                         if state == msg_list[2]:
                             state = state + " *"
-                        self.setting_state_list.append('{}\n{}\n{}'.format(self.line_space,state,self.line_space))
+                        self.setting_state_list.append(render_cache.row(state))
                     
                     # Add "End of List" as the last entry
-                    self.setting_state_list.append('{}\nEnd of List\n{}'.format(self.line_space,self.line_space))
+                    self.setting_state_list.append(render_cache.END_OF_LIST_ROW)
                     
                     # Indicate that the message has been received and load the GUI values
                     self.waiting_for_message = False
@@ -793,14 +1310,13 @@ class FrontEnd(wx.Frame):
                     if self.first_timeout_message:
                         self.timeout = int(msg_list[2])
                         self.first_timeout_message = False
+                        self.scheduler.scheduleAt('backlight', self.on_time + self.timeout, self.turnOnBacklight, False)
                     else:
                         UPDATE = True
 
                 # If the message is of topic "call received" set the global
                 elif msg[0] == 'call_rec':
-                    CALL_INC = True
-                    CALL_REC_MSG = msg[1]
-                    CALL_REC = True
+                    self.queueCall(msg[1])
 
                 # If the message is of topic "load history" set the global
                 elif msg[0] == 'load_hist':
@@ -809,11 +1325,28 @@ class FrontEnd(wx.Frame):
                 # If the message is of topic "Blacklist give" set the global
                 elif msg[0] == 'black_give':
                     self.load_blacklist(msg[1])
-                    UPDATE = True
+                    # Don't draw over the removal warning if a resync page lands under it
+                    if not self.showing_warning:
+                        UPDATE = True
+
+                # If a page from the backend couldn't be decoded, stop waiting
+                # for it so it is asked for again
+                elif msg[0] == 'bad_page':
+                    self.pageFailed(*msg[1])
+                    if not self.showing_error_message:
+                        UPDATE = True
 
                 # If the message is a heartbeat, reset the timer
                 elif msg[0] == 'heartbeat':
-                    self.heartbeat_timer = datetime.now()
+                    self.backendAlive()
+
+                # If the message is an answer to a ping, use its round-trip time
+                # for the page sizes. It shows the backend is alive too.
+                elif msg[0] == 'pong':
+                    rtt = self.ping.pong(msg[1])
+                    if rtt is not None:
+                        self.pager.recordRTT(rtt)
+                        self.backendAlive()
 
                 # IF the message is of topic "error" Display the error
                 elif msg[0] == 'error':
@@ -821,17 +1354,52 @@ class FrontEnd(wx.Frame):
                     self.firstTextBox.SetValue('\nAn Error has occurred!')
                     self.secondTextBox.SetValue(msg[1])
                     self.thirdTextBox.SetValue('Press any key to continue...')
-                    
-            time.sleep(0.05)
 
-    def load_blacklist(self, msg):
+                # If the message is of topic "profile" start profiling for the given time
+                elif msg[0] == 'profile':
+                    self.profiler.start(int(msg[1]))
+
+                # If the message is of topic "memory" report memory use now, with
+                # a snapshot. That is tracemalloc's if tracing was started by an
+                # earlier one, and counts of objects by type on Python 2.
+                elif msg[0] == 'memory':
+                    tracing = memstats.startTracing()
+                    try:
+                        path = memstats.writeSnapshot('gui')
+                        self.log.info('memory', 'Wrote memory snapshot', path=path,
+                                      kind='tracemalloc' if tracing else 'gc objects')
+                    except (IOError, OSError) as e:
+                        self.log.error('memory', 'Could not write memory snapshot', error=e)
+                    self.scheduler.schedule('stats_now', 0, self.reportMemoryStats)
+
+                # If the message is of topic "flight" dump the flight recorder
+                elif msg[0] == 'flight':
+                    self.dumpFlightRecorder('requested on the control topic')
+
+                # If the message is of topic "press" press the button the same
+                # way the GPIO callback does, so a press that lands before the
+                # last one is handled replaces it just like on the hardware
+                elif msg[0] == 'press':
+                    pin, seq = int(msg[1][0]), msg[1][1]
+                    if pin in self.button_handler_dict:
+                        self.turnOnBacklight(True)
+                        self.recorder.record('button', pin=pin, seq=seq)
+                        self.press_seq = seq
+                        BTN_EVENT = pin
+
+            # Wake the GUI if there is something for it to do now
+            if UPDATE or CALL_REC or LOAD_HIST or BTN_EVENT:
+                self.wakeTimer()
+
+    def changeScreen(self):
         '''
             function:
-                load_blacklist: This function loads the blacklist and displays it
-                                on the GUI
+                changeScreen: This function marks that the user moved to a
+                              different screen, so that replies to requests made
+                              for the old one get dropped
 
             args:
-                msg: nsq message that contains the data
+                None
 
             returns:
                 None
@@ -839,245 +1407,1894 @@ class FrontEnd(wx.Frame):
             raises:
                 None
         '''
-
-        # Get the list and split it by ":"
-        msg_list = msg.split(':')
-        if msg_list[1] == '0' and not msg_list[0] == '0':
-            # Reset the menu pointers and reload the history
-            self.blacklist = ['  Press "Select" on any of these\nnumbers to remove them from the\n           blacklist.           ']
-            self.menu_ptr = 0
-            self.current_selected_text_box = 0
-            self.current_top_ptr = 0
-            self.using_settings = False
-            self.selecting_setting = False
-            self.end_of_blacklist = False
-        
-        # If the backend says there's no more history...
-        if msg_list[0] == '0':
-            # Display "End of Call History" as the last element
-            self.end_of_blacklist = True
-            self.blacklist.append('{}\nEnd of Blacklist\n{}'.format(self.line_space,self.line_space))
-        # Otherwise, ask for 10 more elements based on an offset of the last
-        # element that is loaded
-        else:
-            numbers = msg_list[2].split(';')
-            for number in numbers:
-                self.blacklist.append('{}\n{} ({}) {} - {}\n{}'.format(self.line_space,number[:1],number[1:4],number[4:7],number[-4:],self.line_space))
-
-        # Indicate that the message is received and load the GUI values
-        self.waiting_for_message = False
-
-    def readerThreads(self, pipe):
+        self.recorder.record('screen', 'leave', screen=self.currentScreen())
+        self.screen_generation += 1
+        self.page_requests = {}
+        self.blacklist_resync_offset = None
+        self.history_refresh_offset = None
+
+        # The reply to a check of new calls will be dropped now, so have the
+        # history refreshed when the user next comes back to it
+        if self.history_verify is not None:
+            self.history_verify = None
+            self.list_loaded.pop('history', None)
+
+    def isStale(self, reply):
         '''
-        function:
-            setupThreads: This function sets up and starts all of the reader threads
+            function:
+                isStale: This function checks whether a reply from the backend was
+                         requested for a screen that is no longer showing
 
-        args:
-            None
+            args:
+                reply: the kind of message received (e.g. hist_give)
 
-        returns:
-            None
+            returns:
+                bool: True if the reply should be dropped
 
-        raises:
-            None
+            raises:
+                None
         '''
-        # All readers are declared locally and communicate throught the pipe
-        call_rec_reader = gnsq.Reader('call_received', 'frontend_lcd', '127.0.0.1:4150')
-        hist_give_reader = gnsq.Reader('history_give', 'frontend_lcd', '127.0.0.1:4150')
-        set_all_reader = gnsq.Reader('settings_all', 'frontend_lcd', '127.0.0.1:4150')
-        set_give_reader = gnsq.Reader('setting_give', 'frontend_lcd', '127.0.0.1:4150')
-        black_give_reader = gnsq.Reader('blacklist_give', 'frontend_lcd', '127.0.0.1:4150')
-        heartbeat_reader = gnsq.Reader('heartbeat', 'frontend_lcd', '127.0.0.1:4150')
-        error_reader = gnsq.Reader('error', 'frontend_lcd', '127.0.0.1:4150')
+        generation = self.response_generation.get(reply)
+        if generation is None:
+            return False
 
-        global frontend_conn
-        frontend_conn = pipe
+        # The display timeout asked for at startup is always wanted
+        if reply == 'set_give' and self.first_timeout_message:
+            return False
+        return generation != self.screen_generation
 
-        @call_rec_reader.on_message.connect
-        def call_rec_handler(reader, message):
-            '''
+    def profileSignalHandler(self, signum, frame):
+        '''
             function:
-                call_rec_handler: This function handles what to do when a message
-                                  from topic call_received is received
+                profileSignalHandler: This function starts profiling the GUI
+                                      and the reader process when SIGUSR1 is
+                                      received
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                signum: the signal number (unused)
+                frame: the frame that was interrupted (unused)
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            global CALL_INC
-            CALL_INC = True
-            self.turnOnBacklight(True)
-            print 'Got call received message: {}'.format(message.body)
-            frontend_conn.send(['call_rec',message.body])
-            print 'Displaying caller info and waiting 30 sec...'
-            time.sleep(30)
-            print 'Displaying original menu again'
-            frontend_conn.send(['load_hist','NULL'])
+        '''
+        self.profiler.start(PROFILE_DURATION)
+        os.kill(self.reader_proc.pid, signal.SIGUSR1)
 
-        @hist_give_reader.on_message.connect
-        def hist_give_handler(reader, message):
-            '''
+    def terminateSignalHandler(self, signum, frame):
+        '''
             function:
-                hist_give_handler: This function handles what to do when a message
-                                   from topic history_five is received
+                terminateSignalHandler: This function dumps the flight recorder
+                                        when SIGTERM is received and then lets
+                                        the signal end the process as usual
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                signum: the signal number
+                frame: the frame that was interrupted (unused)
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got history give message: {}'.format(message.body)
-            frontend_conn.send(['hist_give',message.body])
+        '''
+        self.dumpFlightRecorder('SIGTERM')
+        self.log.flush()
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
 
-        @set_all_reader.on_message.connect
-        def set_all_handler(reader, message):
-            '''
+    def dumpFlightRecorder(self, reason):
+        '''
             function:
-                set_all_handler: This function handles what to do when a message
-                                 from topic settings_all is received
+                dumpFlightRecorder: This function writes the flight recorder's
+                                    events to a file
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                reason: why it is being dumped
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got settings all message: {}'.format(message.body)
-            frontend_conn.send(['set_all',message.body])
+        '''
+        try:
+            path = self.recorder.dump(reason)
+            self.log.warning('flight', 'Dumped flight recorder', reason=reason, path=path)
+        except (IOError, OSError) as e:
+            self.log.error('flight', 'Could not dump flight recorder', reason=reason, error=e)
 
-        @set_give_reader.on_message.connect
-        def set_give_handler(reader, message):
-            '''
+    def sendPing(self):
+        '''
             function:
-                set_give_handler: This function handles what to do when a message
-                                  from topic settings_give is received
+                sendPing: This function checks for pings that went unanswered
+                          and sends the next one. When PING_MISSES in a row have
+                          been missed the backend is taken to be dead.
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                None
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got setting give message: {}'.format(message.body)
-            frontend_conn.send(['set_give',message.body])
-
-        @black_give_reader.on_message.connect
-        def black_give_handler(reader, message):
-            '''
-            function
-                black_give_handler: This function handles what to do when a
-                                    message from topic blacklist_give is
-                                    received
+        '''
+        self.ping.expire()
+        if self.ping.failed() and not self.fatal_error:
+            self.log.warning('ping', 'Backend stopped answering pings', misses=self.ping.misses)
+            self.backendDead('{} pings in a row went unanswered'.format(self.ping.misses))
+
+        # Pings don't go through sendMessage, which would stop the GUI waiting
+        # for the reply to a request. One that can't be sent is missed like
+        # one that isn't answered.
+        body = self.ping.ping()
+        self.recorder.record('out', 'frontend_ping')
+        try:
+            self.conn.publish('frontend_ping', body)
+        except Exception as e:
+            self.log.warning('ping', 'Could not send ping', error=e)
+
+    def reportPingStats(self):
+        '''
+            function:
+                reportPingStats: This function publishes the backend round-trip
+                                 time percentiles on the frontend_stats topic
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message 
+                None
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got blacklist give message: {}'.format(message.body)
-            frontend_conn.send(['black_give',message.body])
+        '''
+        self.publishStats('ping', self.ping.stats())
 
-        @heartbeat_reader.on_message.connect
-        def heartbeat_handler(reader, message):
-            '''
+    def recordPipeDepths(self):
+        '''
             function:
-                heartbeat_handler: This function handles what to do when a
-                message from topic heartbeat is received
+                recordPipeDepths: This function records how many bytes are
+                                  waiting in the pipes from the reader process
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                None
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got heartbeat message'
-            frontend_conn.send(['heartbeat', message.body])
+        '''
+        self.recorder.record('pipes', reader=memstats.pipeBacklog(self.reader_pipe),
+                             call=memstats.pipeBacklog(self.call_pipe))
 
-        @error_reader.on_message.connect
-        def error_handler(reader, message):
-            '''
+    def queueCall(self, msg):
+        '''
             function:
-                error_handler: This function handles what to do when a message
-                               from topic error_handler is received
+                queueCall: This function queues an incoming call for onTimer to
+                           show
 
             args:
-                reader: an instance of the reader object
-                message: an object that contains the message
+                msg: body of the call_received message (number:name)
 
             returns:
                 None
 
             raises:
                 None
-            '''
-            print 'Got error message: {}'.format(message.body)
-            frontend_conn.send(['error',message.body])
+        '''
+        global CALL_INC, CALL_REC
 
-        call_rec_reader.start(block=False)
-        hist_give_reader.start(block=False)
-        set_all_reader.start(block=False)
-        set_give_reader.start(block=False)
-        black_give_reader.start(block=False)
-        heartbeat_reader.start(block=False)
-        error_reader.start()
+        with self.call_lock:
+            self.call_queue.append(msg)
+            CALL_INC = True
+            CALL_REC = True
 
-    def sendMessage(self, topic, message, wait):
+        # The reader process turns the backlight on as soon as the call comes
+        # in, but the backlight timeout is kept here
+        self.turnOnBacklight(True)
+
+    def resyncSwitches(self):
         '''
-        function:
-            sendMessage: This function sends a message to a specified topic
+            function:
+                resyncSwitches: This function sends the positions of the
+                                switches to the backend in case a switch event
+                                was missed
 
-        args:
-            topic: The topic to publish the message to
-            message: The message to publish to that topic
-            wait: Boolean variable to indicate if it should wait for a message
-                  to be received before continuing
+            args:
+                None
 
-        returns:
-            None
+            returns:
+                None
 
-        raises:
-            None
+            raises:
+                None
         '''
+        self.sendMessage('setting_set','Wildcards:{}'.format('Disabled' if GPIO.input(37) else 'Enabled'), False)
+        self.sendMessage('setting_set','Filter Disable:{}'.format('Disabled' if GPIO.input(40) else 'Enabled'), False)
 
-        # If wait is specified set self.waiting_for_message to true so that the
-        # GUI will wait for a received message before continuing (e.g. if the 
-        # user requests the settings, we will wait for the settings to come back
-        # before letting the user do something
-        self.waiting_for_message = wait
-        print 'Sending message:{} to topic:{}'.format(message,topic)
-        self.conn.publish(topic,message)
-
-    def setupGUIElements(self):
+    def backendDead(self, reason=None):
         '''
-        function:
+            function:
+                backendDead: This function is called when no heartbeat has come
+                             from the backend in HEARTBEAT_TIMEOUT seconds, or
+                             when it stops answering pings. It prompts the user
+                             to reboot, and shows the prompt again every
+                             FATAL_ERROR_REFRESH seconds until a heartbeat or
+                             a pong comes (see backendAlive).
+
+            args:
+                reason: why the backend is taken to be dead, for the flight
+                        recorder dump. Defaults to the heartbeat timing out.
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        # Keep what led up to it, once, before the unit is rebooted
+        if not self.fatal_error:
+            self.dumpFlightRecorder(reason or 'no heartbeat for {} seconds'.format(HEARTBEAT_TIMEOUT))
+        self.firstTextBox.SetValue('\nA fatal error has occured')
+        self.secondTextBox.SetValue('\nPress any key to reboot')
+        self.thirdTextBox.SetValue('')
+        self.fatal_error = True
+        self.scheduler.schedule('heartbeat', FATAL_ERROR_REFRESH, self.backendDead, reason)
+
+    def backendAlive(self):
+        '''
+            function:
+                backendAlive: This function is called when a heartbeat or a
+                              pong shows the backend is alive. It moves the
+                              heartbeat deadline, and if the backend had been
+                              taken to be dead (e.g. while nsqd restarted) it
+                              clears the fatal error and puts the screen the
+                              user was on back.
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        global UPDATE
+        self.scheduler.schedule('heartbeat', HEARTBEAT_TIMEOUT, self.backendDead)
+        if self.fatal_error:
+            self.log.info('backend', 'Backend is back, clearing the fatal error')
+            self.recorder.record('backend', 'alive')
+            self.fatal_error = False
+
+            # Pings missed while it was gone mustn't count against it now
+            self.ping.reset()
+            UPDATE = True
+
+    def endCallDisplay(self):
+        '''
+            function:
+                endCallDisplay: This function takes the incoming call screen
+                                down once it has been shown for CALL_DISPLAY_TIME
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.calls_missed = 0
+        self.insertNewCalls()
+
+    def insertNewCalls(self):
+        '''
+            function:
+                insertNewCalls: This function goes back to the call history after
+                                an incoming call, with the calls that came in put
+                                at the top of what is already loaded. The user's
+                                place in the history is kept. The top of the
+                                history is then checked against the backend in
+                                the background, and reloaded if it doesn't match.
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        global CALL_INC, LOAD_HIST
+        CALL_INC = False
+        calls, self.new_calls = self.new_calls, []
+
+        # Without the top of the history loaded there is nothing to put the
+        # calls in front of, so load it all. A filtered history is loaded
+        # again too, as the new calls may not belong in it.
+        if len(self.menu_items_list) < 2 or self.menu_items_list[1] is render_cache.PLACEHOLDER_ROW or self.history_filter:
+            LOAD_HIST = True
+            return
+
+        # Go back to the call history where the user left it. The history is
+        # always at the bottom of the navigation stack.
+        unverified = self.history_verify or 0
+        self.changeScreen()
+        if self.selecting_setting:
+            self.showStateBoxes(False)
+        if self.nav_stack:
+            screen, self.menu_ptr, self.current_top_ptr, self.current_selected_text_box = self.nav_stack[0]
+            self.nav_stack = []
+        self.using_settings = False
+        self.using_blacklist = False
+        self.selecting_setting = False
+        self.showing_warning = False
+
+        # Put the calls at the top, newest first, and move the offsets of
+        # everything loaded down to match
+        rows = []
+        days = {}
+        for call, stamp in reversed(calls):
+            number, name = (call.split(':') + [''])[:2]
+            days[len(rows)] = stamp[:8]
+            rows.append(self.formatMenuItem(number, name, stamp, '0'))
+        self.menu_items_list[1:1] = rows
+        self.history_days = dict((offset + len(rows), day) for offset, day in self.history_days.items())
+        self.history_days.update(days)
+        self.indexHistoryDays()
+
+        # At the top of the list, show the new calls. Anywhere else, keep the
+        # same calls on screen.
+        if self.current_top_ptr > 1:
+            self.menu_ptr += len(rows)
+            self.current_top_ptr += len(rows)
+        self.trimList(self.menu_items_list, MAX_HISTORY_ENTRIES)
+        self.clampPointers(self.menu_items_list)
+        self.setValues()
+
+        # Ask for the new calls and the one that was at the top before them
+        self.history_verify = unverified + len(rows)
+        self.sendMessage('history_get', '{}:0'.format(self.history_verify + 1), False)
+
+    def verifyHistoryHead(self, page):
+        '''
+            function:
+                verifyHistoryHead: This function checks the top of the history
+                                   from the backend against the calls put there
+                                   by insertNewCalls. If they match the backend's
+                                   rows (with its times and blocked flags) replace
+                                   ours, otherwise the history is reloaded.
+
+            args:
+                page: the hist_give page decoded by the reader process
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        global LOAD_HIST
+        expected, self.history_verify = self.history_verify, None
+        self.pager.replyReceived(('history_get', 0))
+
+        # Compare the numbers of the rows we have (which may end sooner if the
+        # history is short) with the ones the backend sent
+        ours = [row for row in self.menu_items_list[1:expected+2]
+                if row is not render_cache.END_OF_HISTORY_ROW and row is not render_cache.PLACEHOLDER_ROW]
+        theirs = [self.unformatNumber(render_cache.formatNumber(call.number)) for call in page.items]
+        if len(theirs) < len(ours) or theirs[:len(ours)] != [self.unformatNumber(row.split('\n')[0]) for row in ours]:
+            self.log.warning('history', 'New calls do not match the backend, reloading', expected=expected)
+            LOAD_HIST = True
+            return
+
+        for offset, call in enumerate(page.items[:len(ours)]):
+            self.callers.record(call.number, call.time, call.blocked == '1')
+            self.history_days[offset] = call.time[:8]
+        self.splicePage(self.menu_items_list, 0, page.rows[:len(ours)])
+        self.indexHistoryDays()
+        self.list_loaded['history'] = monotonic()
+
+    def pageFailed(self, kind, offset):
+        '''
+            function:
+                pageFailed: This function stops waiting for a page the reader
+                            process couldn't decode. A page being scrolled to
+                            is asked for again when the user presses down, and
+                            one under a placeholder after PAGE_RETRY seconds.
+                            If the user was left waiting for it they are shown
+                            an error.
+
+            args:
+                kind: 'hist_give' or 'black_give'
+                offset: the offset the page was for, or None if that couldn't
+                        be read either
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        if self.isStale(kind):
+            return
+        topic = 'history_get' if kind == 'hist_give' else 'blacklist_get'
+        self.pager.replyReceived((topic, offset))
+
+        # Hold off asking again for a page under a placeholder, in case the
+        # backend keeps sending the same bad page
+        if (topic, offset) in self.page_requests:
+            self.page_requests[(topic, offset)] = monotonic()
+
+        # A check of the top of the history or a refresh isn't coming, so
+        # have the history loaded again when the user comes back to it
+        if topic == 'history_get' and offset == 0 and self.history_verify is not None:
+            self.history_verify = None
+            self.list_loaded.pop('history', None)
+        if topic == 'history_get' and offset == self.history_refresh_offset:
+            self.history_refresh_offset = None
+        if topic == 'blacklist_get' and offset == self.blacklist_resync_offset:
+            self.blacklist_resync_offset = None
+
+        if self.waiting_for_message:
+            self.waiting_for_message = False
+            self.showing_error_message = True
+            self.firstTextBox.SetValue('\nAn Error has occurred!')
+            self.secondTextBox.SetValue('The backend sent a page that could not be read')
+            self.thirdTextBox.SetValue('Press any key to continue...')
+
+    def showHistoryFilters(self):
+        '''
+            function:
+                showHistoryFilters: This function shows the filters the call
+                                    history can be viewed through, the same
+                                    way the states of a setting are shown.
+                                    The most recent callers are offered too,
+                                    to see just their calls.
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.pushScreen()
+        self.changeScreen()
+        self.state_name = HISTORY_FILTER_SETTING
+
+        choices = [None, pages.BLOCKED_FILTER, pages.ALLOWED_FILTER]
+        choices.extend(pages.numberFilter(number) for number in self.callers.recent(FILTER_CALLERS))
+        if self.history_filter not in choices:
+            choices.append(self.history_filter)
+        self.history_filter_choices = choices
+
+        # Mark the filter in use the way the backend marks the current state
+        self.setting_state_list = []
+        for choice in choices:
+            label = pages.filterLabel(choice)
+            if choice == self.history_filter:
+                label = label + " *"
+
+            # The labels name recent callers, so they aren't kept in rows
+            self.setting_state_list.append(render_cache.formatRow(label))
+        self.setting_state_list.append(render_cache.END_OF_LIST_ROW)
+
+        # Reset the pointers and show the list
+        self.menu_ptr = 0
+        self.current_selected_text_box = 1
+        self.current_top_ptr = 0
+        self.selecting_setting = True
+        self.showStateBoxes(True)
+        self.fourthTextBox.SetValue('{}\n{}'.format(HISTORY_FILTER_SETTING, 'Show only some of the calls'))
+        self.setValues()
+
+    def setHistoryFilter(self, history_filter):
+        '''
+            function:
+                setHistoryFilter: This function changes the filter the call
+                                  history is viewed through and loads the
+                                  history again through it
+
+            args:
+                history_filter: the filter (see pages), or None for every call
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.log.info('history', 'Filtering call history', filter=history_filter or 'none')
+        self.history_filter = history_filter
+        self.showStateBoxes(False)
+        self.selecting_setting = False
+        self.using_settings = False
+        self.firstTextBox.SetValue(render_cache.LOADING_HISTORY)
+        self.secondTextBox.SetValue('')
+        self.thirdTextBox.SetValue('')
+        self.loadCallHistory()
+
+    def ignoresFilter(self, page):
+        '''
+            function:
+                ignoresFilter: This function checks whether a page of call
+                               history has to be filtered here, because the
+                               backend sent calls the filter leaves out
+
+            args:
+                page: the hist_give page decoded by the reader process
+
+            returns:
+                bool: True if the page should go to loadFilteredPage
+
+            raises:
+                None
+        '''
+        if self.history_filter_local:
+            return True
+        return not all(pages.matchesFilter(call, self.history_filter) for call in page.items)
+
+    def loadFilteredPage(self, page):
+        '''
+            function:
+                loadFilteredPage: This function adds the calls of a page that
+                                  match the history filter to the end of the
+                                  call history, for a backend that sends every
+                                  call. More pages are asked for until there
+                                  is a screen of calls to show.
+
+            args:
+                page: the hist_give page decoded by the reader process
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.page_requests.pop(('history_get', page.offset), None)
+        self.pager.replyReceived(('history_get', page.offset))
+
+        # The first time, drop whatever was loaded from this page on, as it
+        # was put in place by the backend's offsets
+        if not self.history_filter_local:
+            self.log.warning('history', 'Backend does not filter the call history, filtering here',
+                             filter=self.history_filter)
+            self.history_filter_local = True
+            self.history_filter_next = page.offset
+            del self.menu_items_list[page.offset+1:]
+            for day_offset in [day_offset for day_offset in self.history_days if day_offset >= page.offset]:
+                del self.history_days[day_offset]
+
+        # Only the next page along is wanted. Anything else answers a request
+        # that was already answered.
+        if page.offset != self.history_filter_next or self.end_of_call_history:
+            return
+        self.list_loaded['history'] = monotonic()
+
+        # If the backend says there's no more history, show the end
+        if page.count == 0:
+            self.end_of_call_history = True
+            self.menu_items_list.append(render_cache.END_OF_HISTORY_ROW)
+
+        # Otherwise add the calls that match. The days are kept by where the
+        # calls are in the list, so jumping by day still works.
+        else:
+            filtered = pages.filterPage(page, self.history_filter)
+            for call, row in zip(filtered.items, filtered.rows):
+                self.callers.record(call.number, call.time, call.blocked == '1')
+                self.history_days[len(self.menu_items_list)-1] = call.time[:8]
+                self.menu_items_list.append(row)
+            self.history_filter_next = page.offset + page.count
+            self.indexHistoryDays()
+
+            # Keep going until the screen is full
+            if len(self.menu_items_list) < self.current_top_ptr + 3:
+                self.sendMessage('history_get', self.historyRequest(self.history_filter_next), False)
+
+        if not self.using_settings and not self.using_blacklist:
+            self.clampPointers(self.menu_items_list)
+
+    def load_blacklist(self, page):
+        '''
+            function:
+                load_blacklist: This function loads the blacklist and displays it
+                                on the GUI
+
+            args:
+                page: the black_give page decoded by the reader process
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.page_requests.pop(('blacklist_get', page.offset), None)
+        self.pager.replyReceived(('blacklist_get', page.offset))
+        self.list_loaded['blacklist'] = monotonic()
+
+        # The reader process formats the numbers unmarked, so mark the ones
+        # the user has marked
+        rows = [self.formatBlacklistItem(number) if number in self.blacklist_marked else row
+                for number, row in zip(page.items, page.rows)]
+
+        # If this is the page we asked for after removing a number, splice it
+        # into place instead of treating it as a fresh blacklist
+        if self.blacklist_resync_offset is not None and page.offset == self.blacklist_resync_offset:
+            self.blacklist_resync_offset = None
+            self.resyncBlacklistPage(page.offset, rows)
+            self.waiting_for_message = False
+            return
+
+        if page.offset == 0 and page.count != 0:
+            # Reset the menu pointers and reload the history
+            self.blacklist = [render_cache.formatMarkingHeader(len(self.blacklist_marked)) if self.blacklist_marking
+                              else render_cache.BLACKLIST_HEADER]
+            self.menu_ptr = 0
+            self.current_selected_text_box = 0
+            self.current_top_ptr = 0
+            self.using_settings = False
+            self.selecting_setting = False
+            self.end_of_blacklist = False
+        
+        # If the backend says there's no more history...
+        if page.count == 0:
+            # Display "End of Call History" as the last element
+            self.end_of_blacklist = True
+            del self.blacklist[page.offset+1:]
+            self.blacklist.append(render_cache.END_OF_BLACKLIST_ROW)
+            if self.using_blacklist:
+                self.clampPointers(self.blacklist)
+        # Otherwise, put the page in place at its offset
+        else:
+            self.splicePage(self.blacklist, page.offset, rows)
+            self.trimList(self.blacklist, MAX_BLACKLIST_ENTRIES)
+
+        # Indicate that the message is received and load the GUI values
+        self.waiting_for_message = False
+
+    def currentScreen(self):
+        '''
+            function:
+                currentScreen: This function names the screen being shown
+
+            args:
+                None
+
+            returns:
+                string: 'setting_state', 'blacklist', 'settings' or 'history'
+
+            raises:
+                None
+        '''
+        if self.selecting_setting:
+            return 'setting_state'
+        if self.using_blacklist:
+            return 'blacklist'
+        if self.using_settings:
+            return 'settings'
+        return 'history'
+
+    def pushScreen(self):
+        '''
+            function:
+                pushScreen: This function remembers the current screen and where
+                            the user is on it, before moving to another screen
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.nav_stack.append((self.currentScreen(), self.menu_ptr, self.current_top_ptr, self.current_selected_text_box))
+
+    def popScreen(self):
+        '''
+            function:
+                popScreen: This function goes back to the last screen pushed,
+                           with the selection where the user left it. The rows
+                           kept in memory are shown straight away. If they are
+                           older than NAV_MAX_AGE the page on screen is asked
+                           for again in the background.
+
+            args:
+                None
+
+            returns:
+                bool: False if there was no screen to go back to
+
+            raises:
+                None
+        '''
+        if not self.nav_stack:
+            return False
+        screen, menu_ptr, top_ptr, selected_box = self.nav_stack.pop()
+        self.recorder.record('screen', 'back', screen=screen)
+
+        # Leave the current screen
+        self.changeScreen()
+        if self.selecting_setting:
+            self.showStateBoxes(False)
+        self.selecting_setting = False
+        self.using_blacklist = screen == 'blacklist'
+        self.using_settings = screen != 'history'
+
+        # Put the pointers back and show the rows we have
+        self.menu_ptr = menu_ptr
+        self.current_top_ptr = top_ptr
+        self.current_selected_text_box = selected_box
+        list_to_use = self.blacklist if self.using_blacklist else self.settings_list if self.using_settings else self.menu_items_list
+        self.clampPointers(list_to_use)
+        self.setValues()
+
+        loaded = self.list_loaded.get(screen)
+        if loaded is None or monotonic() - loaded > NAV_MAX_AGE:
+            self.refreshScreen(screen)
+        return True
+
+    def refreshScreen(self, screen):
+        '''
+            function:
+                refreshScreen: This function asks the backend for the part of a
+                               screen the user can see without making them wait.
+                               The reply is put in place without moving the
+                               selection.
+
+            args:
+                screen: 'history', 'settings' or 'blacklist'
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        offset = max(0, self.current_top_ptr - 1)
+        if screen == 'history':
+            # Rows filtered here don't have the backend's offsets, so there
+            # is no page to ask for. They are kept until the history reloads.
+            if self.history_filter_local:
+                return
+            self.history_refresh_offset = offset
+            self.sendMessage('history_get', self.historyRequest(offset), False)
+        elif screen == 'blacklist':
+            self.blacklist_resync_offset = offset
+            self.blacklist_resync_size = self.pager.pageSize()
+            self.sendMessage('blacklist_get', '{}:{}'.format(self.blacklist_resync_size, offset), False)
+        elif screen == 'settings':
+            self.end_of_settings_ptr = 1
+            self.sendMessage('settings_request_all', 'no', False)
+
+    def removeBlacklistEntries(self, indices):
+        '''
+            function:
+                removeBlacklistEntries: This function removes numbers from the
+                                        loaded blacklist without reloading it
+                                        and asks the backend for just the page
+                                        that held the first of them so the two
+                                        stay in sync
+
+            args:
+                indices: indices into self.blacklist of the numbers being removed
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+
+        # Drop the entries, last first so the indices stay valid, and keep the
+        # pointers on the rows around them
+        for index in sorted(indices, reverse=True):
+            del self.blacklist[index]
+        self.clampPointers(self.blacklist)
+        self.setValues()
+
+        # Everything after the first removed number moved up, so the pages
+        # before it are still correct relative to the backend. Refetch from
+        # where it was to reconcile without blocking the user.
+        offset = min(indices) - 1
+        self.blacklist_resync_offset = offset
+        self.blacklist_resync_size = self.pager.pageSize()
+        self.sendMessage('blacklist_get', '{}:{}'.format(self.blacklist_resync_size, offset), False)
+
+    def removeMarkedEntries(self):
+        '''
+            function:
+                removeMarkedEntries: This function tells the backend to remove
+                                     every marked number in one publish and then
+                                     removes them from the loaded blacklist
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        marked = self.blacklist_marked
+        indices = [index for index, row in enumerate(self.blacklist)
+                   if index != 0 and row.strip() not in ('End of Blacklist', 'Loading...')
+                   and self.blacklistNumber(row) in marked]
+
+        # Send them in the order they're listed. Marked numbers whose page has
+        # been dropped from memory since are still removed.
+        numbers = [self.blacklistNumber(self.blacklist[index]) for index in indices]
+        numbers += sorted(marked.difference(numbers))
+        self.sendMessages('blacklist_remove', numbers)
+
+        self.blacklist_marking = False
+        self.blacklist_marked = set()
+        self.blacklist[0] = render_cache.BLACKLIST_HEADER
+
+        # A marked number that isn't loaded may have been under a placeholder,
+        # and then every loaded row after it is one further from its backend
+        # offset than it should be. One page can't put that right, so load the
+        # blacklist again from the start.
+        if len(numbers) > len(indices):
+            self.reloadBlacklist()
+        elif indices:
+            self.removeBlacklistEntries(indices)
+        else:
+            self.setValues()
+
+    def reloadBlacklist(self):
+        '''
+            function:
+                reloadBlacklist: This function throws away the loaded blacklist
+                                 and asks the backend for it again from the
+                                 first number
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.blacklist = [render_cache.BLACKLIST_HEADER]
+        self.end_of_blacklist = False
+        self.blacklist_resync_offset = None
+        for key in self.page_requests.keys():
+            if key[0] == 'blacklist_get':
+                self.page_requests.pop(key, None)
+
+        self.menu_ptr = 0
+        self.current_selected_text_box = 0
+        self.current_top_ptr = 0
+        self.firstTextBox.SetValue(render_cache.LOADING_BLACKLIST)
+        self.secondTextBox.SetValue('')
+        self.thirdTextBox.SetValue('')
+        self.sendMessage('blacklist_get', self.pageRequest(0), True)
+
+    def stopMarking(self):
+        '''
+            function:
+                stopMarking: This function leaves marking mode on the blacklist
+                             screen and unmarks every number
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.blacklist_marking = False
+        marked, self.blacklist_marked = self.blacklist_marked, set()
+        for index, row in enumerate(self.blacklist):
+            if index != 0 and row.strip() not in ('End of Blacklist', 'Loading...') and self.blacklistNumber(row) in marked:
+                self.blacklist[index] = self.formatBlacklistItem(self.blacklistNumber(row))
+        self.blacklist[0] = render_cache.BLACKLIST_HEADER
+        self.setValues()
+
+    def resyncBlacklistPage(self, offset, rows):
+        '''
+            function:
+                resyncBlacklistPage: This function replaces one page of the loaded
+                                     blacklist with a fresh copy from the backend
+
+            args:
+                offset: the backend offset of the first number in the page
+                rows: list of formatted rows in the page
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+
+        # The blacklist header sits at index 0, so entries are shifted by one
+        start = offset + 1
+
+        # An empty page means everything from this offset on is gone
+        if not rows:
+            del self.blacklist[start:]
+            self.blacklist.append(render_cache.END_OF_BLACKLIST_ROW)
+            self.end_of_blacklist = True
+
+        # A short page means we may have more loaded than the backend has, so
+        # trim the tail and let the next "down" ask the backend again
+        elif len(rows) < self.blacklist_resync_size:
+            self.blacklist[start:] = rows
+            self.end_of_blacklist = False
+
+        # Otherwise swap the page in place. If that covered "End of Blacklist"
+        # there is more to load now.
+        else:
+            self.blacklist[start:start+len(rows)] = rows
+            if self.blacklist[-1].strip() != 'End of Blacklist':
+                self.end_of_blacklist = False
+
+        self.clampPointers(self.blacklist)
+
+    def clampPointers(self, list_to_use):
+        '''
+            function:
+                clampPointers: This function keeps menu_ptr, current_top_ptr and
+                               current_selected_text_box valid after the list
+                               they point into has changed size
+
+            args:
+                list_to_use: the list the pointers refer to
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+
+        # Keep the selection inside the list
+        self.menu_ptr = max(0, min(self.menu_ptr, len(list_to_use)-1))
+
+        # Keep three rows on screen where possible with the selection among them
+        self.current_top_ptr = max(0, min(self.current_top_ptr, len(list_to_use)-3))
+        if self.menu_ptr < self.current_top_ptr:
+            self.current_top_ptr = self.menu_ptr
+        elif self.menu_ptr > self.current_top_ptr + 2:
+            self.current_top_ptr = self.menu_ptr - 2
+        self.current_selected_text_box = self.menu_ptr - self.current_top_ptr
+
+    def splicePage(self, list_to_use, offset, rows):
+        '''
+            function:
+                splicePage: This function puts a page of rows into a list at the
+                            position of its backend offset, filling any gap
+                            before it with placeholder rows
+
+            args:
+                list_to_use: the list to put the rows into (the call history or
+                             the blacklist, which both have a header at index 0)
+                offset: the backend offset of the first row in the page
+                rows: list of formatted rows
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        start = offset + 1
+        if start > len(list_to_use):
+            list_to_use.extend([render_cache.PLACEHOLDER_ROW] * (start - len(list_to_use)))
+        list_to_use[start:start+len(rows)] = rows
+
+    def indexHistoryDays(self):
+        '''
+            function:
+                indexHistoryDays: This function rebuilds the coarse day index from
+                                  the days of the calls loaded so far
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        self.history_day_index = []
+        last_day = None
+        for offset in sorted(self.history_days):
+            day = self.history_days[offset]
+            if day != last_day:
+                self.history_day_index.append((offset, day))
+                last_day = day
+
+    def trimList(self, list_to_use, cap):
+        '''
+            function:
+                trimList: This function keeps the number of loaded entries in the
+                          call history or blacklist under a soft cap by dropping
+                          the rows furthest from the selection. Rows after the
+                          kept window are removed (so scrolling down fetches
+                          them again) and rows before it become placeholders
+                          (which are fetched again when they come on screen).
+
+            args:
+                list_to_use: the list to trim (the call history or the blacklist)
+                cap: the most loaded entries to keep
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        # Rows filtered here don't have the backend's offsets, so neither
+        # placeholders nor a dropped tail could be fetched again. They are
+        # kept until the history reloads, like in refreshScreen.
+        if list_to_use is self.menu_items_list and self.history_filter_local:
+            return
+
+        loaded = len(list_to_use) - list_to_use.count(render_cache.PLACEHOLDER_ROW)
+        if loaded <= cap:
+            return
+
+        # Keep a window of cap rows around the selection if the user is in
+        # this list, otherwise the newest rows at the top
+        in_use = list_to_use is (self.blacklist if self.using_blacklist else None if self.using_settings or self.selecting_setting else self.menu_items_list)
+        cursor = self.menu_ptr if in_use else 0
+        window_start = max(1, cursor - cap/2)
+        window_end = window_start + cap
+
+        # Drop everything past the window. The end of the list has to be found
+        # again after this.
+        if len(list_to_use) > window_end:
+            del list_to_use[window_end:]
+            if list_to_use is self.blacklist:
+                self.end_of_blacklist = False
+            else:
+                self.end_of_call_history = False
+
+        # Swap everything before the window for placeholders
+        for index in range(1, window_start):
+            list_to_use[index] = render_cache.PLACEHOLDER_ROW
+
+        # Forget the days of calls that are no longer loaded
+        if list_to_use is self.menu_items_list:
+            for offset in self.history_days.keys():
+                if offset + 1 < window_start or offset + 1 >= window_end:
+                    del self.history_days[offset]
+            self.indexHistoryDays()
+
+    def reportMemoryStats(self):
+        '''
+            function:
+                reportMemoryStats: This function publishes the memory used by both
+                                   processes and by each of the lists on the
+                                   frontend_stats topic
+
+            args:
+                None
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        stats = {'rss_gui_kb': memstats.readRSS(os.getpid()),
+                 'rss_reader_kb': memstats.readRSS(self.reader_proc.pid),
+                 'reader_pipe_bytes': memstats.pipeBacklog(self.reader_pipe),
+                 'call_pipe_bytes': memstats.pipeBacklog(self.call_pipe),
+                 'render_cache_entries': len(render_cache.row_cache)}
+        for name in ('menu_items_list', 'blacklist', 'settings_list', 'setting_state_list'):
+            entries, size = memstats.listStats(getattr(self, name))
+            stats[name + '_entries'] = entries
+            stats[name + '_bytes'] = size
+        self.publishStats('memory', stats)
+
+    def publishStats(self, kind, stats):
+        '''
+            function:
+                publishStats: This function publishes runtime stats on the
+                              frontend_stats topic as "kind:name=value;..."
+
+            args:
+                kind: what the stats are about (e.g. memory)
+                stats: dictionary of stat name to value
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        body = '{}:{}'.format(kind, memstats.formatStats(stats))
+        self.log.info('stats', 'Publishing stats', kind=kind, size=len(body))
+        self.recorder.record('out', 'frontend_stats', kind=kind)
+        self.conn.publish('frontend_stats', body)
+
+    def jumpHandler(self, direction):
+        '''
+            function:
+                jumpHandler: This function moves the selection a day (in the call
+                             history, when the day is known) or a page at a
+                             time and fetches the page it lands on directly by
+                             offset instead of loading every page in between
+
+            args:
+                direction: 1 to jump down the list, -1 to jump up
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        global CALL_INC
+
+        # Only the call history and the blacklist are long enough to jump through
+        if CALL_INC or self.waiting_for_message or self.showing_warning or self.selecting_setting:
+            return
+        if self.using_settings and not self.using_blacklist:
+            return
+
+        list_to_use = self.blacklist if self.using_blacklist else self.menu_items_list
+        end_of_list = self.end_of_blacklist if self.using_blacklist else self.end_of_call_history
+        target = None
+
+        # In the call history, jump to the first call of the next day or to the
+        # first call of the current/previous day if we know where it is
+        if not self.using_blacklist:
+            current = self.menu_ptr - 1
+            if direction > 0:
+                for offset, day in self.history_day_index:
+                    if offset > current:
+                        target = offset + 1
+                        break
+            else:
+                for offset, day in reversed(self.history_day_index):
+                    if offset < current:
+                        target = offset + 1
+                        break
+
+        # Otherwise jump a page
+        if target is None:
+            target = self.menu_ptr + direction * PAGE_SIZE
+        self.pager.recordScroll(abs(target - self.menu_ptr))
+
+        # Stay inside the list. Past the end of what is loaded, pad with
+        # placeholders that get filled in when their page arrives (unless the
+        # history is being filtered here, as there is no offset to ask for).
+        if end_of_list or direction < 0 or (self.history_filter_local and not self.using_blacklist):
+            target = max(0, min(target, len(list_to_use)-1))
+        elif target + 2 >= len(list_to_use):
+            list_to_use.extend([render_cache.PLACEHOLDER_ROW] * (target + 3 - len(list_to_use)))
+
+        # Put the selection at the top of the screen
+        self.menu_ptr = target
+        self.current_top_ptr = target
+        self.clampPointers(list_to_use)
+        self.setValues()
+
+    def requestVisiblePages(self, list_to_use):
+        '''
+            function:
+                requestVisiblePages: This function asks the backend for the page
+                                     starting at the first placeholder row on the
+                                     screen, if there is one
+
+            args:
+                list_to_use: the list being displayed
+
+            returns:
+                None
+
+            raises:
+                None
+        '''
+        if list_to_use is self.blacklist:
+            topic = 'blacklist_get'
+        elif list_to_use is self.menu_items_list:
+            topic = 'history_get'
+        else:
+            return
+
+        for index in range(self.current_top_ptr, min(self.current_top_ptr+3, len(list_to_use))):
+            if list_to_use[index] is render_cache.PLACEHOLDER_ROW:
+                # Don't ask again for a page that is already on its way
+                offset = index - 1
+                requested = self.page_requests.get((topic, offset))
+                if requested is None or monotonic() - requested > PAGE_RETRY:
+                    self.page_requests[(topic, offset)] = monotonic()
+                    self.sendMessage(topic, self.historyRequest(offset) if topic == 'history_get' else self.pageRequest(offset), False)
+                return
+
+    def pageRequest(self, offset):
+        '''
+            function:
+                pageRequest: This function builds the body of a history_get or
+                             blacklist_get request, asking for as many entries
+                             as the pager thinks will be needed
+
+            args:
+                offset: the backend offset of the first entry wanted
+
+            returns:
+                string: the request body, "count:offset"
+
+            raises:
+                None
+        '''
+        return '{}:{}'.format(self.pager.pageSize(), offset)
+
+    def historyRequest(self, offset):
+        '''
+            function:
+                historyRequest: This function builds the body of a history_get
+                                request, with the history filter on the end if
+                                there is one. When the pages are being filtered
+                                here the largest pages are asked for, as most
+                                of each may be dropped.
+
+            args:
+                offset: the backend offset of the first call wanted
+
+            returns:
+                string: the request body, "count:offset" or "count:offset:filter"
+
+            raises:
+                None
+        '''
+        if not self.history_filter:
+            return self.pageRequest(offset)
+        if self.history_filter_local:
+            return '{}:{}:{}'.format(self.pager.max_size, offset, self.history_filter)
+        return '{}:{}'.format(self.pageRequest(offset), self.history_filter)
+
+    def historyHeader(self):
+        '''
+            function:
+                historyHeader: This function gives the top row of the call
+                               history, which says how it is filtered
+
+            args:
+                None
+
+            returns:
+                string: the row
+
+            raises:
+                None
+        '''
+        if not self.history_filter:
+            return render_cache.SETTINGS_ROW
+        return render_cache.formatFilterHeader(pages.filterLabel(self.history_filter))
+
+    def formatBlacklistItem(self, number):
+        '''
+            function:
+                formatBlacklistItem: This function formats a blacklisted number
+                                     as a row in the blacklist
+
+            args:
+                number: the number as a string to format as x (xxx) xxx - xxxx
+
+            returns:
+                string: The formatted blacklist row
+
+            raises:
+                None
+        '''
+        return render_cache.formatBlacklistRow(number, number in self.blacklist_marked)
+
+    def blacklistNumber(self, row):
+        '''
+            function:
+                blacklistNumber: This function reads the number back out of a
+                                 blacklist row
+
+            args:
+                row: a row made by formatBlacklistItem
+
+            returns:
+                string: the unformatted number
+
+            raises:
+                None
+        '''
+        # The number is on the middle line; the last may say it is marked
+        return self.unformatNumber(row.split('\n')[1])
+
+    def readerThreads(self, pipe, call_pipe):
+        '''
+        function:
+            setupThreads: This function sets up and starts all of the reader threads
+
+        args:
+            pipe: Pipe object to send messages to the GUI through
+            call_pipe: Pipe object to send incoming calls to the GUI through
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        # The reader process gets a logger (and drain thread) of its own
+        self.log = self.makeLogger('reader')
+
+        # All readers are declared locally and communicate throught the pipe.
+        # Sending blocks once the pipe is full, which stops the readers from
+        # finishing messages so nsqd holds the rest back.
+        call_rec_reader = gnsq.Reader('call_received', self.channel, '127.0.0.1:4150', max_in_flight=CALL_MAX_IN_FLIGHT)
+        hist_give_reader = gnsq.Reader('history_give', self.channel, '127.0.0.1:4150')
+        set_all_reader = gnsq.Reader('settings_all', self.channel, '127.0.0.1:4150')
+        set_give_reader = gnsq.Reader('setting_give', self.channel, '127.0.0.1:4150')
+        black_give_reader = gnsq.Reader('blacklist_give', self.channel, '127.0.0.1:4150')
+        heartbeat_reader = gnsq.Reader('heartbeat', self.channel, '127.0.0.1:4150')
+        error_reader = gnsq.Reader('error', self.channel, '127.0.0.1:4150')
+        control_reader = gnsq.Reader('frontend_control', self.channel, '127.0.0.1:4150')
+        pong_reader = gnsq.Reader('frontend_pong', self.channel, '127.0.0.1:4150')
+
+        # NSQ delivers messages at least once. Remember the ids of recent
+        # messages so that a redelivery is dropped here instead of being shown
+        # (or added to a list) twice. nsqd only makes ids unique within a
+        # topic, so they are remembered with the topic they came on.
+        delivered = TTLCache()
+
+        def logReceived(topic, message, level=ringlog.INFO):
+            '''
+            function:
+                logReceived: This function logs a message that was received with
+                             how long nsqd has had it
+
+            args:
+                topic: the topic the message came from
+                message: an object that contains the message
+                level: the ringlog level to log at
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            latency = int(time.time() * 1000 - message.timestamp / 1000000)
+            self.logPayload(level, topic, 'Got message', message.body, latency_ms=latency)
+
+        def isRedelivery(reader, message):
+            '''
+            function:
+                isRedelivery: This function checks whether a message has already
+                              been handled
+
+            args:
+                reader: the reader the message came from
+                message: an object that contains the message
+
+            returns:
+                bool: True if the message was seen before and should be dropped
+
+            raises:
+                None
+            '''
+            if delivered.seen((reader.topic, message.id)):
+                self.log.info('redelivery', 'Dropping redelivered message', topic=reader.topic, id=message.id)
+                return True
+            return False
+
+        def replyBody(message):
+            '''
+            function:
+                replyBody: This function takes the reply-to tag off of a reply
+                           from the backend
+
+            args:
+                message: an object that contains the message
+
+            returns:
+                string: the body of the reply, or None if it was requested by
+                        another frontend and should be dropped
+
+            raises:
+                None
+            '''
+            if not self.reply_to:
+                return message.body
+
+            # Replies without a tag come from a backend that doesn't know
+            # about reply-to, so they are for everyone. A "#" in an untagged
+            # reply (e.g. in a caller's name) isn't taken for a tag unless
+            # what is before it is a frontend's channel.
+            tag, separator, body = message.body.partition(REPLY_TO_SEPARATOR)
+            if separator and tag == self.channel:
+                return body
+            if separator and isFrontendChannel(tag):
+                self.log.info('reply_to', 'Dropping reply for another frontend', tag=tag)
+                return None
+            return message.body
+
+        def decodePage(topic, kind, decode, body):
+            '''
+            function:
+                decodePage: This function decodes a page of call history or
+                            blacklist here, on the reader process's core, so
+                            the GUI only has to put the rows in its list. If
+                            it can't be decoded the GUI is sent a "bad_page"
+                            instead, so it stops waiting for it.
+
+            args:
+                topic: the topic the page came from
+                kind: the kind of message the GUI gets the page as (e.g. hist_give)
+                decode: pages.decodeHistoryPage or pages.decodeBlacklistPage
+                body: the body of the reply
+
+            returns:
+                Page: the decoded page, or None if it couldn't be decoded
+
+            raises:
+                None
+            '''
+            try:
+                return decode(body)
+            except (ValueError, IndexError, TypeError) as e:
+                self.logPayload(ringlog.ERROR, topic, 'Dropping page that could not be decoded', body, error=e)
+                fields = body.split(':')
+                offset = int(fields[1]) if len(fields) > 1 and fields[1].isdigit() else None
+                frontend_conn.send(['bad_page', (kind, offset)])
+                return None
+
+        # The reader process has its own profiler, started by SIGUSR1 (which
+        # the GUI passes on) or by the control topic
+        reader_profiler = SamplingProfiler('reader', log=self.log)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: reader_profiler.start(PROFILE_DURATION))
+
+        global frontend_conn, frontend_call_conn
+        frontend_conn = pipe
+        frontend_call_conn = call_pipe
+
+        @call_rec_reader.on_message.connect
+        def call_rec_handler(reader, message):
+            '''
+            function:
+                call_rec_handler: This function handles what to do when a message
+                                  from topic call_received is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            global CALL_INC
+            CALL_INC = True
+            self.turnOnBacklight(True)
+            logReceived('call_received', message)
+            frontend_call_conn.send(['call_rec',message.body])
+
+        @hist_give_reader.on_message.connect
+        def hist_give_handler(reader, message):
+            '''
+            function:
+                hist_give_handler: This function handles what to do when a message
+                                   from topic history_five is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('history_give', message)
+            body = replyBody(message)
+            if body is not None:
+                page = decodePage('history_give', 'hist_give', pages.decodeHistoryPage, body)
+                if page is not None:
+                    frontend_conn.send(['hist_give',page])
+
+        @set_all_reader.on_message.connect
+        def set_all_handler(reader, message):
+            '''
+            function:
+                set_all_handler: This function handles what to do when a message
+                                 from topic settings_all is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('settings_all', message)
+            body = replyBody(message)
+            if body is not None:
+                frontend_conn.send(['set_all',body])
+
+        @set_give_reader.on_message.connect
+        def set_give_handler(reader, message):
+            '''
+            function:
+                set_give_handler: This function handles what to do when a message
+                                  from topic settings_give is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('setting_give', message)
+            body = replyBody(message)
+            if body is not None:
+                frontend_conn.send(['set_give',body])
+
+        @black_give_reader.on_message.connect
+        def black_give_handler(reader, message):
+            '''
+            function
+                black_give_handler: This function handles what to do when a
+                                    message from topic blacklist_give is
+                                    received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message 
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('blacklist_give', message)
+            body = replyBody(message)
+            if body is not None:
+                page = decodePage('blacklist_give', 'black_give', pages.decodeBlacklistPage, body)
+                if page is not None:
+                    frontend_conn.send(['black_give',page])
+
+        @heartbeat_reader.on_message.connect
+        def heartbeat_handler(reader, message):
+            '''
+            function:
+                heartbeat_handler: This function handles what to do when a
+                message from topic heartbeat is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('heartbeat', message)
+            frontend_conn.send(['heartbeat', message.body])
+
+        @pong_reader.on_message.connect
+        def pong_handler(reader, message):
+            '''
+            function:
+                pong_handler: This function handles what to do when a message
+                              from topic frontend_pong is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('frontend_pong', message, ringlog.DEBUG)
+            frontend_conn.send(['pong', message.body])
+
+        @error_reader.on_message.connect
+        def error_handler(reader, message):
+            '''
+            function:
+                error_handler: This function handles what to do when a message
+                               from topic error_handler is received
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('error', message, ringlog.WARNING)
+            frontend_conn.send(['error',message.body])
+
+        @control_reader.on_message.connect
+        def control_handler(reader, message):
+            '''
+            function:
+                control_handler: This function handles what to do when a message
+                                 from topic frontend_control is received. The
+                                 commands are "profile" or "profile:<seconds>",
+                                 which profiles both processes, "memory",
+                                 which reports memory use right away,
+                                 "flight", which dumps the flight recorder,
+                                 and "press:<pin>:<seq>", which presses a
+                                 button for the soak test if the frontend was
+                                 started with --allow-remote-press.
+
+            args:
+                reader: an instance of the reader object
+                message: an object that contains the message
+
+            returns:
+                None
+
+            raises:
+                None
+            '''
+            if isRedelivery(reader, message):
+                return
+            logReceived('frontend_control', message)
+            command = message.body.split(':')
+            if command[0] == 'profile':
+                duration = int(command[1]) if len(command) > 1 and command[1].isdigit() else PROFILE_DURATION
+                reader_profiler.start(duration)
+                frontend_conn.send(['profile', duration])
+            elif command[0] == 'memory':
+                frontend_conn.send(['memory', ''])
+            elif command[0] == 'flight':
+                frontend_conn.send(['flight', ''])
+            elif command[0] == 'press' and not self.allow_remote_press:
+                self.log.warning('control', 'Ignoring remote button press, needs --allow-remote-press')
+            elif command[0] == 'press' and len(command) == 3 and command[1].isdigit():
+                frontend_conn.send(['press', command[1:]])
+
+        # Moving off the shared channel leaves it on nsqd collecting every
+        # message, so delete it before reading on ours
+        if self.channel != LEGACY_CHANNEL:
+            self.deleteLegacyChannel()
+
+        call_rec_reader.start(block=False)
+        hist_give_reader.start(block=False)
+        set_all_reader.start(block=False)
+        set_give_reader.start(block=False)
+        black_give_reader.start(block=False)
+        heartbeat_reader.start(block=False)
+        pong_reader.start(block=False)
+        control_reader.start(block=False)
+        error_reader.start()
+
+    def deleteLegacyChannel(self):
+        '''
+        function:
+            deleteLegacyChannel: This function deletes LEGACY_CHANNEL, which
+                                 every frontend used to read on, from the
+                                 topics it was made for. A topic without it
+                                 (e.g. because it was already deleted) is
+                                 skipped.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        nsqd = gnsq.Nsqd(address='127.0.0.1', http_port=4151)
+        for topic in LEGACY_TOPICS:
+            try:
+                nsqd.delete_channel(topic, LEGACY_CHANNEL)
+                self.log.info('channel', 'Deleted old shared channel', topic=topic, channel=LEGACY_CHANNEL)
+            except Exception as e:
+                self.log.debug('channel', 'Could not delete old shared channel', topic=topic, error=e)
+
+    def makeLogger(self, name):
+        '''
+        function:
+            makeLogger: This function makes a RingLogger with the frontend's
+                        level and rate limits and starts its drain thread
+
+        args:
+            name: name of the process the logger is for
+
+        returns:
+            RingLogger: the logger
+
+        raises:
+            None
+        '''
+        log = ringlog.RingLogger(name, level=self.log_level)
+        for kind, (count, seconds) in LOG_RATE_LIMITS.items():
+            log.setRateLimit(kind, count, seconds)
+        log.start()
+        return log
+
+    def logPayload(self, level, kind, text, body, **fields):
+        '''
+        function:
+            logPayload: This function logs a message body's size, and the body
+                        itself when logging at debug level
+
+        args:
+            level: the ringlog level to log at
+            kind: the kind of the record (normally the topic)
+            text: the text of the record
+            body: the message body
+            fields: any other fields to log
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        fields['size'] = len(body)
+        if self.log.level <= ringlog.DEBUG:
+            fields['body'] = body
+        self.log.log(level, kind, text, **fields)
+
+    def sendMessage(self, topic, message, wait):
+        '''
+        function:
+            sendMessage: This function sends a message to a specified topic
+
+        args:
+            topic: The topic to publish the message to
+            message: The message to publish to that topic
+            wait: Boolean variable to indicate if it should wait for a message
+                  to be received before continuing
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+
+        # If wait is specified set self.waiting_for_message to true so that the
+        # GUI will wait for a received message before continuing (e.g. if the 
+        # user requests the settings, we will wait for the settings to come back
+        # before letting the user do something
+        self.waiting_for_message = wait
+
+        # Remember which screen the reply to a request is for, and tell the
+        # backend which channel the reply is for if several frontends share it
+        if topic in REPLY_BY_REQUEST:
+            self.response_generation[REPLY_BY_REQUEST[topic]] = self.screen_generation
+
+            # Time page requests so the pager knows how slow the backend is
+            if topic in ('history_get', 'blacklist_get'):
+                self.pager.requestSent((topic, int(message.split(':')[1])))
+            if self.reply_to:
+                message = '{}{}{}'.format(message, REPLY_TO_SEPARATOR, self.channel)
+
+        self.logPayload(ringlog.INFO, topic, 'Sending message', message)
+        self.recorder.record('out', topic, size=len(message))
+        if topic in DURABLE_TOPICS and self.outbox is not None:
+            self.outbox.put(topic, [message])
+        else:
+            self.conn.publish(topic,message)
+
+    def sendMessages(self, topic, messages):
+        '''
+        function:
+            sendMessages: This function sends several messages to a topic in
+                          one publish. The backend still gets each one as its
+                          own message.
+
+        args:
+            topic: The topic to publish the messages to
+            messages: list of messages to publish, none with a newline in it
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if not messages:
+            return
+        self.logPayload(ringlog.INFO, topic, 'Sending messages', '\n'.join(messages), count=len(messages))
+        self.recorder.record('out', topic, count=len(messages))
+        if topic in DURABLE_TOPICS and self.outbox is not None:
+            self.outbox.put(topic, messages)
+        else:
+            self.conn.multipublish(topic, messages)
+
+    def setupWindow(self, parent, title):
+        '''
+        function:
+            setupWindow: This function builds the wx window the GUI goes in.
+                         The framebuffer renderer has no window.
+
+        args:
+            parent: The parent object (using default)
+            title: the title of the window
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if self.renderer == 'framebuffer':
+            self.window = None
+            return
+
+        # Move the cursor out of the way
+        from Xlib import display
+        d = display.Display()
+        s = d.screen()
+        root = s.root
+        root.warp_pointer(1200,1200)
+        d.sync()
+
+        # Build the window and center it on the display
+        import wx
+        self.window = wx.Frame(parent, title=title, size=(800,480))
+        self.window.Centre()
+
+    def setupGUIElements(self):
+        '''
+        function:
             setupGUIElements: This function builds the 3 textboxes for the GUI
 
         args:
@@ -1090,21 +3307,34 @@ class FrontEnd(wx.Frame):
             None
         '''
 
+        # The canvas and framebuffer renderers draw all of the boxes
+        # themselves. Their boxes take the place of the text boxes below.
+        if self.renderer == 'canvas':
+            from canvas_renderer import CanvasRenderer
+            self.canvas = CanvasRenderer(self.window)
+            self.firstTextBox, self.secondTextBox, self.thirdTextBox, self.fourthTextBox, self.fifthTextBox = self.canvas.boxes
+            return
+        if self.renderer == 'framebuffer':
+            self.canvas = fb_display.FramebufferRenderer(fb_display.Framebuffer(self.framebuffer_path))
+            self.firstTextBox, self.secondTextBox, self.thirdTextBox, self.fourthTextBox, self.fifthTextBox = self.canvas.boxes
+            return
+
         # Create all three textboxes and position them with a little space
         # between each one to accentuate each one
-        self.firstTextBox = wx.TextCtrl(self,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,0),size=(800,152))
+        import wx
+        self.firstTextBox = wx.TextCtrl(self.window,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,0),size=(800,152))
         self.firstTextBox.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
 
-        self.secondTextBox = wx.TextCtrl(self,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,155),size=(800,152))
+        self.secondTextBox = wx.TextCtrl(self.window,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,155),size=(800,152))
         self.secondTextBox.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
 
-        self.thirdTextBox = wx.TextCtrl(self,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,310),size=(800,170))
+        self.thirdTextBox = wx.TextCtrl(self.window,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,310),size=(800,170))
         self.thirdTextBox.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
 
-        self.fourthTextBox = wx.TextCtrl(self,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,0),size=(800,304))
+        self.fourthTextBox = wx.TextCtrl(self.window,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,0),size=(800,304))
         self.fourthTextBox.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
 
-        self.fifthTextBox = wx.TextCtrl(self,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,310),size=(800,170))
+        self.fifthTextBox = wx.TextCtrl(self.window,style=wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_CENTRE|wx.TE_WORDWRAP,pos=(0,310),size=(800,170))
         self.fifthTextBox.SetFont(wx.Font(30,wx.MODERN,wx.NORMAL,wx.NORMAL))
 
         # Create a sizer that overlays on top of the 3 text boxes to have 2 text boxes
@@ -1115,6 +3345,30 @@ class FrontEnd(wx.Frame):
         self.sizer.Hide(self.fourthTextBox)
         self.sizer.Hide(self.fifthTextBox)
 
+    def showStateBoxes(self, show):
+        '''
+        function:
+            showStateBoxes: This function shows or hides the 2 boxes used when
+                            picking a setting state
+
+        args:
+            show: True to show the 2 boxes over the normal 3, False to hide them
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if self.renderer in ('canvas', 'framebuffer'):
+            self.canvas.showOverlay(show)
+        elif show:
+            self.sizer.Show(self.fourthTextBox)
+            self.sizer.Show(self.fifthTextBox)
+        else:
+            self.sizer.Hide(self.fourthTextBox)
+            self.sizer.Hide(self.fifthTextBox)
+
     def loadCallHistory(self):
         '''
         function:
@@ -1137,13 +3391,21 @@ class FrontEnd(wx.Frame):
         CALL_INC = False
 
         # Reset the points and reload the call history
-        self.menu_items_list = ['{}\nSettings\n{}'.format(self.line_space,self.line_space)]
+        self.menu_items_list = [self.historyHeader()]
         self.menu_ptr = 1
         self.current_selected_text_box = 0
         self.current_top_ptr = 1
         self.using_settings = False
+        self.using_blacklist = False
         self.end_of_call_history = False
-        self.sendMessage('history_get','10:0',False)
+        self.history_days = {}
+        self.history_day_index = []
+        self.history_filter_local = False
+        self.history_filter_next = 0
+        self.nav_stack = []
+        self.new_calls = []
+        self.changeScreen()
+        self.sendMessage('history_get',self.historyRequest(0),False)
 	
         # highlight the currently selected menu item
         self.highlightBox(self.firstTextBox)
@@ -1164,10 +3426,13 @@ class FrontEnd(wx.Frame):
 	    None
 
 	'''
-        self.sendMessage('history_get','10:0',True)
+        self.sendMessage('history_get',self.historyRequest(0),True)
 	
         # Bind all 3 textboxes to go to the keyEventHandler whenever a key
-        # is pressed down
+        # is pressed down. Without X there is no keyboard, only the buttons.
+        if self.renderer == 'framebuffer':
+            return
+        import wx
         self.firstTextBox.Bind(wx.EVT_KEY_DOWN, self.keyEventHandler)
         self.secondTextBox.Bind(wx.EVT_KEY_DOWN, self.keyEventHandler)
         self.thirdTextBox.Bind(wx.EVT_KEY_DOWN, self.keyEventHandler)
@@ -1198,14 +3463,20 @@ class FrontEnd(wx.Frame):
             self.highlightBox(self.fifthTextBox)
 
         else:
-            # Load the menu items based on what the current_top_ptr is pointing to
-            self.firstTextBox.SetValue(list_to_use[self.current_top_ptr])
-            self.secondTextBox.SetValue(list_to_use[self.current_top_ptr+1])
-            self.thirdTextBox.SetValue(list_to_use[self.current_top_ptr+2])
+            # Load the menu items based on what the current_top_ptr is pointing to.
+            # Lists can shrink below three rows (e.g. after removing numbers from
+            # the blacklist), so leave any missing rows blank.
+            rows = list_to_use[self.current_top_ptr:self.current_top_ptr+3] + ['', '', '']
+            self.firstTextBox.SetValue(rows[0])
+            self.secondTextBox.SetValue(rows[1])
+            self.thirdTextBox.SetValue(rows[2])
 
             # re-highlight the currently selected item
             self.highlightBox(self.text_box_num_dict[self.current_selected_text_box])
 
+            # Fetch any rows on screen that were jumped over
+            self.requestVisiblePages(list_to_use)
+
     def highlightBox(self, textBox):
 	'''
 	function:
@@ -1245,28 +3516,8 @@ class FrontEnd(wx.Frame):
             None
         '''
 
-        # Reformat the number
-        number = '        {} ({}) {} - {}      '.format(number[:1],number[1:4],number[4:7],number[-4:])
-        
-        # Get the number of spaces to pad and format the name
-        num_pad_spaces = int((32 - len(name))/2)
-        name = '{}{}{}'.format(num_pad_spaces*' ',name,num_pad_spaces*' ')
-
-        # Get the number of spaces to pad and format the date
-        # date is received like: 20181125T1656
-        dateObj = datetime.strptime(time, "%Y%m%dT%H%M")
-        dateStr = dateObj.strftime("%m/%d/%Y %I:%M %p")
-        
-        num_pad_spaces = int((32 - len(dateStr))/2)
-        time = '{}{}{}'.format(num_pad_spaces*' ',dateStr,num_pad_spaces*' ')
-
-        if wasBlocked == '1':
-            num_pad_spaces = int((32 - len('Blocked'))/2)
-            blocked = '{}{}{}'.format(num_pad_spaces*' ','Blocked',num_pad_spaces*' ')
-            return '{}\n{}\n{}'.format(number,name, blocked)
-
-        # Return the reformatted string
-        return '{}\n{}\n{}'.format(number,name,time)
+        # Rows are laid out (and cached) by the render cache
+        return render_cache.formatHistoryRow(number, name, time, wasBlocked)
 
     def unformatNumber(self, number):
         chars = ['(', ')', '-']
@@ -1295,7 +3546,11 @@ class FrontEnd(wx.Frame):
         # Get the event code
         code = event.GetKeyCode()
         self.turnOnBacklight(True)
-        if self.key_by_ascii_dict[code] == 'up':
+
+        # Alt with the arrow keys jumps by day or page like holding the buttons
+        if event.AltDown() and self.key_by_ascii_dict.get(code) in ('up', 'down'):
+            self.jumpHandler(-1 if self.key_by_ascii_dict[code] == 'up' else 1)
+        elif self.key_by_ascii_dict[code] == 'up':
             self.upHandler()
         elif self.key_by_ascii_dict[code] == 'down':
             self.downHandler()
@@ -1307,13 +3562,49 @@ class FrontEnd(wx.Frame):
 # If running this program by itself (Please only do this...)
 if __name__ == '__main__':
 
-    # Create an instance of a wx Application
-    app = wx.App()
-
-    # Create an instance of the FrontEnd class and show the GUI
-    window = FrontEnd(None, title='Screen Door')
-    window.Show()
-
-    # Do Forever Loop
-    app.MainLoop()
+    # Let the renderer be picked on the command line
+    parser = argparse.ArgumentParser(description='Front door of Screendoor for LCD/buttons')
+    parser.add_argument('--renderer', choices=['textctrl', 'canvas', 'framebuffer'], default='textctrl',
+                        help='draw the rows with wx.TextCtrl widgets, on a single canvas or straight into the framebuffer without X')
+    parser.add_argument('--framebuffer', default='/dev/fb0',
+                        help='framebuffer device to draw into with the framebuffer renderer')
+    parser.add_argument('--channel', default=None,
+                        help='NSQ channel to read on (defaults to one unique to this device)')
+    parser.add_argument('--reply-to', action='store_true',
+                        help='tag requests with our channel and drop replies tagged for other frontends')
+    parser.add_argument('--log-level', choices=['debug', 'info', 'warning', 'error'], default='info',
+                        help='lowest level of log records to write (debug includes message bodies)')
+    parser.add_argument('--transport', choices=['pipe', 'shm'], default='pipe',
+                        help='send messages from the reader process to the GUI through pipes or shared memory rings')
+    parser.add_argument('--allow-remote-press', action='store_true',
+                        help='let "press" on the frontend_control topic press buttons (for soak.py only)')
+    parser.add_argument('--outbox', default=OUTBOX_PATH,
+                        help='journal to keep blacklist and setting changes in until nsqd has taken them')
+    args = parser.parse_args()
+    log_level = getattr(ringlog, args.log_level.upper())
+
+    # Without X there is no wx Application, just the framebuffer's loop
+    if args.renderer == 'framebuffer':
+        if fb_display is None:
+            parser.error('the framebuffer renderer needs Pillow')
+        frontend = FrontEnd(None, title='Screen Door', renderer=args.renderer, framebuffer=args.framebuffer,
+                            channel=args.channel, reply_to=args.reply_to, log_level=log_level,
+                            outbox_path=args.outbox, transport=args.transport,
+                            allow_remote_press=args.allow_remote_press)
+        fb_display.MainLoop(frontend.timer, frontend.canvas)
+
+    else:
+        # Create an instance of a wx Application
+        import wx
+        app = wx.App()
+
+        # Create an instance of the FrontEnd class and show the GUI
+        frontend = FrontEnd(None, title='Screen Door', renderer=args.renderer,
+                            channel=args.channel, reply_to=args.reply_to, log_level=log_level,
+                            outbox_path=args.outbox, transport=args.transport,
+                            allow_remote_press=args.allow_remote_press)
+        frontend.window.Show()
+
+        # Do Forever Loop
+        app.MainLoop()
 
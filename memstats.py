@@ -0,0 +1,206 @@
+'''
+ memstats.py
+ Memory accounting for the frontend: RSS of a process, entry counts and
+ byte estimates for the lists the GUI keeps, how much is waiting in a pipe,
+ and memory snapshots: tracemalloc's where it is available, otherwise
+ (as on the Python 2.7 the frontend runs on) counts of the objects the
+ garbage collector tracks by type
+ Created: 10/19/2026
+'''
+
+import os, sys, time, fcntl, termios, array, gc
+
+# tracemalloc is only there on newer Pythons
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Where memory snapshots are written
+SNAPSHOT_DIR = '/tmp'
+
+# Number of allocation sites (or object types) to write in a snapshot
+SNAPSHOT_LINES = 25
+
+# Object counts by type from the last snapshot taken without tracemalloc,
+# so the next one can show what grew
+last_object_counts = {}
+
+
+def readRSS(pid):
+    '''
+    function:
+        readRSS: function to read the resident set size of a process
+
+    args:
+        pid: the process id
+
+    returns:
+        int: the RSS in kB, or None if the process can't be read
+
+    raises:
+        None
+    '''
+    try:
+        with open('/proc/{}/status'.format(pid)) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def listStats(items):
+    '''
+    function:
+        listStats: function to count the entries in a list and estimate the
+                   bytes it holds. Strings that appear more than once (like
+                   placeholder rows) are only counted once.
+
+    args:
+        items: the list to measure
+
+    returns:
+        (entries, bytes) tuple
+
+    raises:
+        None
+    '''
+    seen = set()
+    size = sys.getsizeof(items)
+    for item in items:
+        if id(item) not in seen:
+            seen.add(id(item))
+            size += sys.getsizeof(item)
+    return len(items), size
+
+
+def pipeBacklog(conn):
+    '''
+    function:
+        pipeBacklog: function to find out how many bytes are waiting to be
+                     read from a multiprocessing connection
+
+    args:
+        conn: the connection (or shared memory ring) to check
+
+    returns:
+        int: the number of bytes waiting, or None if it can't be found
+
+    raises:
+        None
+    '''
+    # The shared memory ring keeps its own count
+    if hasattr(conn, 'backlog'):
+        return conn.backlog()
+
+    waiting = array.array('i', [0])
+    try:
+        fcntl.ioctl(conn.fileno(), termios.FIONREAD, waiting, True)
+    except (IOError, OSError, ValueError):
+        return None
+    return waiting[0]
+
+
+def startTracing():
+    '''
+    function:
+        startTracing: function to start tracemalloc if it is available and
+                      not already running
+
+    args:
+        None
+
+    returns:
+        bool: True if tracemalloc is tracing
+
+    raises:
+        None
+    '''
+    if tracemalloc is None:
+        return False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return True
+
+
+def countObjects():
+    '''
+    function:
+        countObjects: function to count the objects the garbage collector
+                      tracks, by type. Strings and numbers aren't tracked,
+                      but the lists, dicts and instances holding them are.
+
+    args:
+        None
+
+    returns:
+        dictionary: type name to number of objects
+
+    raises:
+        None
+    '''
+    counts = {}
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def writeSnapshot(name, directory=SNAPSHOT_DIR):
+    '''
+    function:
+        writeSnapshot: function to write a memory snapshot to a file. With
+                       tracemalloc tracing it has the top allocation sites.
+                       Without it, it has the most common object types with
+                       how much each grew since the last snapshot.
+
+    args:
+        name: name of the process, used in the file name
+        directory: where to write the snapshot
+
+    returns:
+        string: the path written
+
+    raises:
+        IOError: if the file can't be written
+    '''
+    global last_object_counts
+    if tracemalloc is None or not tracemalloc.is_tracing():
+        path = os.path.join(directory, 'screendoor-{}-{}-{}.objects'.format(
+            name, os.getpid(), time.strftime('%Y%m%dT%H%M%S')))
+        counts = countObjects()
+        with open(path, 'w') as f:
+            f.write('{} objects tracked by gc\n'.format(sum(counts.values())))
+            for type_name in sorted(counts, key=counts.get, reverse=True)[:SNAPSHOT_LINES]:
+                f.write('{} {} ({:+d})\n'.format(type_name, counts[type_name],
+                                                 counts[type_name] - last_object_counts.get(type_name, 0)))
+        last_object_counts = counts
+        return path
+
+    path = os.path.join(directory, 'screendoor-{}-{}-{}.tracemalloc'.format(
+        name, os.getpid(), time.strftime('%Y%m%dT%H%M%S')))
+    stats = tracemalloc.take_snapshot().statistics('lineno')
+    with open(path, 'w') as f:
+        for stat in stats[:SNAPSHOT_LINES]:
+            f.write('{}\n'.format(stat))
+    return path
+
+
+def formatStats(stats):
+    '''
+    function:
+        formatStats: function to lay out a dictionary of stats as a message
+                     body like "name=value;name=value"
+
+    args:
+        stats: dictionary of stat name to value
+
+    returns:
+        string: the formatted stats
+
+    raises:
+        None
+    '''
+    return ';'.join('{}={}'.format(name, stats[name]) for name in sorted(stats))
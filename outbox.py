@@ -0,0 +1,345 @@
+'''
+ outbox.py
+ Durable outbox for publishes that mustn't be lost while nsqd is down or
+ restarting (blacklisting a call, removing a number, changing a setting).
+ Each publish is appended to a journal on disk and sent from a background
+ thread in the order it was made. Ones that fail stay in the journal and are
+ sent again when nsqd is back, including after a reboot. The journal is
+ fsynced in batches to spare the SD card, and rewritten with only what is
+ still unsent once it has grown.
+ Created: 10/19/2026
+'''
+
+import json, os, threading, time
+from collections import OrderedDict
+
+# Seconds between fsyncs of the journal while there are unsynced records
+SYNC_INTERVAL = 1.0
+
+# Seconds between attempts to send while nsqd is unreachable
+RETRY_INTERVAL = 5.0
+
+# Records in the journal before it is rewritten with only the unsent ones
+COMPACT_RECORDS = 256
+
+# Most messages to the same topic sent in one multipublish
+BATCH_SIZE = 100
+
+# Topics whose newer messages replace unsent older ones for the same key,
+# and how to get the key from a message
+SUPERSEDING_TOPICS = {'setting_set': lambda message: message.split(':', 1)[0]}
+
+# Encoding messages that aren't UTF-8 (e.g. a caller name as the phone line
+# sent it) are kept in the journal with. Every byte string decodes as it.
+FALLBACK_ENCODING = 'latin-1'
+
+
+def journalRecord(message_id, topic, message):
+    '''
+    function:
+        journalRecord: function to make the journal record for a message.
+                       json only takes byte strings that are UTF-8, so other
+                       messages are kept decoded as FALLBACK_ENCODING with
+                       the encoding on the end of the record.
+
+    args:
+        message_id: the message's id
+        topic: the topic to publish to
+        message: the message, a byte string
+
+    returns:
+        list: [id, topic, message] or [id, topic, message, encoding]
+
+    raises:
+        None
+    '''
+    try:
+        message.decode('utf-8')
+    except UnicodeDecodeError:
+        return [message_id, topic, message.decode(FALLBACK_ENCODING), FALLBACK_ENCODING]
+    return [message_id, topic, message]
+
+
+class Outbox(object):
+    '''
+    Outbox class which journals publishes and sends them from a background
+    thread, in order, until each one has been taken by nsqd
+    '''
+    def __init__(self, path, publish, multipublish=None, log=None):
+        '''
+        function:
+            __init__: constructor for the Outbox class. Anything left unsent
+                      in the journal by the last run is loaded to be sent
+                      first.
+
+        args:
+            path: the journal file
+            publish: function taking a topic and a message that sends it,
+                     raising if it couldn't
+            multipublish: function taking a topic and a list of messages that
+                          sends them in one go, raising if it couldn't
+            log: RingLogger to log to, if any
+
+        returns:
+            None
+
+        raises:
+            IOError: if the journal can't be written
+        '''
+        self.path = path
+        self.publish = publish
+        self.multipublish = multipublish
+        self.log = log
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.worker = None
+
+        # Unsent messages by id, oldest first
+        self.pending = OrderedDict()
+        self.next_id = 1
+        self.records = 0
+        self.unsynced = False
+        self.last_sync = time.time()
+        self.load()
+
+    def load(self):
+        '''
+        function:
+            load: This function reads back what the journal still has unsent
+                  and rewrites it with just that
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            IOError: if the journal can't be rewritten
+        '''
+        try:
+            with open(self.path) as journal:
+                for line in journal:
+                    # A power cut can leave the last line half written
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    # json gives back unicode, but gnsq sends byte strings
+                    if len(record) in (3, 4):
+                        encoding = record[3] if len(record) == 4 else 'utf-8'
+                        self.pending[record[0]] = (record[1].encode('utf-8'), record[2].encode(encoding))
+                    elif len(record) == 1:
+                        self.pending.pop(record[0], None)
+                    self.next_id = max(self.next_id, record[0] + 1)
+        except IOError:
+            pass
+
+        if self.pending and self.log:
+            self.log.warning('outbox', 'Loaded unsent messages', count=len(self.pending))
+        self.compact()
+
+    def start(self):
+        '''
+        function:
+            start: This function starts the thread that sends the messages
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.worker = threading.Thread(target=self.run, name='outbox')
+        self.worker.daemon = True
+        self.worker.start()
+
+    def put(self, topic, messages):
+        '''
+        function:
+            put: This function journals messages and wakes the thread to send
+                 them. Unsent messages they supersede are dropped.
+
+        args:
+            topic: the topic to publish to
+            messages: list of messages to publish. Messages put together are
+                      sent together in one multipublish where possible.
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        key_of = SUPERSEDING_TOPICS.get(topic)
+        with self.lock:
+            for message in messages:
+                # Only the newest value of a setting is worth sending
+                if key_of is not None:
+                    key = key_of(message)
+                    for old_id, (old_topic, old_message) in self.pending.items():
+                        if old_topic == topic and key_of(old_message) == key:
+                            del self.pending[old_id]
+                            self.append([old_id])
+
+                message_id = self.next_id
+                self.next_id += 1
+                self.pending[message_id] = (topic, message)
+                self.append(journalRecord(message_id, topic, message))
+        self.wakeup.set()
+
+    def append(self, record):
+        # Called with the lock held. The record reaches the disk at the next
+        # sync, so a power cut loses at most SYNC_INTERVAL seconds of them.
+        try:
+            with open(self.path, 'a') as journal:
+                journal.write(json.dumps(record) + '\n')
+            self.records += 1
+            self.unsynced = True
+        except IOError as e:
+            if self.log:
+                self.log.error('outbox', 'Could not write journal', error=e)
+
+    def sync(self):
+        '''
+        function:
+            sync: This function fsyncs the journal if it has been written to
+                  since the last time
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            if not self.unsynced:
+                return
+            self.unsynced = False
+            self.last_sync = time.time()
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                if self.log:
+                    self.log.error('outbox', 'Could not sync journal', error=e)
+
+    def compact(self):
+        '''
+        function:
+            compact: This function rewrites the journal with only the unsent
+                     messages. The new journal is synced and then renamed
+                     over the old one, so a power cut leaves one or the other.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            IOError: if the journal can't be rewritten
+        '''
+        with self.lock:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as journal:
+                for message_id, (topic, message) in self.pending.items():
+                    journal.write(json.dumps(journalRecord(message_id, topic, message)) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+            os.rename(temp_path, self.path)
+            self.records = len(self.pending)
+            self.unsynced = False
+
+    def sendPending(self):
+        '''
+        function:
+            sendPending: This function sends the unsent messages, oldest
+                         first, stopping at the first one that fails so they
+                         stay in order
+
+        args:
+            None
+
+        returns:
+            bool: True if everything was sent
+
+        raises:
+            None
+        '''
+        while True:
+            # Take the oldest message and, if they can go together, the ones
+            # after it for the same topic
+            with self.lock:
+                if not self.pending:
+                    return True
+                batch = []
+                for message_id, (topic, message) in self.pending.iteritems():
+                    if batch and (topic != batch[0][1] or len(batch) == BATCH_SIZE or self.multipublish is None):
+                        break
+                    batch.append((message_id, topic, message))
+            topic = batch[0][1]
+            messages = [message for message_id, topic, message in batch]
+
+            # Anything the connection raises means nsqd didn't take them
+            try:
+                if len(messages) > 1:
+                    self.multipublish(topic, messages)
+                else:
+                    self.publish(topic, messages[0])
+            except Exception as e:
+                if self.log:
+                    self.log.warning('outbox', 'Could not send, will retry', topic=topic,
+                                     pending=len(self.pending), error=e)
+                return False
+
+            with self.lock:
+                # A newer setting may have replaced one while it was being sent
+                for message_id, topic, message in batch:
+                    if self.pending.pop(message_id, None) is not None:
+                        self.append([message_id])
+            if self.log:
+                self.log.debug('outbox', 'Sent', topic=topic, count=len(messages))
+
+    def run(self):
+        '''
+        function:
+            run: This function sends messages as they are put, retries every
+                 RETRY_INTERVAL seconds while nsqd is unreachable, and syncs
+                 and compacts the journal. It runs on its own thread.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        sent = True
+        while True:
+            self.wakeup.wait(SYNC_INTERVAL if self.unsynced else RETRY_INTERVAL if not sent else None)
+            self.wakeup.clear()
+
+            # Batch the fsyncs: put only wakes this thread to send
+            if self.unsynced and time.time() - self.last_sync >= SYNC_INTERVAL:
+                self.sync()
+
+            sent = self.sendPending()
+
+            if self.records > COMPACT_RECORDS:
+                try:
+                    self.compact()
+                except (IOError, OSError) as e:
+                    if self.log:
+                        self.log.error('outbox', 'Could not compact journal', error=e)
@@ -0,0 +1,180 @@
+'''
+ pager.py
+ Picks how many rows to ask the backend for in each page of the call
+ history or blacklist. Small pages come back quickly when the user is just
+ glancing at the screen. When the user is scrolling quickly, or the backend
+ is slow to answer, pages get bigger so fewer round-trips are needed.
+ Requests are sent from the GUI thread and replies arrive on the message
+ thread, so everything the pager keeps is behind a lock.
+ Created: 10/19/2026
+'''
+
+import threading
+from collections import deque
+from scheduler import monotonic
+
+# Smallest and largest page to ask for
+MIN_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 40
+
+# Seconds of scrolling to average the scroll speed over
+SCROLL_WINDOW = 3.0
+
+# Seconds of scrolling a page should last beyond the time it takes to arrive
+LOOKAHEAD = 2.0
+
+# Round-trip time to assume until one has been measured, in seconds
+DEFAULT_RTT = 0.2
+
+# Weight given to each new round-trip time in the running average
+RTT_WEIGHT = 0.25
+
+# Rows shown on the screen at once
+SCREEN_ROWS = 3
+
+
+class AdaptivePager(object):
+    '''
+    AdaptivePager class which keeps track of how fast the user is scrolling
+    and how long the backend takes to answer, and sizes pages from them. It
+    can be used from any thread.
+    '''
+    def __init__(self, min_size=MIN_PAGE_SIZE, max_size=MAX_PAGE_SIZE):
+        '''
+        function:
+            __init__: constructor for the AdaptivePager class
+
+        args:
+            min_size: the smallest page to ask for
+            max_size: the largest page to ask for
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.min_size = min_size
+        self.max_size = max_size
+        self.rtt = DEFAULT_RTT
+        self.scrolls = deque(maxlen=64)
+        self.sent = {}
+        self.lock = threading.Lock()
+
+    def recordScroll(self, rows=1):
+        '''
+        function:
+            recordScroll: This function records that the selection moved
+
+        args:
+            rows: how many rows it moved
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.scrolls.append((monotonic(), rows))
+
+    def recordRTT(self, seconds):
+        '''
+        function:
+            recordRTT: This function adds a measured round-trip time to the
+                       running average
+
+        args:
+            seconds: the round-trip time
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.rtt += RTT_WEIGHT * (seconds - self.rtt)
+
+    def requestSent(self, key):
+        '''
+        function:
+            requestSent: This function notes when a page was asked for so its
+                         round-trip time can be measured
+
+        args:
+            key: something identifying the page, e.g. ('hist_give', offset)
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        now = monotonic()
+
+        # Forget requests that were never answered
+        with self.lock:
+            for old_key, sent in self.sent.items():
+                if now - sent > 60:
+                    del self.sent[old_key]
+            self.sent[key] = now
+
+    def replyReceived(self, key):
+        '''
+        function:
+            replyReceived: This function measures the round-trip time of a page
+                           that was asked for with requestSent
+
+        args:
+            key: the key the request was noted with
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            sent = self.sent.pop(key, None)
+        if sent is not None:
+            self.recordRTT(monotonic() - sent)
+
+    def scrollSpeed(self):
+        '''
+        function:
+            scrollSpeed: This function works out how fast the user has been
+                         scrolling recently
+
+        args:
+            None
+
+        returns:
+            float: rows per second over the last SCROLL_WINDOW seconds
+
+        raises:
+            None
+        '''
+        since = monotonic() - SCROLL_WINDOW
+        with self.lock:
+            return sum(rows for when, rows in self.scrolls if when > since) / SCROLL_WINDOW
+
+    def pageSize(self):
+        '''
+        function:
+            pageSize: This function picks the size of the next page. It is
+                      enough rows to fill the screen plus what the user will
+                      scroll past while the page is on its way and for
+                      LOOKAHEAD seconds after, kept between the bounds.
+
+        args:
+            None
+
+        returns:
+            int: the number of rows to ask for
+
+        raises:
+            None
+        '''
+        size = SCREEN_ROWS + int(self.scrollSpeed() * (self.rtt + LOOKAHEAD) + 0.5)
+        return max(self.min_size, min(self.max_size, size))
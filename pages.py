@@ -0,0 +1,170 @@
+'''
+ pages.py
+ Decodes the pages of call history and blacklist the backend sends into
+ rows ready to be put on screen. The reader process does this before
+ sending a page down the pipe, so the splitting and formatting run on the
+ Pi's other core instead of in the GUI process next to wx. It also holds
+ the filters the call history can be viewed through.
+ Created: 10/19/2026
+'''
+
+from collections import namedtuple
+from callers import normalizeNumber, stampMinutes
+import render_cache
+
+# A decoded page. count and offset are as the backend sent them (a count of
+# 0 means there is nothing from offset on), items are the decoded entries
+# and rows are the formatted rows, one for each item.
+Page = namedtuple('Page', ['count', 'offset', 'items', 'rows'])
+
+# A call in a page of call history. blocked is '1' if the call was blocked.
+Call = namedtuple('Call', ['number', 'name', 'time', 'blocked'])
+
+# Filters the call history can be viewed through, as they are sent on the
+# end of history_get. A filter on one caller is NUMBER_FILTER followed by
+# the last 10 digits of their number.
+BLOCKED_FILTER = 'blocked'
+ALLOWED_FILTER = 'allowed'
+NUMBER_FILTER = 'number='
+
+
+def decodeHistoryPage(body):
+    '''
+    function:
+        decodeHistoryPage: function to decode a hist_give message
+
+    args:
+        body: the message, "count:offset:number;name;time;blocked:..."
+
+    returns:
+        Page: the page, with a Call for each item
+
+    raises:
+        ValueError: if the message isn't laid out as above, or a call's time
+                    isn't in the format the backend sends
+        IndexError: if the message has fewer calls than it says
+    '''
+    msg_list = body.split(':')
+    count, offset = int(msg_list[0]), int(msg_list[1])
+    items = []
+    rows = []
+    for item in range(2, count+2):
+        call = Call(*msg_list[item].split(';')[:4])
+
+        # Blocked calls are formatted without parsing their time, so check
+        # it here rather than have the caller index trip over it later
+        stampMinutes(call.time)
+        items.append(call)
+        rows.append(render_cache.formatHistoryRow(call.number, call.name, call.time, call.blocked))
+    return Page(count, offset, items, rows)
+
+
+def decodeBlacklistPage(body):
+    '''
+    function:
+        decodeBlacklistPage: function to decode a black_give message
+
+    args:
+        body: the message, "count:offset:number;number;..."
+
+    returns:
+        Page: the page, with the unformatted numbers as the items. The rows
+              are as the numbers look when they aren't marked for removal.
+
+    raises:
+        ValueError: if the message isn't laid out as above
+        IndexError: if the message has no numbers but a count
+    '''
+    msg_list = body.split(':')
+    count, offset = int(msg_list[0]), int(msg_list[1])
+    items = msg_list[2].split(';') if count else []
+    return Page(count, offset, items, [render_cache.formatBlacklistRow(number) for number in items])
+
+
+def numberFilter(number):
+    '''
+    function:
+        numberFilter: function to make the filter for the calls from one number
+
+    args:
+        number: the caller's number, in any format
+
+    returns:
+        string: the filter
+
+    raises:
+        None
+    '''
+    return NUMBER_FILTER + normalizeNumber(number)
+
+
+def filterLabel(history_filter):
+    '''
+    function:
+        filterLabel: function to name a filter for the screen
+
+    args:
+        history_filter: the filter, or None for every call
+
+    returns:
+        string: the name, e.g. "Blocked calls"
+
+    raises:
+        None
+    '''
+    if history_filter == BLOCKED_FILTER:
+        return 'Blocked calls'
+    if history_filter == ALLOWED_FILTER:
+        return 'Allowed calls'
+    if history_filter and history_filter.startswith(NUMBER_FILTER):
+        digits = history_filter[len(NUMBER_FILTER):]
+        return 'Calls from ({}) {} - {}'.format(digits[:3], digits[3:6], digits[6:])
+    return 'All calls'
+
+
+def matchesFilter(call, history_filter):
+    '''
+    function:
+        matchesFilter: function to check whether a call is in a filtered view
+                       of the call history
+
+    args:
+        call: the Call
+        history_filter: the filter, or None for every call
+
+    returns:
+        bool: True if the call should be shown
+
+    raises:
+        None
+    '''
+    if history_filter == BLOCKED_FILTER:
+        return call.blocked == '1'
+    if history_filter == ALLOWED_FILTER:
+        return call.blocked != '1'
+    if history_filter and history_filter.startswith(NUMBER_FILTER):
+        return normalizeNumber(call.number) == history_filter[len(NUMBER_FILTER):]
+    return True
+
+
+def filterPage(page, history_filter):
+    '''
+    function:
+        filterPage: function to drop the calls a filter doesn't match from a
+                    page of call history, for a backend that sent the whole
+                    history instead of filtering it
+
+    args:
+        page: the decoded hist_give Page
+        history_filter: the filter, or None for every call
+
+    returns:
+        Page: the page with only the matching items and rows. count and
+              offset are left as the backend sent them, as they count the
+              backend's rows.
+
+    raises:
+        None
+    '''
+    kept = [index for index, call in enumerate(page.items) if matchesFilter(call, history_filter)]
+    return Page(page.count, page.offset, [page.items[index] for index in kept], [page.rows[index] for index in kept])
@@ -0,0 +1,195 @@
+'''
+ ping.py
+ Keeps track of the pings the frontend sends the backend and the pongs that
+ come back. Each ping carries the frontend's channel and a sequence number,
+ which the backend echoes, so round-trip times can be measured one by one.
+ A run of pings that go unanswered means the backend (or nsqd) is gone,
+ which is noticed in seconds instead of waiting out the heartbeat timeout.
+ Pings are sent from the GUI thread and pongs arrive on the message thread,
+ so the pings waiting for an answer are behind a lock.
+ Created: 10/19/2026
+'''
+
+import threading
+from collections import deque
+from scheduler import monotonic
+
+# Seconds between pings
+PING_INTERVAL = 5
+
+# Seconds a ping has to be answered in before it counts as missed
+PING_TIMEOUT = 3
+
+# Missed pings in a row that mean the backend is gone
+PING_MISSES = 3
+
+# Most round-trip times kept for the percentiles
+SAMPLE_SIZE = 200
+
+# Percentiles to report
+PERCENTILES = (50, 90, 99)
+
+
+class PingMonitor(object):
+    '''
+    PingMonitor class which makes pings, matches pongs to them and keeps
+    the round-trip times
+    '''
+    def __init__(self, channel, samples=SAMPLE_SIZE):
+        '''
+        function:
+            __init__: constructor for the PingMonitor class
+
+        args:
+            channel: the frontend's channel, so pongs for other frontends
+                     sharing the backend can be told apart
+            samples: the most round-trip times to keep
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.channel = channel
+        self.sequence = 0
+        self.pending = {}
+        self.rtts = deque(maxlen=samples)
+        self.misses = 0
+        self.lost = 0
+        self.answered = False
+        self.lock = threading.Lock()
+
+    def ping(self):
+        '''
+        function:
+            ping: This function makes the body of the next ping and notes when
+                  it was sent
+
+        args:
+            None
+
+        returns:
+            string: the body, "channel:sequence"
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.sequence += 1
+            self.pending[self.sequence] = monotonic()
+            return '{}:{}'.format(self.channel, self.sequence)
+
+    def pong(self, body):
+        '''
+        function:
+            pong: This function matches a pong to its ping
+
+        args:
+            body: the body of the pong, the ping's body echoed back
+
+        returns:
+            float: the round-trip time in seconds, or None if the pong isn't
+                   for one of our pings or came too late
+
+        raises:
+            None
+        '''
+        channel, _, sequence = body.rpartition(':')
+        if channel != self.channel or not sequence.isdigit():
+            return None
+        with self.lock:
+            sent = self.pending.pop(int(sequence), None)
+            if sent is None:
+                return None
+
+            rtt = monotonic() - sent
+            self.rtts.append(rtt)
+            self.misses = 0
+            self.answered = True
+            return rtt
+
+    def expire(self):
+        '''
+        function:
+            expire: This function counts the pings that haven't been answered
+                    within PING_TIMEOUT as missed
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        cutoff = monotonic() - PING_TIMEOUT
+        with self.lock:
+            for sequence, sent in self.pending.items():
+                if sent < cutoff and self.pending.pop(sequence, None) is not None:
+                    self.misses += 1
+                    self.lost += 1
+
+    def reset(self):
+        '''
+        function:
+            reset: This function forgets the pings that were missed and the
+                   ones still waiting for an answer, once the backend is
+                   known to be alive again
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.misses = 0
+            self.pending.clear()
+
+    def failed(self):
+        '''
+        function:
+            failed: This function checks whether the backend has stopped
+                    answering. A backend that has never answered a ping
+                    doesn't know about them, so it is left to the heartbeat.
+
+        args:
+            None
+
+        returns:
+            bool: True if the last PING_MISSES pings were missed
+
+        raises:
+            None
+        '''
+        with self.lock:
+            return self.answered and self.misses >= PING_MISSES
+
+    def stats(self):
+        '''
+        function:
+            stats: This function gives the round-trip time percentiles and
+                   the number of pings lost, for the frontend_stats topic
+
+        args:
+            None
+
+        returns:
+            dictionary: stat name to value
+
+        raises:
+            None
+        '''
+        with self.lock:
+            stats = {'samples': len(self.rtts), 'lost': self.lost}
+            ordered = sorted(self.rtts)
+        for percentile in PERCENTILES:
+            if ordered:
+                rtt = ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)]
+                stats['rtt_p{}_ms'.format(percentile)] = int(rtt * 1000)
+        return stats
@@ -0,0 +1,174 @@
+'''
+ profiler.py
+ Sampling profiler which can be switched on while the frontend is running.
+ It samples the stacks of the threads it is told to watch for a while and
+ writes them out as collapsed stacks, ready for flamegraph.pl. Nothing runs
+ until it is started, so it costs nothing the rest of the time.
+ Created: 10/19/2026
+'''
+
+import os, sys, time, threading
+
+# Where profiles are written
+PROFILE_DIR = '/tmp'
+
+# Seconds between samples
+SAMPLE_INTERVAL = 0.005
+
+# Longest a single profile is allowed to run, in seconds
+MAX_DURATION = 120
+
+
+class SamplingProfiler(object):
+    '''
+    SamplingProfiler class which periodically records the stacks of a set of
+    threads from a background thread and writes them to a collapsed-stack
+    file when it is done
+    '''
+    def __init__(self, name, interval=SAMPLE_INTERVAL, directory=PROFILE_DIR, log=None):
+        '''
+        function:
+            __init__: constructor for the SamplingProfiler class
+
+        args:
+            name: name of the process being profiled, used in the file name
+            interval: seconds between samples
+            directory: where to write the profiles
+            log: RingLogger to log to, if any
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.name = name
+        self.interval = interval
+        self.directory = directory
+        self.log = log
+        self.threads = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+    def watch(self, thread_ident, label):
+        '''
+        function:
+            watch: This function adds a thread to the set that gets sampled
+
+        args:
+            thread_ident: the thread's ident (threading.current_thread().ident)
+            label: the name to put at the root of the thread's stacks
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.threads[thread_ident] = label
+
+    def start(self, duration):
+        '''
+        function:
+            start: This function starts sampling in the background unless a
+                   profile is already being taken
+
+        args:
+            duration: seconds to sample for (capped at MAX_DURATION)
+
+        returns:
+            bool: True if a profile was started
+
+        raises:
+            None
+        '''
+        with self.lock:
+            if self.running:
+                return False
+            self.running = True
+
+        sampler = threading.Thread(target=self.sample, args=(min(duration, MAX_DURATION),), name='profiler')
+        sampler.daemon = True
+        sampler.start()
+        return True
+
+    def sample(self, duration):
+        '''
+        function:
+            sample: This function takes samples until the duration is up and
+                    then writes the profile. It runs on its own thread.
+
+        args:
+            duration: seconds to sample for
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        stacks = {}
+        me = threading.current_thread().ident
+        end = time.time() + duration
+        try:
+            while time.time() < end:
+                for ident, frame in sys._current_frames().items():
+                    # Without any threads to watch, sample all but ourselves
+                    if ident == me or (self.threads and ident not in self.threads):
+                        continue
+                    stack = self.collapse(self.threads.get(ident, 'thread-{}'.format(ident)), frame)
+                    stacks[stack] = stacks.get(stack, 0) + 1
+                time.sleep(self.interval)
+            self.write(stacks)
+        finally:
+            with self.lock:
+                self.running = False
+
+    def collapse(self, label, frame):
+        '''
+        function:
+            collapse: This function turns a stack into a single line of
+                      frames separated by ";" from the root down
+
+        args:
+            label: the name of the thread, which becomes the root frame
+            frame: the innermost frame of the stack
+
+        returns:
+            string: the collapsed stack
+
+        raises:
+            None
+        '''
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append('{} ({})'.format(code.co_name, os.path.basename(code.co_filename)))
+            frame = frame.f_back
+        frames.append(label)
+        frames.reverse()
+        return ';'.join(frames)
+
+    def write(self, stacks):
+        '''
+        function:
+            write: This function writes the samples to a new collapsed-stack
+                   file
+
+        args:
+            stacks: dictionary of collapsed stack to number of samples
+
+        returns:
+            string: the path of the file written
+
+        raises:
+            None
+        '''
+        path = os.path.join(self.directory, 'screendoor-{}-{}-{}.folded'.format(
+            self.name, os.getpid(), time.strftime('%Y%m%dT%H%M%S')))
+        with open(path, 'w') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write('{} {}\n'.format(stack, count))
+        if self.log:
+            self.log.info('profile', 'Wrote profile', path=path, stacks=len(stacks))
+        return path
@@ -0,0 +1,352 @@
+'''
+ render_cache.py
+ Formatting for everything the frontend puts on the screen. Constant
+ screens are built once, and formatted rows are kept in a small LRU so
+ scrolling back over rows that were already on screen doesn't rebuild them.
+ Created: 10/19/2026
+'''
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# Width of one line on the display in characters. Every padded row is laid
+# out for this width.
+LINE_WIDTH = 32
+
+# Number of formatted rows to keep around
+ROW_CACHE_SIZE = 256
+
+# A blank line which is used above and below single line rows
+BLANK_LINE = LINE_WIDTH*' '
+
+
+class LRUCache(object):
+    '''
+    LRUCache class which holds a bounded number of values and throws away
+    the one used longest ago when it is full. It is used from both threads
+    of the GUI process, so the entries are behind a lock.
+    '''
+    def __init__(self, size):
+        '''
+        function:
+            __init__: constructor for the LRUCache class
+
+        args:
+            size: the most values to hold at once
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        '''
+        function:
+            get: This function looks up a value and marks it as just used
+
+        args:
+            key: the key the value was stored under
+            default: what to return if the key isn't in the cache
+
+        returns:
+            The cached value or default
+
+        raises:
+            None
+        '''
+        with self.lock:
+            try:
+                value = self.entries.pop(key)
+            except KeyError:
+                return default
+            self.entries[key] = value
+            return value
+
+    def put(self, key, value):
+        '''
+        function:
+            put: This function stores a value, throwing away the least
+                 recently used value if the cache is full
+
+        args:
+            key: the key to store the value under
+            value: the value to store
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+# Formatted history and blacklist rows keyed by record and layout width
+row_cache = LRUCache(ROW_CACHE_SIZE)
+
+# Single line rows keyed by their text. These come from a handful of fixed
+# strings and the setting names/states, so they are kept for good.
+rows = {}
+
+
+def row(text, width=LINE_WIDTH):
+    '''
+    function:
+        row: function to lay out one line of text as a three line row with
+             blank lines above and below it
+
+    args:
+        text: the text to show in the middle of the row
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row. The same string object is returned every
+                time for the same text.
+
+    raises:
+        None
+    '''
+    key = (text, width)
+    formatted = rows.get(key)
+    if formatted is None:
+        formatted = rows[key] = formatRow(text, width)
+    return formatted
+
+
+def formatRow(text, width=LINE_WIDTH):
+    '''
+    function:
+        formatRow: function to lay out one line of text as a three line row
+                   like row, without keeping it. Use it for text that changes,
+                   such as the names of recent callers, so rows doesn't grow.
+
+    args:
+        text: the text to show in the middle of the row
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row
+
+    raises:
+        None
+    '''
+    blank = width*' '
+    return '{}\n{}\n{}'.format(blank, text, blank)
+
+
+def center(text, width=LINE_WIDTH):
+    '''
+    function:
+        center: function to pad text with spaces on both sides so that it
+                sits in the middle of a line
+
+    args:
+        text: the text to pad
+        width: the width of a line in characters
+
+    returns:
+        string: the padded text
+
+    raises:
+        None
+    '''
+    num_pad_spaces = int((width - len(text))/2)
+    return '{}{}{}'.format(num_pad_spaces*' ', text, num_pad_spaces*' ')
+
+
+def formatNumber(number):
+    '''
+    function:
+        formatNumber: function to format a phone number as x (xxx) xxx - xxxx
+
+    args:
+        number: the number as a string of digits
+
+    returns:
+        string: the formatted number
+
+    raises:
+        None
+    '''
+    key = ('number', number)
+    formatted = row_cache.get(key)
+    if formatted is None:
+        formatted = '{} ({}) {} - {}'.format(number[:1],number[1:4],number[4:7],number[-4:])
+        row_cache.put(key, formatted)
+    return formatted
+
+
+def formatHistoryRow(number, name, time, wasBlocked, width=LINE_WIDTH):
+    '''
+    function:
+        formatHistoryRow: function to format the name, number and time of a
+                          call as a row in the call history
+
+    args:
+        number: the number as a string to format as x (xxx) xxx - xxxx
+        name: the name as a string which gets padded with spaces
+        time: the time as received from the backend (e.g. 20181125T1656)
+        wasBlocked: '1' if the call was blocked, in which case "Blocked" is
+                    shown instead of the time
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row
+
+    raises:
+        ValueError: if time is not in the format the backend sends
+    '''
+    key = ('history', number, name, time, wasBlocked, width)
+    formatted = row_cache.get(key)
+    if formatted is not None:
+        return formatted
+
+    # Pad the number so it sits just right of center
+    number = formatNumber(number)
+    lead = int((width - len(number))/2) + 1
+    number = '{}{}{}'.format(lead*' ', number, (width - len(number) - lead)*' ')
+
+    # Show "Blocked" instead of the time for blocked calls
+    if wasBlocked == '1':
+        last_line = center('Blocked', width)
+    else:
+        # date is received like: 20181125T1656
+        dateObj = datetime.strptime(time, "%Y%m%dT%H%M")
+        last_line = center(dateObj.strftime("%m/%d/%Y %I:%M %p"), width)
+
+    formatted = '{}\n{}\n{}'.format(number, center(name, width), last_line)
+    row_cache.put(key, formatted)
+    return formatted
+
+
+def formatBlacklistRow(number, marked=False, width=LINE_WIDTH):
+    '''
+    function:
+        formatBlacklistRow: function to format a blacklisted number as a row
+                            in the blacklist
+
+    args:
+        number: the number as a string to format as x (xxx) xxx - xxxx
+        marked: True if the number is marked to be removed
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row
+
+    raises:
+        None
+    '''
+    key = ('blacklist', number, marked, width)
+    formatted = row_cache.get(key)
+    if formatted is None:
+        blank = width*' '
+        last_line = center('Marked for removal', width) if marked else blank
+        formatted = '{}\n{}\n{}'.format(blank, formatNumber(number), last_line)
+        row_cache.put(key, formatted)
+    return formatted
+
+
+def formatCallerContext(caller, width=LINE_WIDTH):
+    '''
+    function:
+        formatCallerContext: function to format what is known about an
+                             incoming caller as two lines for the incoming
+                             call screen
+
+    args:
+        caller: (calls, last call datetime, blocked before, more calls than
+                kept) from CallerIndex.lookup, or None for a caller who
+                hasn't been seen
+        width: the width of a line in characters
+
+    returns:
+        tuple: the line to show above "Incoming Call From" and the one to
+               show below it
+
+    raises:
+        None
+    '''
+    if caller is None:
+        return width*' ', width*' '
+    calls, last, blocked, capped = caller
+    summary = 'Called {}{}x, last {}'.format(calls, '+' if capped else '', last.strftime('%m/%d %H:%M'))
+    return center(summary, width), center('Blocked before' if blocked else '', width)
+
+
+def formatMarkingHeader(count, width=LINE_WIDTH):
+    '''
+    function:
+        formatMarkingHeader: function to format the top row of the blacklist
+                             while numbers are being marked for removal
+
+    args:
+        count: how many numbers are marked
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row
+
+    raises:
+        None
+    '''
+    if count == 0:
+        lines = ['Press "Select" on numbers to', 'mark them, or "Back" to stop', 'marking.']
+    else:
+        lines = ['Press "Select" here to remove', 'the {} marked number{}'.format(count, '' if count == 1 else 's'),
+                 'or "Back" to stop marking.']
+    return '\n'.join(center(line, width) for line in lines)
+
+
+def formatFilterHeader(label, width=LINE_WIDTH):
+    '''
+    function:
+        formatFilterHeader: function to format the top row of the call
+                            history while it is filtered, so the user can see
+                            which calls are being shown
+
+    args:
+        label: the filter's name, e.g. "Blocked calls"
+        width: the width of a line in characters
+
+    returns:
+        string: the formatted row
+
+    raises:
+        None
+    '''
+    return '\n'.join([width*' ', center('Settings', width), center('({})'.format(label), width)])
+
+
+# Rows that never change
+SETTINGS_ROW = row('Settings')
+BLACKLIST_ROW = row('Blacklist')
+HISTORY_FILTER_ROW = row('History filter')
+END_OF_HISTORY_ROW = row('End of Call History')
+END_OF_SETTINGS_ROW = row('End of Settings')
+END_OF_LIST_ROW = row('End of List')
+END_OF_BLACKLIST_ROW = row('End of Blacklist')
+BLACKLISTED_ROW = row('Caller blacklisted!')
+PLACEHOLDER_ROW = row('Loading...')
+BLACKLIST_HEADER = '\n'.join(center(line) for line in ['Press "Select" on a number to',
+                                                          'remove it, or here to remove',
+                                                          'several at once.'])
+
+# Status screens shown in a single text box
+LOADING_HISTORY = '\nLoading Call History...'
+LOADING_SETTINGS = '\nLoading Current Settings...'
+LOADING_BLACKLIST = '\nLoading Blacklist...'
+LOADING_SETTING = '\n\nLoading Selected Setting...'
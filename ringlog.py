@@ -0,0 +1,251 @@
+'''
+ ringlog.py
+ Logging that stays off the hot paths. Log calls put a record in an
+ in-memory ring buffer and return; a background thread formats the records
+ and writes them out. Each record has a level, a kind (usually the topic or
+ event it is about) and optional fields such as the payload size or a
+ latency. Kinds can be rate limited so chatty ones like heartbeats don't
+ flood a slow console or an SD card.
+ Created: 10/19/2026
+'''
+
+import sys, time, threading
+from collections import deque
+
+# Levels, lowest first
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+# Most records held before the oldest are dropped
+RING_SIZE = 4096
+
+# Most seconds the drain thread waits before writing what it has
+DRAIN_INTERVAL = 0.5
+
+
+class RingLogger(object):
+    '''
+    RingLogger class which queues log records in a ring buffer and writes
+    them out from a background thread
+    '''
+    def __init__(self, name, stream=None, level=INFO, size=RING_SIZE):
+        '''
+        function:
+            __init__: constructor for the RingLogger class
+
+        args:
+            name: name of the process, written on every line
+            stream: file to write to (standard output by default)
+            level: the lowest level to keep
+            size: the most records to hold before dropping the oldest
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.name = name
+        self.stream = stream if stream is not None else sys.stdout
+        self.level = level
+        self.ring = deque(maxlen=size)
+        self.dropped = 0
+        self.limits = {}
+        self.suppressed = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.drainer = None
+
+    def start(self):
+        '''
+        function:
+            start: This function starts the drain thread
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.drainer = threading.Thread(target=self.drain, name='ringlog-{}'.format(self.name))
+        self.drainer.daemon = True
+        self.drainer.start()
+
+    def setRateLimit(self, kind, count, seconds):
+        '''
+        function:
+            setRateLimit: This function limits how many records of a kind are
+                          kept. Up to count records are kept at once, and the
+                          allowance refills at count per the given seconds.
+                          Records over the limit are counted, and the count is
+                          written with the next record of that kind that gets
+                          through.
+
+        args:
+            kind: the kind to limit
+            count: records allowed per period
+            seconds: length of the period
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.limits[kind] = [float(count), time.time(), float(count), float(count) / seconds]
+
+    def allowed(self, kind):
+        '''
+        function:
+            allowed: This function takes one record's allowance for a kind
+
+        args:
+            kind: the kind of the record
+
+        returns:
+            int: how many records of the kind were held back since the last
+                 one let through, or None if this one is held back too
+
+        raises:
+            None
+        '''
+        with self.lock:
+            limit = self.limits.get(kind)
+            if limit is None:
+                return 0
+
+            # Refill the allowance for the time since the last record
+            now = time.time()
+            tokens, last, count, rate = limit
+            tokens = min(count, tokens + (now - last) * rate)
+            if tokens < 1:
+                limit[0], limit[1] = tokens, now
+                self.suppressed[kind] = self.suppressed.get(kind, 0) + 1
+                return None
+            limit[0], limit[1] = tokens - 1, now
+            return self.suppressed.pop(kind, 0)
+
+    def log(self, level, kind, message, **fields):
+        '''
+        function:
+            log: This function queues a record. It never waits on I/O.
+
+        args:
+            level: one of DEBUG, INFO, WARNING or ERROR
+            kind: what the record is about, e.g. the topic
+            message: the text of the record
+            fields: extra values to write with the record, e.g. size=12
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        if level < self.level:
+            return
+        suppressed = self.allowed(kind)
+        if suppressed is None:
+            return
+        if suppressed:
+            fields['suppressed'] = suppressed
+
+        # The ring drops the oldest record when it is full, so count it
+        if len(self.ring) == self.ring.maxlen:
+            self.dropped += 1
+        self.ring.append((time.time(), level, kind, message, fields))
+        if level >= WARNING:
+            self.wakeup.set()
+
+    def debug(self, kind, message, **fields):
+        self.log(DEBUG, kind, message, **fields)
+
+    def info(self, kind, message, **fields):
+        self.log(INFO, kind, message, **fields)
+
+    def warning(self, kind, message, **fields):
+        self.log(WARNING, kind, message, **fields)
+
+    def error(self, kind, message, **fields):
+        self.log(ERROR, kind, message, **fields)
+
+    def format(self, record):
+        '''
+        function:
+            format: This function lays out a record as a line like
+                    "2026-10-19 12:00:00.123 INFO gui heartbeat: Got heartbeat size=5"
+
+        args:
+            record: (time, level, kind, message, fields) tuple
+
+        returns:
+            string: the line, without a newline
+
+        raises:
+            None
+        '''
+        when, level, kind, message, fields = record
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(when))
+        line = '{}.{:03d} {} {} {}: {}'.format(stamp, int(when * 1000) % 1000, LEVEL_NAMES.get(level, level),
+                                              self.name, kind, message)
+        if fields:
+            line += ' ' + ' '.join('{}={}'.format(name, fields[name]) for name in sorted(fields))
+        return line
+
+    def flush(self):
+        '''
+        function:
+            flush: This function writes out everything in the ring now
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        lines = []
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(self.format((time.time(), WARNING, 'ringlog', 'Dropped records', {'count': dropped})))
+        while self.ring:
+            try:
+                lines.append(self.format(self.ring.popleft()))
+            except IndexError:
+                break
+        if lines:
+            try:
+                self.stream.write('\n'.join(lines) + '\n')
+                self.stream.flush()
+            except (IOError, ValueError):
+                pass
+
+    def drain(self):
+        '''
+        function:
+            drain: This function writes records out every DRAIN_INTERVAL
+                   seconds, or sooner for warnings and errors. It runs on its
+                   own thread.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        while True:
+            self.wakeup.wait(DRAIN_INTERVAL)
+            self.wakeup.clear()
+            self.flush()
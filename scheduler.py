@@ -0,0 +1,229 @@
+'''
+ scheduler.py
+ Named deadlines kept in a heap and measured on the monotonic clock, so
+ they aren't thrown off when the wall clock jumps (e.g. when NTP first
+ syncs after the Pi boots without an RTC). Deadlines can be set from any
+ thread. Their callbacks run on whichever thread calls runDue, which only
+ reads the clock and compares it with the earliest deadline when nothing is
+ due. The thread running them can sleep for nextDelay, and is woken when a
+ sooner deadline is set.
+ Created: 10/19/2026
+'''
+
+import ctypes, ctypes.util, heapq, itertools, os, threading, time
+
+# clock_gettime's id for the monotonic clock on Linux
+CLOCK_MONOTONIC = 1
+
+
+class timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+# Python 2 has no time.monotonic, so ask libc (or librt on older glibc)
+try:
+    clock_gettime = ctypes.CDLL(ctypes.util.find_library('rt') or ctypes.util.find_library('c'),
+                                use_errno=True).clock_gettime
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+except (OSError, AttributeError, TypeError):
+    clock_gettime = None
+
+
+def monotonic():
+    '''
+    function:
+        monotonic: function to read a clock that only ever goes forward. It
+                   falls back to time.monotonic, and then to the wall clock,
+                   where clock_gettime can't be called.
+
+    args:
+        None
+
+    returns:
+        float: seconds since some fixed point in the past
+
+    raises:
+        OSError: if clock_gettime fails
+    '''
+    if clock_gettime is None:
+        return getattr(time, 'monotonic', time.time)()
+    now = timespec()
+    if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(now)) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return now.tv_sec + now.tv_nsec * 1e-9
+
+
+class Scheduler(object):
+    '''
+    Scheduler class which keeps named deadlines in a heap. Setting a
+    deadline with a name that is already pending replaces it.
+    '''
+    def __init__(self, wakeup=None):
+        '''
+        function:
+            __init__: constructor for the Scheduler class
+
+        args:
+            wakeup: function to call when a deadline is set that is due
+                    before every other one, so whatever is sleeping until the
+                    old first deadline can wake up sooner
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.wakeup = wakeup
+        self.heap = []
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+    def scheduleAt(self, name, when, callback, *args):
+        '''
+        function:
+            scheduleAt: This function sets (or moves) a deadline
+
+        args:
+            name: name of the deadline
+            when: monotonic() time it is due
+            callback: function to call when it is due
+            args: arguments to call it with
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.drop(name)
+            entry = [when, next(self.counter), name, callback, args]
+            self.entries[name] = entry
+            heapq.heappush(self.heap, entry)
+            sooner = self.heap[0] is entry
+
+        if sooner and self.wakeup is not None:
+            self.wakeup()
+
+    def schedule(self, name, delay, callback, *args):
+        '''
+        function:
+            schedule: This function sets (or moves) a deadline some seconds
+                      from now
+
+        args:
+            name: name of the deadline
+            delay: seconds from now it is due
+            callback: function to call when it is due
+            args: arguments to call it with
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.scheduleAt(name, monotonic() + delay, callback, *args)
+
+    def every(self, name, interval, callback, *args):
+        '''
+        function:
+            every: This function calls a function every interval seconds,
+                   starting interval seconds from now
+
+        args:
+            name: name of the deadline
+            interval: seconds between calls
+            callback: function to call
+            args: arguments to call it with
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        def repeat():
+            self.schedule(name, interval, repeat)
+            callback(*args)
+        self.schedule(name, interval, repeat)
+
+    def drop(self, name):
+        # A deadline set again replaces the old one. Entries are left in the
+        # heap and skipped when they reach the top, so this has to be called
+        # with the lock held.
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    def pending(self, name):
+        '''
+        function:
+            pending: This function checks whether a deadline is set
+
+        args:
+            name: name of the deadline
+
+        returns:
+            bool: True if it is set and hasn't been run
+
+        raises:
+            None
+        '''
+        return name in self.entries
+
+    def nextDelay(self):
+        '''
+        function:
+            nextDelay: This function works out how long until the next
+                       deadline is due
+
+        args:
+            None
+
+        returns:
+            float: seconds until it is due (0 if it is overdue), or None if
+                   no deadline is set
+
+        raises:
+            None
+        '''
+        with self.lock:
+            self.skipCancelled()
+            if not self.heap:
+                return None
+            return max(0, self.heap[0][0] - monotonic())
+
+    def skipCancelled(self):
+        # Called with the lock held
+        while self.heap and self.heap[0][3] is None:
+            heapq.heappop(self.heap)
+
+    def runDue(self):
+        '''
+        function:
+            runDue: This function calls the callbacks of every deadline that
+                    is due, earliest first. A callback may set deadlines of
+                    its own.
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        now = monotonic()
+        while True:
+            with self.lock:
+                self.skipCancelled()
+                if not self.heap or self.heap[0][0] > now:
+                    return
+                when, count, name, callback, args = heapq.heappop(self.heap)
+                del self.entries[name]
+            callback(*args)
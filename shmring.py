@@ -0,0 +1,459 @@
+'''
+ shmring.py
+ One-way transport between the reader process and the GUI through a ring
+ buffer in shared memory, used in place of a multiprocessing Pipe. Each
+ message is pickled straight into the ring as a length-prefixed frame, so
+ sending doesn't make a system call or copy through the kernel. The
+ receiving side sleeps on a pipe (the doorbell) that the sending side only
+ writes to when the receiver is waiting for something to arrive. The
+ header is only read and written with a lock shared by both processes held,
+ which also keeps the Pi's cores from seeing the write count move before
+ the frame it covers.
+ Created: 10/19/2026
+'''
+
+import cPickle, errno, fcntl, mmap, multiprocessing, os, select, struct, threading, time
+
+# Bytes in the ring, not counting the header. It has to be a power of two.
+DEFAULT_SIZE = 1 << 20
+
+# Header at the start of the shared memory: bytes ever written and bytes
+# ever read (both counting round from 2**32 to 0), and whether the receiver
+# is waiting on the doorbell. Each is 32 bits so the Pi can store one
+# without the other process seeing it half written.
+HEADER = struct.Struct('=III')
+FIELD = struct.Struct('=I')
+WRITTEN_OFFSET = 0
+READ_OFFSET = 4
+WAITING_OFFSET = 8
+COUNT_MASK = 0xFFFFFFFF
+
+# Frames start with their length. A length of WRAP means the rest of the
+# ring is unused and the next frame is at the start. A message too big for
+# one frame is split over several, and every frame but the last has MORE
+# set in its length.
+LENGTH = struct.Struct('=I')
+WRAP = 0xFFFFFFFF
+MORE = 0x80000000
+
+# Seconds the sending side sleeps between checks while the ring is full
+FULL_WAIT = 0.005
+
+# Most seconds to sleep on the doorbell before looking at the ring again, in
+# case a ring was missed
+RECV_WAIT = 0.1
+
+
+class RingConnection(object):
+    '''
+    RingConnection class which sends pickled messages through a shared
+    memory ring from one process and receives them in another. It has the
+    send, recv, poll and fileno methods of the multiprocessing connection it
+    replaces. There can be one sending thread and one receiving thread.
+    '''
+    def __init__(self, size=DEFAULT_SIZE):
+        '''
+        function:
+            __init__: constructor for the RingConnection class. It has to be
+                      made before the process that sends or receives is
+                      started, so both processes share the memory.
+
+        args:
+            size: bytes in the ring
+
+        returns:
+            None
+
+        raises:
+            ValueError: if size isn't a power of two
+            mmap.error, OSError: if the shared memory or the doorbell can't
+                                 be made
+        '''
+        if size <= 0 or size & (size - 1):
+            raise ValueError('ring size {} is not a power of two'.format(size))
+        self.size = size
+        self.memory = mmap.mmap(-1, HEADER.size + size)
+        self.doorbell_read, self.doorbell_write = os.pipe()
+        for fd in (self.doorbell_read, self.doorbell_write):
+            setNonBlocking(fd)
+        self.send_lock = threading.Lock()
+
+        # Taking and releasing a multiprocessing lock is a memory barrier in
+        # both processes, so a receiver that sees the new write count also
+        # sees the frame written before it
+        self.header_lock = multiprocessing.Lock()
+
+    def readHeader(self):
+        with self.header_lock:
+            return HEADER.unpack_from(self.memory, 0)
+
+    def writeField(self, offset, value):
+        with self.header_lock:
+            FIELD.pack_into(self.memory, offset, value)
+
+    def backlog(self):
+        '''
+        function:
+            backlog: This function finds out how many bytes are waiting to be
+                     received
+
+        args:
+            None
+
+        returns:
+            int: the number of bytes waiting
+
+        raises:
+            None
+        '''
+        written, read, waiting = self.readHeader()
+        return (written - read) & COUNT_MASK
+
+    def fileno(self):
+        '''
+        function:
+            fileno: This function gives the doorbell's file descriptor, which
+                    can be read from once the receiver has said it is waiting
+
+        args:
+            None
+
+        returns:
+            int: the file descriptor
+
+        raises:
+            None
+        '''
+        return self.doorbell_read
+
+    def send(self, obj):
+        '''
+        function:
+            send: This function pickles an object into the ring. It waits if
+                  the ring is too full, as sending on a full pipe does. An
+                  object that pickles to more than half the ring is sent in
+                  several frames.
+
+        args:
+            obj: the object to send
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        data = cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
+        chunk = self.size // 2 - LENGTH.size
+
+        # Hold the lock over every frame so they aren't mixed with another
+        # thread's
+        with self.send_lock:
+            for start in range(0, max(len(data), 1), chunk):
+                more = MORE if start + chunk < len(data) else 0
+                self.sendFrame(data[start:start+chunk], more)
+
+    def sendFrame(self, data, more):
+        '''
+        function:
+            sendFrame: This function writes one frame into the ring and rings
+                       the doorbell if the receiver is waiting. send_lock has
+                       to be held.
+
+        args:
+            data: the bytes of the frame, at most half the ring
+            more: MORE if more frames of the same message follow, otherwise 0
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        needed = LENGTH.size + len(data)
+        written = self.readHeader()[0]
+        position = written % self.size
+
+        # Frames aren't split across the end of the ring, so skip to the
+        # start if this one doesn't fit before it
+        skip = self.size - position if position + needed > self.size else 0
+        while True:
+            read = self.readHeader()[1]
+            if (written + skip + needed - read) & COUNT_MASK <= self.size:
+                break
+            time.sleep(FULL_WAIT)
+
+        if skip:
+            if skip >= LENGTH.size:
+                LENGTH.pack_into(self.memory, HEADER.size + position, WRAP)
+            written = (written + skip) & COUNT_MASK
+            position = 0
+
+        # Write the frame, then move the write count past it so the
+        # receiver never sees a frame that is only partly written
+        start = HEADER.size + position
+        LENGTH.pack_into(self.memory, start, len(data) | more)
+        self.memory[start+LENGTH.size:start+needed] = data
+        self.writeField(WRITTEN_OFFSET, (written + needed) & COUNT_MASK)
+
+        # Only ring the doorbell if the receiver is asleep on it
+        if self.readHeader()[2]:
+            try:
+                os.write(self.doorbell_write, '\x01')
+            except OSError as e:
+                if e.errno != errno.EAGAIN:
+                    raise
+
+    def poll(self, timeout=0.0):
+        '''
+        function:
+            poll: This function checks whether there is anything to receive,
+                  waiting up to timeout seconds for something to arrive
+
+        args:
+            timeout: seconds to wait, or None to wait until something arrives
+
+        returns:
+            bool: True if recv won't have to wait
+
+        raises:
+            None
+        '''
+        written, read, waiting = self.readHeader()
+        if written != read or timeout == 0:
+            return written != read
+        deadline = None if timeout is None else time.time() + timeout
+
+        while True:
+            # The wait is cut into RECV_WAIT slices in case a ring is missed
+            if self.startWaiting():
+                try:
+                    wait = RECV_WAIT if deadline is None else min(RECV_WAIT, max(0, deadline - time.time()))
+                    selectReadable([self.doorbell_read], wait)
+                finally:
+                    self.stopWaiting()
+            else:
+                self.stopWaiting()
+            written, read, waiting = self.readHeader()
+            if written != read or (deadline is not None and time.time() >= deadline):
+                return written != read
+
+    def startWaiting(self):
+        '''
+        function:
+            startWaiting: This function tells the sending side the receiver
+                          is about to sleep on the doorbell, then checks the
+                          ring again, so a frame sent in between is either
+                          seen here or rings the doorbell. stopWaiting has to
+                          be called after, whatever this returns.
+
+        args:
+            None
+
+        returns:
+            bool: True if the ring is still empty and it is safe to sleep
+
+        raises:
+            None
+        '''
+        self.writeField(WAITING_OFFSET, 1)
+        written, read, waiting = self.readHeader()
+        return written == read
+
+    def stopWaiting(self):
+        '''
+        function:
+            stopWaiting: This function tells the sending side the receiver
+                         isn't sleeping on the doorbell any more and empties
+                         it
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.writeField(WAITING_OFFSET, 0)
+        self.drainDoorbell()
+
+    def drainDoorbell(self):
+        # The doorbell only says to look at the ring, so empty it
+        try:
+            while os.read(self.doorbell_read, 4096):
+                pass
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def recv(self):
+        '''
+        function:
+            recv: This function takes the next object out of the ring,
+                  waiting for one if the ring is empty
+
+        args:
+            None
+
+        returns:
+            the object that was sent
+
+        raises:
+            None
+        '''
+        chunks = []
+        more = MORE
+        while more:
+            data, more = self.recvFrame()
+            chunks.append(data)
+        return cPickle.loads(''.join(chunks))
+
+    def recvFrame(self):
+        '''
+        function:
+            recvFrame: This function takes the next frame out of the ring,
+                       waiting for one if the ring is empty
+
+        args:
+            None
+
+        returns:
+            tuple: (the bytes of the frame, MORE if more frames of the same
+                   message follow, otherwise 0)
+
+        raises:
+            None
+        '''
+        self.poll(None)
+
+        written, read, waiting = self.readHeader()
+        position = read % self.size
+
+        # Follow a wrap marker, or a gap too small to hold one, to the start
+        if self.size - position < LENGTH.size or LENGTH.unpack_from(self.memory, HEADER.size + position)[0] == WRAP:
+            read = (read + self.size - position) & COUNT_MASK
+            position = 0
+
+        start = HEADER.size + position
+        length = LENGTH.unpack_from(self.memory, start)[0]
+        more = length & MORE
+        length &= ~MORE
+        data = self.memory[start+LENGTH.size:start+LENGTH.size+length]
+        self.writeField(READ_OFFSET, (read + LENGTH.size + length) & COUNT_MASK)
+        return data, more
+
+    def close(self):
+        '''
+        function:
+            close: This function frees the shared memory and the doorbell
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.memory.close()
+        for fd in (self.doorbell_read, self.doorbell_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def selectReadable(sources, timeout):
+    '''
+    function:
+        selectReadable: function to wait until one of some file descriptors
+                        (or objects with a fileno method) can be read. A
+                        signal arriving while waiting counts as the timeout.
+
+    args:
+        sources: what to wait on
+        timeout: most seconds to wait
+
+    returns:
+        list: the sources that can be read
+
+    raises:
+        None
+    '''
+    try:
+        return select.select(sources, [], [], timeout)[0]
+    except select.error as e:
+        if e.args[0] != errno.EINTR:
+            raise
+        return []
+
+
+def waitForAny(connections, timeout):
+    '''
+    function:
+        waitForAny: function to wait until any of several connections has
+                    something to receive, like multiprocessing's wait on
+                    newer Pythons. The connections can be multiprocessing
+                    connections, RingConnections or a mix.
+
+    args:
+        connections: the connections to wait on
+        timeout: most seconds to wait
+
+    returns:
+        list: the connections that have something to receive
+
+    raises:
+        None
+    '''
+    rings = [connection for connection in connections if isinstance(connection, RingConnection)]
+    try:
+        # Only sleep if every ring is still empty once marked as waiting
+        if all([ring.startWaiting() for ring in rings]) and not any(connection.poll() for connection in connections):
+            selectReadable(connections, timeout)
+    finally:
+        for ring in rings:
+            ring.stopWaiting()
+    return [connection for connection in connections if connection.poll()]
+
+
+def setNonBlocking(fd):
+    '''
+    function:
+        setNonBlocking: function to stop reads and writes on a file
+                        descriptor from waiting
+
+    args:
+        fd: the file descriptor
+
+    returns:
+        None
+
+    raises:
+        None
+    '''
+    fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+
+def RingPipe(size=DEFAULT_SIZE):
+    '''
+    function:
+        RingPipe: function to make a one-way shared memory transport, like
+                  multiprocessing.Pipe(False)
+
+    args:
+        size: bytes in the ring
+
+    returns:
+        tuple: the receiving end and the sending end (the same connection,
+               as each process only uses one of them)
+
+    raises:
+        mmap.error, OSError: if the shared memory or the doorbell can't be
+                             made
+    '''
+    connection = RingConnection(size)
+    return connection, connection
@@ -0,0 +1,309 @@
+'''
+ soak.py
+ Soak test for the frontend. It presses buttons on a running frontend
+ through the frontend_control topic for as long as it is told to, usually
+ against the synthetic backend, and reports how long each press took to be
+ handled, how many presses were never handled, and how the memory use of
+ both frontend processes grows. The frontend has to be started with
+ --allow-remote-press for the presses to be taken.
+ Created: 10/19/2026
+'''
+
+import argparse, random, threading, time
+import fake_backend
+
+# Channel the soak runner reads frontend_stats on
+SOAK_CHANNEL = 'soak'
+
+# Button pins, and how often each is pressed relative to the others
+BUTTONS = {'select': 29, 'up': 31, 'down': 33, 'back': 35}
+BUTTON_WEIGHTS = [('up', 35), ('down', 40), ('select', 10), ('back', 15)]
+
+# Seconds to wait for a press to be handled before counting it as dropped
+ACK_TIMEOUT = 5.0
+
+# Most latencies kept for the whole-run percentiles
+RESERVOIR_SIZE = 10000
+
+# Percentiles to report
+PERCENTILES = (50, 90, 99)
+
+
+class SoakRunner(object):
+    '''
+    SoakRunner class which presses buttons at random and keeps the numbers
+    for the report
+    '''
+    def __init__(self, transport, rate=5.0, duration=3600, report_interval=60, seed=None):
+        '''
+        function:
+            __init__: constructor for the SoakRunner class
+
+        args:
+            transport: BrokerTransport or NsqdTransport to talk over
+            rate: presses per second
+            duration: seconds to run for
+            report_interval: seconds between reports
+            seed: seed for the random numbers, to repeat a run
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.transport = transport
+        self.rate = rate
+        self.duration = duration
+        self.report_interval = report_interval
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.pending = {}
+        self.sent = 0
+        self.handled = 0
+        self.dropped = 0
+        self.interval_latencies = []
+        self.reservoir = []
+        self.latency_count = 0
+        self.memory = []
+
+    def run(self):
+        '''
+        function:
+            run: This function presses buttons until the duration is up,
+                 reporting as it goes and once more at the end
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.transport.subscribe('frontend_stats', SOAK_CHANNEL, self.onStats)
+        self.transport.start()
+
+        start = time.time()
+        next_press = start
+        next_report = start + self.report_interval
+
+        # Ask for memory use at the start so there is something to grow from
+        self.transport.publish('frontend_control', 'memory')
+
+        while time.time() - start < self.duration:
+            now = time.time()
+            if now >= next_press:
+                self.press()
+                next_press = now + self.random.expovariate(self.rate)
+            if now >= next_report:
+                self.expirePending()
+                self.report(now - start)
+                self.transport.publish('frontend_control', 'memory')
+                next_report = now + self.report_interval
+            time.sleep(min(0.01, max(0, next_press - time.time())))
+
+        # Give the last presses a chance to be handled
+        time.sleep(ACK_TIMEOUT)
+        self.expirePending(final=True)
+        self.report(time.time() - start, final=True)
+
+    def press(self):
+        '''
+        function:
+            press: This function presses a button picked at random
+
+        args:
+            None
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        pick = self.random.uniform(0, sum(weight for name, weight in BUTTON_WEIGHTS))
+        for name, weight in BUTTON_WEIGHTS:
+            pick -= weight
+            if pick <= 0:
+                break
+
+        with self.lock:
+            self.sequence += 1
+            self.pending[self.sequence] = time.time()
+            self.sent += 1
+        self.transport.publish('frontend_control', 'press:{}:{}'.format(BUTTONS[name], self.sequence))
+
+    def onStats(self, body):
+        '''
+        function:
+            onStats: This function takes the press and memory reports the
+                     frontend publishes on frontend_stats
+
+        args:
+            body: the message body, "kind:name=value;..."
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        kind, _, fields = body.partition(':')
+        stats = dict(field.split('=', 1) for field in fields.split(';') if '=' in field)
+
+        if kind == 'press' and stats.get('seq', '').isdigit():
+            with self.lock:
+                sent = self.pending.pop(int(stats['seq']), None)
+                if sent is None:
+                    return
+                self.handled += 1
+                self.recordLatency(time.time() - sent)
+
+        elif kind == 'memory':
+            with self.lock:
+                self.memory.append((time.time(), readKB(stats, 'rss_gui_kb'), readKB(stats, 'rss_reader_kb')))
+
+    def recordLatency(self, latency):
+        '''
+        function:
+            recordLatency: This function keeps a latency for this report and,
+                           by reservoir sampling, for the whole run
+
+        args:
+            latency: seconds from sending the press to it being handled
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        self.interval_latencies.append(latency)
+        self.latency_count += 1
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(latency)
+        else:
+            slot = self.random.randint(0, self.latency_count - 1)
+            if slot < RESERVOIR_SIZE:
+                self.reservoir[slot] = latency
+
+    def expirePending(self, final=False):
+        '''
+        function:
+            expirePending: This function counts presses that haven't been
+                           handled within ACK_TIMEOUT as dropped
+
+        args:
+            final: True to count everything still waiting as dropped
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        cutoff = time.time() - ACK_TIMEOUT
+        with self.lock:
+            for sequence, sent in self.pending.items():
+                if final or sent < cutoff:
+                    del self.pending[sequence]
+                    self.dropped += 1
+
+    def report(self, elapsed, final=False):
+        '''
+        function:
+            report: This function prints the latency percentiles, the dropped
+                    presses and the memory growth so far
+
+        args:
+            elapsed: seconds since the run started
+            final: True for the summary at the end of the run
+
+        returns:
+            None
+
+        raises:
+            None
+        '''
+        with self.lock:
+            latencies = self.reservoir if final else self.interval_latencies
+            line = '{} {:.0f}s: sent={} handled={} dropped={} latency {}'.format(
+                'FINAL' if final else 'soak', elapsed, self.sent, self.handled, self.dropped,
+                formatPercentiles(latencies))
+            self.interval_latencies = []
+
+            if len(self.memory) > 1:
+                (first_time, first_gui, first_reader), (last_time, last_gui, last_reader) = self.memory[0], self.memory[-1]
+                hours = max(last_time - first_time, 1) / 3600.0
+                line += ' rss gui={}kB ({:+.0f}kB/h) reader={}kB ({:+.0f}kB/h)'.format(
+                    last_gui, (last_gui - first_gui) / hours, last_reader, (last_reader - first_reader) / hours)
+        print line
+
+
+def readKB(stats, name):
+    '''
+    function:
+        readKB: function to read a kB figure out of a stats report
+
+    args:
+        stats: dictionary of stat name to value, as strings
+        name: the stat to read
+
+    returns:
+        int: the value, or 0 if it is missing
+
+    raises:
+        None
+    '''
+    value = stats.get(name, '')
+    return int(value) if value.isdigit() else 0
+
+
+def formatPercentiles(latencies):
+    '''
+    function:
+        formatPercentiles: function to lay out the percentiles and maximum
+                           of a list of latencies in milliseconds
+
+    args:
+        latencies: latencies in seconds
+
+    returns:
+        string: e.g. "p50=12ms p90=30ms p99=80ms max=95ms"
+
+    raises:
+        None
+    '''
+    if not latencies:
+        return 'n/a'
+    ordered = sorted(latencies)
+    parts = ['p{}={:.0f}ms'.format(p, ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1000)
+             for p in PERCENTILES]
+    parts.append('max={:.0f}ms'.format(ordered[-1] * 1000))
+    return ' '.join(parts)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Soak test a running frontend')
+    fake_backend.addArguments(parser)
+    parser.add_argument('--no-backend', action='store_true',
+                        help="don't run the synthetic backend (use the real one)")
+    parser.add_argument('--rate', type=float, default=5.0, help='button presses per second')
+    parser.add_argument('--duration', type=float, default=3600, help='seconds to run for')
+    parser.add_argument('--report-interval', type=float, default=60, help='seconds between reports')
+    args = parser.parse_args()
+
+    if args.no_backend:
+        transport, stop = fake_backend.NsqdTransport(tcp_port=args.tcp_port, http_port=args.http_port), (lambda: None)
+    else:
+        transport, backend, stop = fake_backend.startFromArguments(args)
+
+    try:
+        SoakRunner(transport, args.rate, args.duration, args.report_interval, args.seed).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
@@ -0,0 +1,88 @@
+'''
+ test_fb_display.py
+ Tests for the framebuffer renderer. Each test draws into a temporary file
+ standing in for /dev/fb0, so they run on any Linux machine with Pillow.
+ Run them with "python -m unittest test_fb_display".
+ Created: 10/19/2026
+'''
+
+import os, shutil, tempfile, unittest
+import fb_display
+
+# Size of the unit's display
+SIZE = (800, 480)
+
+
+class FramebufferRendererTest(unittest.TestCase):
+    '''
+    FramebufferRendererTest class which draws sample screens into a file and
+    checks the pixels that land in it
+    '''
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'fb')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def render(self, bits_per_pixel, focus=1):
+        # Draw the sample screen fb_display draws when run by itself
+        framebuffer = fb_display.Framebuffer(self.path, SIZE, bits_per_pixel)
+        renderer = fb_display.FramebufferRenderer(framebuffer)
+        renderer.boxes[0].SetValue('\nSettings')
+        renderer.boxes[1].SetValue('1 (800) 555 - 1234\nSAMPLE CALLER\n03/01/2019 04:56 PM')
+        renderer.boxes[2].SetValue('1 (800) 555 - 4321\nANOTHER CALLER\nBlocked')
+        renderer.boxes[focus].SetFocus()
+        renderer.flush()
+        return renderer
+
+    def readPixels(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def boxBytes(self, data, rect, bits_per_pixel):
+        # The bytes of the rows a box covers
+        x, y, width, height = rect
+        stride = SIZE[0] * bits_per_pixel / 8
+        return data[y*stride:(y+height)*stride]
+
+    def testDrawsEveryDepth(self):
+        for bits_per_pixel in (16, 24, 32):
+            renderer = self.render(bits_per_pixel)
+            renderer.framebuffer.close()
+            data = self.readPixels()
+            self.assertEqual(len(data), SIZE[0] * SIZE[1] * bits_per_pixel / 8)
+
+            # Text was drawn, so the screen isn't one colour
+            self.assertTrue(len(set(data[::bits_per_pixel/8])) > 1, bits_per_pixel)
+            os.remove(self.path)
+
+    def testHighlightMovesWithFocus(self):
+        renderer = self.render(32, focus=1)
+        before = self.readPixels()
+        rect = renderer.boxes[1].rect
+
+        # Moving the focus redraws the box that had it
+        renderer.boxes[2].SetFocus()
+        renderer.flush()
+        renderer.framebuffer.close()
+        after = self.readPixels()
+        self.assertNotEqual(self.boxBytes(before, rect, 32), self.boxBytes(after, rect, 32))
+
+    def testOnlyChangedBoxesAreCopied(self):
+        renderer = self.render(32)
+        rect = renderer.boxes[0].rect
+
+        # Scribble over the first box in the file. Changing another box
+        # mustn't copy the first one again.
+        x, y, width, height = rect
+        stride = SIZE[0] * 4
+        renderer.framebuffer.map[y*stride:y*stride+4] = '\x01\x02\x03\x00'
+        renderer.boxes[2].SetValue('1 (800) 555 - 0000\nNEW CALLER\nBlocked')
+        renderer.flush()
+        renderer.framebuffer.close()
+        self.assertEqual(self.readPixels()[y*stride:y*stride+4], '\x01\x02\x03\x00')
+
+
+if __name__ == '__main__':
+    unittest.main()